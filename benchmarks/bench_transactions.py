@@ -0,0 +1,71 @@
+# Fichier : benchmarks/bench_transactions.py
+# Compare le débit d'écriture : validation après chaque requête vs une seule unité de travail.
+#
+# Usage : python benchmarks/bench_transactions.py [--agents 500] [--output resultats.json]
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from db.database import DatabaseManager
+from core.constants import SoldeStatus
+
+
+def _write_agents(db_manager, nb_agents, prefix):
+    for i in range(nb_agents):
+        agent_id = db_manager.execute_query("INSERT INTO agents (nom, prenom, ppr, cadre) VALUES (?, ?, ?, ?)", (f"NOM{i}", "Bench", f"{prefix}{i}", "Infirmier"))
+        for annee in (2023, 2024, 2025):
+            db_manager.create_solde_annuel(agent_id, annee, 22.0, SoldeStatus.ACTIF)
+
+def _run(db_path, nb_agents, prefix, in_transaction):
+    db_manager = DatabaseManager(db_path)
+    db_manager.connect()
+    try:
+        start = time.perf_counter()
+        if in_transaction:
+            with db_manager.transaction():
+                _write_agents(db_manager, nb_agents, prefix)
+        else:
+            _write_agents(db_manager, nb_agents, prefix)
+        elapsed = time.perf_counter() - start
+    finally:
+        db_manager.close()
+    statements = nb_agents * 4
+    return {'duree_s': round(elapsed, 4), 'instructions': statements, 'instructions_par_s': round(statements / elapsed, 1)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Débit d'écriture avec et sans unité de travail.")
+    parser.add_argument('--agents', type=int, default=500)
+    parser.add_argument('--output')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "bench.db")
+        db_manager = DatabaseManager(db_path)
+        db_manager.connect()
+        db_manager.run_migrations()
+        db_manager.close()
+
+        autocommit = _run(db_path, args.agents, "AUTO", in_transaction=False)
+        unite_de_travail = _run(db_path, args.agents, "UOW", in_transaction=True)
+
+    results = {
+        'benchmark': 'transactions',
+        'agents': args.agents,
+        'commit_par_instruction': autocommit,
+        'unite_de_travail': unite_de_travail,
+        'acceleration': round(autocommit['duree_s'] / unite_de_travail['duree_s'], 1),
+    }
+    output = json.dumps(results, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    print(output)
+
+if __name__ == '__main__':
+    main()
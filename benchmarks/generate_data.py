@@ -0,0 +1,141 @@
+# Fichier : benchmarks/generate_data.py
+# Génère une base SQLite synthétique et réaliste (agents, congés, soldes, jours fériés)
+# en passant par les migrations de db/migrations, pour mesurer les performances à l'échelle.
+#
+# Usage : python benchmarks/generate_data.py base.db [--agents 20000] [--conges-par-agent 100] [--annees 10]
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.config_loader import load_config, CONFIG
+
+if not CONFIG:
+    load_config(os.path.join(os.path.dirname(__file__), '..', 'config.yaml'))
+
+from db.database import DatabaseManager
+from core.constants import SoldeStatus
+from utils.date_utils import get_business_calendar
+
+NOMS = ["ALAOUI", "BENNANI", "CHRAIBI", "DAOUDI", "EL AMRANI", "FASSI", "GUERRAOUI", "HAJJI", "IDRISSI", "JABRI",
+        "KETTANI", "LAHLOU", "MANSOURI", "NACIRI", "OUAZZANI", "RAMI", "SAIDI", "TAZI", "WAHBI", "ZIANI"]
+PRENOMS = ["Amine", "Brahim", "Fatima", "Hassan", "Imane", "Karim", "Khadija", "Leila", "Mehdi", "Nadia",
+           "Omar", "Rachid", "Salma", "Samir", "Souad", "Youssef", "Zineb", "Yasmine", "Hamza", "Meryem"]
+SERVICES = ["Urgences", "Pédiatrie", "Cardiologie", "Radiologie", "Laboratoire", "Maternité", "Administration", "Pharmacie"]
+SPECIALITES = ["Généraliste", "Chirurgie", "Anesthésie", "Réanimation", "Biologie", None]
+# Jours fériés fixes, enregistrés comme jours personnalisés pour chaque année générée.
+FERIES_FIXES = [(1, 1, "Nouvel an"), (1, 11, "Manifeste de l'indépendance"), (5, 1, "Fête du travail"), (7, 30, "Fête du trône"),
+                (8, 14, "Oued Ed-Dahab"), (8, 20, "Révolution du roi et du peuple"), (8, 21, "Fête de la jeunesse"),
+                (11, 6, "Marche verte"), (11, 18, "Fête de l'indépendance")]
+TYPES_CONGE = [("Congé annuel", 0.70), ("Congé de maladie", 0.20), ("Congé exceptionnel", 0.06), ("Congé de maternité", 0.02), ("Congé de paternité", 0.02)]
+TAUX_INCOHERENCE = 0.01   # Congés annuels dont jours_pris ne correspond pas au calendrier
+TAUX_ARCHIVES = 0.05
+
+
+def _as_sql_datetime(day):
+    # Même format que l'adaptateur datetime de sqlite3 utilisé par l'application.
+    return f"{day.isoformat()} 00:00:00"
+
+def _leave_duration(type_conge, rng):
+    if type_conge == "Congé de maternité": return CONFIG['conges'].get('maternite_duree', 98)
+    if type_conge == "Congé de paternité": return CONFIG['conges'].get('paternite_duree', 15)
+    if type_conge == "Congé annuel": return rng.randint(1, 15)
+    return rng.randint(1, 10)
+
+def generate(db_path, nb_agents=2000, conges_par_agent=20, nb_annees=10, annee_fin=None, seed=42):
+    """
+    Crée (ou écrase) la base db_path et la remplit. Les congés d'un agent ne se chevauchent jamais
+    et s'arrêtent à la fin de annee_fin ; les jours pris des congés annuels suivent le calendrier ouvré.
+    Retourne un résumé (nombre de lignes par table, durée).
+    """
+    rng = random.Random(seed)
+    annee_fin = annee_fin or date.today().year
+    annee_debut = annee_fin - nb_annees + 1
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    started = time.perf_counter()
+
+    db_manager = DatabaseManager(db_path)
+    if not db_manager.connect():
+        raise ConnectionError(f"Impossible de créer la base {db_path}")
+    try:
+        db_manager.run_migrations()
+        grades = CONFIG['ui']['grades']
+        solde_defaut = float(CONFIG['conges'].get('solde_annuel_par_defaut', 22))
+
+        feries = [(date(annee, mois, jour).isoformat(), nom, "Personnalisé") for annee in range(annee_debut, annee_fin + 2) for mois, jour, nom in FERIES_FIXES]
+        calendar = get_business_calendar({date.fromisoformat(d) for d, _, _ in feries})
+
+        agents = []
+        for agent_id in range(1, nb_agents + 1):
+            statut = 'Archivé' if rng.random() < TAUX_ARCHIVES else 'Actif'
+            agents.append((agent_id, rng.choice(NOMS), rng.choice(PRENOMS), f"P{agent_id:07d}", rng.choice(grades), rng.choice("MF"),
+                           rng.choice(SERVICES), rng.choice(SPECIALITES), statut))
+
+        types, poids = zip(*TYPES_CONGE)
+        periode_jours = (date(annee_fin, 12, 31) - date(annee_debut, 1, 1)).days
+        with db_manager.transaction():
+            db_manager.execute_many("INSERT INTO jours_feries_personnalises (date, nom, type) VALUES (?, ?, ?)", feries)
+            db_manager.execute_many("INSERT INTO agents (id, nom, prenom, ppr, cadre, sexe, service_affectation, specialite, statut_agent) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", agents)
+            db_manager.execute_many("INSERT INTO soldes_annuels (agent_id, annee, solde, statut) VALUES (?, ?, ?, ?)",
+                ((agent_id, annee, round(rng.uniform(0, solde_defaut)) if annee < annee_fin else solde_defaut,
+                  str(SoldeStatus.EXPIRE if annee < annee_fin - 2 else SoldeStatus.ACTIF))
+                 for agent_id in range(1, nb_agents + 1) for annee in range(annee_debut, annee_fin + 1)))
+
+            conges, certificats = [], []
+            conge_id = 0
+            for agent_id in range(1, nb_agents + 1):
+                # Des départs répartis uniformément, puis décalés pour éviter tout chevauchement.
+                ecart_moyen = max(2, periode_jours // max(1, conges_par_agent))
+                current = date(annee_debut, 1, 1) + timedelta(days=rng.randrange(ecart_moyen))
+                for _ in range(conges_par_agent):
+                    type_conge = rng.choices(types, poids)[0]
+                    debut = current
+                    fin = debut + timedelta(days=_leave_duration(type_conge, rng) - 1)
+                    if fin.year > annee_fin: break
+                    if type_conge == "Congé annuel":
+                        jours_pris = calendar.count(debut, fin)
+                        if jours_pris == 0: jours_pris = 1
+                        if rng.random() < TAUX_INCOHERENCE: jours_pris += 1
+                    else:
+                        jours_pris = (fin - debut).days + 1
+                    interim_id = rng.randint(1, nb_agents) if rng.random() < 0.2 else None
+                    conge_id += 1
+                    conges.append((conge_id, agent_id, type_conge, None, interim_id if interim_id != agent_id else None,
+                                   _as_sql_datetime(debut), _as_sql_datetime(fin), jours_pris, 'Actif'))
+                    if type_conge == "Congé de maladie" and rng.random() < 0.5:
+                        certificats.append((conge_id, f"certificats/bench_{conge_id}.pdf"))
+                    current = fin + timedelta(days=rng.randint(1, max(1, 2 * ecart_moyen - 14)))
+                if len(conges) >= 50000:
+                    db_manager.execute_many("INSERT INTO conges (id, agent_id, type_conge, justif, interim_id, date_debut, date_fin, jours_pris, statut) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", conges)
+                    conges = []
+            db_manager.execute_many("INSERT INTO conges (id, agent_id, type_conge, justif, interim_id, date_debut, date_fin, jours_pris, statut) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", conges)
+            db_manager.execute_many("INSERT INTO certificats_medicaux (conge_id, chemin_fichier) VALUES (?, ?)", certificats)
+            db_manager.execute_query("REPLACE INTO system_config (config_key, config_value) VALUES ('annee_exercice', ?)", (str(annee_fin),))
+        db_manager.conn.execute("ANALYZE")
+
+        counts = {table: db_manager.execute_query(f"SELECT COUNT(*) FROM {table}", fetch="one")[0]
+                  for table in ("agents", "conges", "soldes_annuels", "jours_feries_personnalises", "certificats_medicaux")}
+    finally:
+        db_manager.close()
+    return {'base': db_path, 'annees': [annee_debut, annee_fin], 'lignes': counts, 'duree_s': round(time.perf_counter() - started, 2)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Génère une base de données synthétique pour les benchmarks.")
+    parser.add_argument('db_path')
+    parser.add_argument('--agents', type=int, default=2000)
+    parser.add_argument('--conges-par-agent', type=int, default=20)
+    parser.add_argument('--annees', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    summary = generate(args.db_path, args.agents, args.conges_par_agent, args.annees, seed=args.seed)
+    print(json.dumps(summary, indent=2, ensure_ascii=False))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+# Fichier : benchmarks/run_benchmarks.py
+# Mesure les points d'entrée principaux sur une base synthétique et produit un rapport JSON
+# comparable d'une version à l'autre (option --compare).
+#
+# Usage :
+#   python benchmarks/run_benchmarks.py --agents 20000 --conges-par-agent 100 --output resultats.json
+#   python benchmarks/run_benchmarks.py --db base_existante.db --compare resultats_precedents.json
+
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT_DIR)
+
+from benchmarks.generate_data import generate
+from utils.config_loader import CONFIG
+from db.database import DatabaseManager
+from core.conges.manager import CongeManager
+from utils import file_utils
+
+# openpyxl / python-docx ne sont importés qu'à l'usage : on vérifie seulement qu'ils sont installés.
+FILE_UTILS_ERROR = next((f"No module named '{m}'" for m in ('openpyxl', 'docx') if importlib.util.find_spec(m) is None), None)
+
+
+def _timed(fn, repetitions=5):
+    samples = []
+    for i in range(repetitions):
+        start = time.perf_counter()
+        fn(i)
+        samples.append((time.perf_counter() - start) * 1000)
+    return {'repetitions': repetitions, 'min_ms': round(min(samples), 3), 'median_ms': round(statistics.median(samples), 3), 'max_ms': round(max(samples), 3)}
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(__file__), capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def _bench_submissions(manager, annee, repetitions):
+    """Un congé annuel de 5 jours ouvrés par répétition, chacun pour un agent différent."""
+    agents, offset = [], 0
+    while len(agents) < repetitions:
+        page = manager.get_all_agents(statut='Actif', limit=repetitions, offset=offset)
+        if not page:
+            raise ValueError(f"{len(agents)} agents actifs avec au moins 5 jours de solde : trop peu pour {repetitions} répétitions "
+                             "(réduire --repetitions ou générer plus d'agents).")
+        agents += [a for a in page if a.get_solde_total_actif() >= 5]
+        offset += len(page)
+    calendar = manager.get_business_calendar(annee, annee)
+    debut = calendar.add_business_days(date(annee, 1, 2), 1)
+    fin = calendar.add_business_days(debut, 5)
+
+    def submit(i):
+        form_data = {'agent_id': agents[i].id, 'type_conge': "Congé annuel", 'date_debut': debut.strftime('%d/%m/%Y'),
+                     'date_fin': fin.strftime('%d/%m/%Y'), 'jours_pris': 5, 'justif': None, 'interim_id': None}
+        manager.handle_conge_submission(form_data, is_modification=False)
+    return submit
+
+def _bench_cold_imports(_):
+    """Import de main.py (et de tout ce qu'il charge au démarrage) dans un interpréteur neuf."""
+    subprocess.run([sys.executable, "-c", "import main"], cwd=ROOT_DIR, check=True, capture_output=True)
+
+def _bench_dashboard(manager):
+    def refresh(_):
+        today = datetime.now().date()
+        manager.get_dashboard_filter_values()
+        counts = manager.get_dashboard_counts()
+        manager.get_leaves_in_progress(today)
+        manager.get_leaves_starting_soon(today)
+        return counts
+    return refresh
+
+def run(db_path, repetitions=5):
+    db_manager = DatabaseManager(db_path)
+    if not db_manager.connect():
+        raise ConnectionError(f"Impossible d'ouvrir {db_path}")
+    work_dir = tempfile.mkdtemp(prefix="bench_conges_")
+    results = {}
+    try:
+        manager = CongeManager(db_manager, os.path.join(work_dir, "certificats"))
+        annee = manager.get_annee_exercice()
+        skipped = {'ignore': f"Dépendance manquante : {FILE_UTILS_ERROR}"} if FILE_UTILS_ERROR else None
+
+        results['demarrage_imports'] = _timed(_bench_cold_imports, repetitions)
+        results['get_agents_page'] = _timed(lambda i: manager.get_all_agents(statut='Actif', limit=50, offset=50 * i), repetitions)
+        # Dernières pages d'une longue liste : OFFSET relit toutes les lignes précédentes, le keyset non.
+        profondeur = max(0, manager.get_agents_count(statut='Actif') - 100)
+        repere = manager.get_all_agents(statut='Actif', limit=1, offset=profondeur)
+        curseur = (repere[0].nom, repere[0].prenom, repere[0].id) if repere else None
+        results['get_agents_page_profonde_offset'] = _timed(lambda i: manager.get_all_agents(statut='Actif', limit=50, offset=profondeur), repetitions)
+        results['get_agents_page_profonde_keyset'] = _timed(lambda i: manager.get_agents_page(statut='Actif', limit=50, cursor=curseur, direction='next'), repetitions)
+        results['get_agents_recherche'] = _timed(lambda i: manager.get_all_agents(statut='Actif', term="ala", limit=50, offset=0), repetitions)
+        results['get_agents_count'] = _timed(lambda i: manager.get_agents_count(statut='Actif', term="ala"), repetitions)
+        results['handle_conge_submission'] = _timed(_bench_submissions(manager, annee + 1, repetitions), repetitions)
+        results['find_inconsistent_annual_leaves'] = _timed(lambda i: manager.find_inconsistent_annual_leaves(annee - 1), repetitions)
+        results['tableau_de_bord'] = _timed(_bench_dashboard(manager), repetitions)
+
+        # CSV : bibliothèque standard, toujours mesurable ; l'import relit le fichier exporté.
+        agents_csv = os.path.join(work_dir, "agents.csv")
+        results['export_agents_csv'] = _timed(lambda i: file_utils.export_dataset(manager, 'agents', agents_csv), 1)
+        results['import_agents_csv'] = _timed(lambda i: file_utils.import_dataset(db_path, manager.certificats_dir, 'agents', agents_csv), 1)
+        conges_csv = os.path.join(work_dir, "conges.csv")
+        results['export_conges_csv'] = _timed(lambda i: file_utils.export_dataset(manager, 'conges', conges_csv), 1)
+
+        if not FILE_UTILS_ERROR:
+            export_path = os.path.join(work_dir, "export_conges.xlsx")
+            results['export_conges_excel'] = _timed(lambda i: file_utils.export_all_conges_to_excel(manager, export_path), 1)
+            agents_path = os.path.join(work_dir, "export_agents.xlsx")
+            file_utils.export_agents_to_excel(manager, agents_path)
+            results['import_agents_excel'] = _timed(lambda i: file_utils.import_agents_from_excel(db_path, manager.certificats_dir, agents_path), 1)
+        else:
+            results['export_conges_excel'] = results['import_agents_excel'] = skipped
+
+        # En dernier : le glissement modifie l'exercice en cours.
+        results['effectuer_glissement_annuel'] = _timed(lambda i: manager.effectuer_glissement_annuel(), 1)
+    finally:
+        db_manager.close()
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return results
+
+def compare(results, previous, seuil):
+    """Ajoute à chaque mesure le rapport avec la version précédente ; renvoie la liste des régressions."""
+    regressions = []
+    for name, mesure in results.items():
+        ancienne = previous.get('resultats', {}).get(name)
+        if not ancienne or 'median_ms' not in ancienne or 'median_ms' not in mesure or not ancienne['median_ms']:
+            continue
+        mesure['ratio_vs_precedent'] = round(mesure['median_ms'] / ancienne['median_ms'], 3)
+        if mesure['ratio_vs_precedent'] > seuil:
+            regressions.append(name)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks des traitements principaux (rapport JSON).")
+    parser.add_argument('--db', help="Base existante à copier (sinon une base synthétique est générée)")
+    parser.add_argument('--agents', type=int, default=2000)
+    parser.add_argument('--conges-par-agent', type=int, default=20)
+    parser.add_argument('--annees', type=int, default=10)
+    parser.add_argument('--repetitions', type=int, default=5)
+    parser.add_argument('--output')
+    parser.add_argument('--compare', help="Rapport JSON d'une version précédente")
+    parser.add_argument('--seuil', type=float, default=1.2, help="Ratio au-delà duquel une mesure est une régression")
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp(prefix="bench_db_")
+    try:
+        db_path = os.path.join(tmp_dir, "bench.db")
+        generation = None
+        if args.db:
+            # Les benchmarks écrivent : on travaille toujours sur une copie.
+            source = sqlite3.connect(args.db)
+            target = sqlite3.connect(db_path)
+            source.backup(target)
+            source.close(); target.close()
+        else:
+            generation = generate(db_path, args.agents, args.conges_par_agent, args.annees)
+        results = run(db_path, args.repetitions)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    report = {
+        'meta': {
+            'date': datetime.now().isoformat(timespec='seconds'),
+            'version_application': CONFIG.get('app', {}).get('version'),
+            'revision': _git_revision(),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'base': args.db or (generation and generation['lignes']),
+        },
+        'resultats': results,
+    }
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            report['regressions'] = compare(results, json.load(f), args.seuil)
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    print(output)
+    if report.get('regressions'):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
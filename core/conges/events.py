@@ -0,0 +1,91 @@
+# Fichier : core/conges/events.py
+# Notifications des modifications publiées par CongeManager : les pages s'y abonnent pour
+# ne relire que les lignes concernées au lieu de reconstruire toute l'interface.
+
+import logging
+from contextlib import contextmanager
+from enum import Enum
+
+class ChangeType(str, Enum):
+    AGENT_SAVED = 'agent_enregistre'        # Création, modification, archivage ou restauration.
+    AGENT_DELETED = 'agent_supprime'
+    LEAVE_ADDED = 'conge_ajoute'
+    LEAVE_REMOVED = 'conge_supprime'
+    SOLDES_CHANGED = 'soldes_modifies'
+    HOLIDAY_CHANGED = 'jour_ferie_modifie'
+    def __str__(self):
+        return self.value
+
+class ChangeEvent:
+    """
+    Une modification d'un type donné. agent_ids=None signifie que tous les agents sont
+    concernés (ex. : glissement annuel) ; annees liste les années des jours fériés modifiés.
+    """
+    def __init__(self, type, agent_ids=(), conge_ids=(), annees=()):
+        self.type = ChangeType(type)
+        self.agent_ids = None if agent_ids is None else frozenset(agent_ids)
+        self.conge_ids = frozenset(conge_ids)
+        self.annees = frozenset(annees)
+
+    def concerns(self, agent_id):
+        return self.agent_ids is None or agent_id in self.agent_ids
+
+    def merge(self, other):
+        agent_ids = None if self.agent_ids is None or other.agent_ids is None else self.agent_ids | other.agent_ids
+        return ChangeEvent(self.type, agent_ids, self.conge_ids | other.conge_ids, self.annees | other.annees)
+
+    def __repr__(self):
+        return f"ChangeEvent({self.type}, agents={self.agent_ids}, conges={set(self.conge_ids)}, annees={set(self.annees)})"
+
+class ChangeBus:
+    """
+    Diffuse les ChangeEvent aux abonnés, dans le thread qui publie (celui de l'interface pour les
+    enregistrements faits depuis les formulaires). Dans un bloc batch(), les événements sont retenus
+    puis diffusés à la sortie du bloc le plus externe, fusionnés par type ; ceux d'un bloc dont sort
+    une exception sont abandonnés, comme la transaction annulée qu'ils décrivent.
+    """
+    def __init__(self):
+        self._subscribers = []
+        self._pending = []
+        self._depth = 0
+
+    def subscribe(self, callback, *types):
+        """Abonne callback(event) aux types donnés (à tous si aucun). Retourne la fonction de désabonnement."""
+        entry = (callback, frozenset(ChangeType(t) for t in types))
+        self._subscribers.append(entry)
+        return lambda: entry in self._subscribers and self._subscribers.remove(entry)
+
+    def publish(self, type, **kwargs):
+        event = ChangeEvent(type, **kwargs)
+        if self._depth:
+            self._pending.append(event)
+        else:
+            self._dispatch([event])
+
+    @contextmanager
+    def batch(self):
+        mark = len(self._pending)
+        self._depth += 1
+        try:
+            yield
+        except BaseException:
+            del self._pending[mark:]
+            raise
+        finally:
+            self._depth -= 1
+        if self._depth == 0:
+            pending, self._pending = self._pending, []
+            self._dispatch(pending)
+
+    def _dispatch(self, events):
+        merged = {}
+        for event in events:
+            merged[event.type] = merged[event.type].merge(event) if event.type in merged else event
+        for event in merged.values():
+            for callback, types in list(self._subscribers):
+                if types and event.type not in types: continue
+                try:
+                    callback(event)
+                except Exception as e:
+                    # Un abonné en erreur ne doit ni empêcher les autres d'être notifiés, ni faire échouer l'enregistrement.
+                    logging.error(f"Échec du traitement de {event} : {e}", exc_info=True)
@@ -0,0 +1,62 @@
+# Fichier : core/conges/holiday_cache.py
+# Cache des jours fériés par année, détenu par CongeManager.
+
+import threading
+
+from utils.date_utils import load_holidays_for_years, get_business_calendar
+
+class HolidayCache:
+    """
+    Conserve les jours fériés déjà chargés, année par année, ainsi que les
+    ensembles et calendriers ouvrés déjà assemblés pour chaque période demandée.
+    Une consultation répétée coûte donc une simple lecture de dictionnaire.
+    Le cache doit être invalidé à chaque modification des jours fériés personnalisés.
+    """
+    def __init__(self):
+        self._years = {}
+        self._periods = {}
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_holidays_set(self, db_manager, start_year, end_year):
+        return self._get_period(db_manager, start_year, end_year)[0]
+
+    def get_calendar(self, db_manager, start_year, end_year):
+        return self._get_period(db_manager, start_year, end_year)[1]
+
+    def _get_period(self, db_manager, start_year, end_year):
+        key = (start_year, end_year)
+        with self._lock:
+            period = self._periods.get(key)
+            if period is not None:
+                self.hits += 1
+                return period
+            self.misses += 1
+            # Même convention que get_holidays_set_for_period : on charge une année de plus.
+            years = range(start_year, end_year + 2)
+            missing = [year for year in years if year not in self._years]
+            if missing:
+                # Une année n'est retenue qu'une fois entièrement chargée : une erreur est propagée sans rien mettre en cache.
+                for year, year_holidays in load_holidays_for_years(db_manager, missing, strict=True).items():
+                    self._years[year] = frozenset(year_holidays)
+            holidays_set = frozenset().union(*(self._years[year] for year in years))
+            period = (holidays_set, get_business_calendar(holidays_set))
+            self._periods[key] = period
+            return period
+
+    def invalidate(self, year=None):
+        """Invalide une année (et les périodes qui la contiennent), ou tout le cache."""
+        with self._lock:
+            if year is None:
+                self._years.clear()
+                self._periods.clear()
+                return
+            self._years.pop(year, None)
+            for start_year, end_year in list(self._periods):
+                if start_year <= year <= end_year + 1:
+                    del self._periods[(start_year, end_year)]
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'years': len(self._years), 'periods': len(self._periods)}
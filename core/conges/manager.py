@@ -5,94 +5,164 @@ import sqlite3
 import logging
 import os
 import shutil
+import time
+import copy
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from tkinter import messagebox
 
-from utils.date_utils import get_holidays_set_for_period, jours_ouvres, validate_date, format_date_for_display
+from utils.date_utils import validate_date, format_date_for_display, calculate_reprise_date
 from utils.config_loader import CONFIG
 from db.models import Conge, SoldeAnnuel
 from core.constants import SoldeStatus, SplitConfirmationRequired, ReplaceConfirmationRequired, TrimConfirmationRequired
+from core.conges.holiday_cache import HolidayCache
+from core.conges.events import ChangeBus, ChangeType
 
 class CongeManager:
     def __init__(self, db_manager, certificats_dir):
         self.db = db_manager
         self.certificats_dir = certificats_dir
+        self.holidays_cache = HolidayCache()
+        # Notifications des modifications (voir core/conges/events.py), auxquelles s'abonnent les pages.
+        self.events = ChangeBus()
         os.makedirs(self.certificats_dir, exist_ok=True)
 
+    @contextmanager
+    def read_only(self):
+        """
+        Copie du gestionnaire adossée à une connexion du pool de lecture (DatabaseManager.reader),
+        pour les traitements d'arrière-plan. Le cache des jours fériés reste partagé.
+        """
+        with self.db.reader() as reader_db:
+            reader = copy.copy(self)
+            reader.db = reader_db
+            yield reader
+
+    @contextmanager
+    def _unit_of_work(self):
+        """Transaction dont les notifications ne sont diffusées qu'une fois validée."""
+        with self.events.batch(), self.db.transaction():
+            yield
+
     # --- Gestion des Agents ---
     def archive_agents(self, agent_ids):
         if not isinstance(agent_ids, list): agent_ids = [agent_ids]
-        return self.db.update_agents_status(agent_ids, 'Archivé')
+        result = self.db.update_agents_status(agent_ids, 'Archivé')
+        self.events.publish(ChangeType.AGENT_SAVED, agent_ids=agent_ids)
+        return result
 
     def restore_agents(self, agent_ids):
         if not isinstance(agent_ids, list): agent_ids = [agent_ids]
-        return self.db.update_agents_status(agent_ids, 'Actif')
+        result = self.db.update_agents_status(agent_ids, 'Actif')
+        self.events.publish(ChangeType.AGENT_SAVED, agent_ids=agent_ids)
+        return result
         
     def delete_agents_permanently(self, agent_ids):
         if not isinstance(agent_ids, list): agent_ids = [agent_ids]
-        return self.db.supprimer_agents_definitivement(agent_ids)
+        result = self.db.supprimer_agents_definitivement(agent_ids)
+        self.events.publish(ChangeType.AGENT_DELETED, agent_ids=agent_ids)
+        return result
 
     # --- Tâches Administratives ---
     def get_annee_exercice(self):
         return self.db.get_annee_exercice()
 
     def effectuer_glissement_annuel(self):
-        self.db.conn.execute('BEGIN TRANSACTION')
-        try:
-            annee_actuelle = self.get_annee_exercice()
-            nouvelle_annee = annee_actuelle + 1
-            annee_a_expirer = annee_actuelle - 2
-            solde_initial = float(CONFIG['conges'].get('solde_annuel_par_defaut', 22.0))
-            all_agents = self.get_all_agents(statut='Actif')
-            for agent in all_agents:
-                self.db.create_solde_annuel(agent.id, nouvelle_annee, solde_initial, SoldeStatus.ACTIF)
-                self.db.execute_query("UPDATE soldes_annuels SET statut = ? WHERE agent_id = ? AND annee = ?",
-                                      (SoldeStatus.EXPIRE, agent.id, annee_a_expirer))
-            self.db.set_annee_exercice(nouvelle_annee)
-            self.db.conn.commit()
-            return True
-        except sqlite3.Error as e:
-            self.db.conn.rollback(); logging.error(f"Échec glissement: {e}", exc_info=True); raise e
+        """
+        Clôture l'exercice en cours par des requêtes ensemblistes (une seule transaction).
+        Retourne un rapport : nouvel exercice, soldes créés/expirés et durée.
+        """
+        debut = time.perf_counter()
+        annee_actuelle = self.get_annee_exercice()
+        nouvelle_annee = annee_actuelle + 1
+        annee_a_expirer = annee_actuelle - 2
+        solde_initial = float(CONFIG['conges'].get('solde_annuel_par_defaut', 22.0))
+        soldes_crees, soldes_expires = self.db.glissement_annuel_soldes(nouvelle_annee, annee_a_expirer, solde_initial)
+        rapport = {
+            'annee_exercice': nouvelle_annee, 'soldes_crees': soldes_crees,
+            'soldes_expires': soldes_expires, 'duree_ms': round((time.perf_counter() - debut) * 1000, 1)
+        }
+        logging.info(f"Glissement annuel vers {nouvelle_annee} : {soldes_crees} soldes créés, "
+                     f"{soldes_expires} soldes expirés en {rapport['duree_ms']} ms.")
+        self.events.publish(ChangeType.SOLDES_CHANGED, agent_ids=None)
+        return rapport
 
     def get_soldes_expires(self):
         return self.db.get_soldes_by_status(SoldeStatus.EXPIRE)
 
     def apurer_soldes(self, solde_ids):
-        return self.db.apurer_soldes_by_ids(solde_ids)
+        result = self.db.apurer_soldes_by_ids(solde_ids)
+        self.events.publish(ChangeType.SOLDES_CHANGED, agent_ids=None)
+        return result
     
     def save_manual_soldes(self, agent_id, updates, creations):
-        self.db.conn.execute('BEGIN TRANSACTION')
         try:
-            for solde_id, new_value in updates.items(): self.db.update_solde_by_id(solde_id, new_value)
-            if creations:
-                annee_exercice = self.get_annee_exercice()
-                for year, value in creations.items():
-                    statut = SoldeStatus.EXPIRE if year < annee_exercice - 2 else SoldeStatus.ACTIF
-                    self.db.create_solde_annuel(agent_id, year, value, statut)
-            self.db.conn.commit()
+            with self._unit_of_work():
+                self.db.update_soldes_by_ids(list(updates.items()))
+                if creations:
+                    annee_exercice = self.get_annee_exercice()
+                    for year, value in creations.items():
+                        statut = SoldeStatus.EXPIRE if year < annee_exercice - 2 else SoldeStatus.ACTIF
+                        self.db.create_solde_annuel(agent_id, year, value, statut)
+                self.events.publish(ChangeType.SOLDES_CHANGED, agent_ids=[agent_id])
             return True
         except sqlite3.Error as e:
-            self.db.conn.rollback(); logging.error(f"Échec MàJ manuelle soldes: {e}", exc_info=True); raise e
+            logging.error(f"Échec MàJ manuelle soldes: {e}", exc_info=True); raise e
 
     # --- Getters ---
     def get_all_agents(self, statut='Actif', **kwargs):
         return self.db.get_agents(statut=statut, **kwargs)
 
+    def get_agents_page(self, statut='Actif', **kwargs):
+        return self.db.get_agents_page(statut=statut, **kwargs)
+
     def get_agents_count(self, statut='Actif', term=None):
         return self.db.get_agents_count(statut=statut, term=term)
 
     def get_agent_by_id(self, agent_id):
         return self.db.get_agent_by_id(agent_id)
 
+    def get_agents_by_ids(self, agent_ids):
+        return self.db.get_agents_by_ids(agent_ids)
+
     def get_all_conges(self):
         return self.db.get_conges()
 
+    def get_conges_count(self):
+        return self.db.get_conges_count()
+
+    # Exports en flux : itérateurs de lignes à consommer sur la même connexion (voir utils.file_utils).
+    def iter_agents_export(self, statut='Actif'):
+        return self.db.iter_agents_export(self.get_annee_exercice(), statut=statut)
+
+    def iter_conges_export(self):
+        return self.db.iter_conges_export()
+
+    def get_soldes_count(self):
+        return self.db.get_soldes_count()
+
+    def iter_soldes_export(self):
+        return self.db.iter_soldes_export()
+
     def get_conges_for_agent(self, agent_id):
         return self.db.get_conges(agent_id=agent_id)
 
     def get_conge_by_id(self, conge_id):
         return self.db.get_conge_by_id(conge_id)
 
+    def get_conges_history(self, agent_id, type_conge=None):
+        """
+        Historique d'un agent prêt à afficher (LigneHistoriqueConge) : une requête pour les congés,
+        certificats et intérimaires, et un seul calendrier couvrant toutes les années pour les dates de reprise.
+        """
+        lignes = self.db.get_conges_history(agent_id, type_conge)
+        annees = [l.conge.date_fin.year for l in lignes if l.conge.date_fin]
+        if annees:
+            calendar = self.get_business_calendar(min(annees), max(annees) + 1)
+            for ligne in lignes:
+                ligne.date_reprise = calculate_reprise_date(ligne.conge.date_fin, calendar)
+        return lignes
+
     def get_certificat_for_conge(self, conge_id):
         return self.db.get_certificat_for_conge(conge_id)
 
@@ -103,43 +173,87 @@ class CongeManager:
         return self.db.get_sick_leaves_by_status(status, search_term)
 
     def get_holidays_set_for_period(self, start_year, end_year):
-        return get_holidays_set_for_period(self.db, start_year, end_year)
+        return self.holidays_cache.get_holidays_set(self.db, start_year, end_year)
+
+    def get_business_calendar(self, start_year, end_year):
+        return self.holidays_cache.get_calendar(self.db, start_year, end_year)
 
     def get_agents_on_leave_today(self):
         return self.db.get_agents_on_leave_today()
 
+    # --- Tableau de bord (agrégats SQL) ---
+    def get_dashboard_counts(self, filtres=None):
+        return self.db.get_dashboard_counts(filtres)
+
+    def get_dashboard_filter_values(self):
+        return self.db.get_dashboard_filter_values()
+
+    def _dashboard_rows(self, rows):
+        return [dict(row, date_debut=validate_date(row['date_debut']).date(), date_fin=validate_date(row['date_fin']).date()) for row in rows]
+
+    def get_leaves_in_progress(self, day, filtres=None):
+        """Congés en cours le jour `day`, avec leur date de reprise (un seul calendrier pour toutes les lignes)."""
+        lignes = self._dashboard_rows(self.db.get_leaves_in_progress(day, filtres))
+        if lignes:
+            calendar = self.get_business_calendar(min(l['date_fin'].year for l in lignes), max(l['date_fin'].year for l in lignes) + 1)
+            for ligne in lignes:
+                ligne['date_reprise'] = calculate_reprise_date(ligne['date_fin'], calendar)
+        return lignes
+
+    def get_conge_ids_starting_between(self, first_day, last_day):
+        """Congés actifs des agents actifs débutant dans la période (ex. : décisions du mois, générées par lots)."""
+        return [r['conge_id'] for r in self.db.get_leaves_starting_between(first_day, last_day)]
+
+    def get_leaves_starting_soon(self, day, nb_jours=7, filtres=None):
+        """Congés débutant après `day` et au plus tard `nb_jours` jours plus tard."""
+        return self._dashboard_rows(self.db.get_leaves_starting_between(day + timedelta(days=1), day + timedelta(days=nb_jours), filtres))
+
     def add_holiday(self, date_sql, name, h_type):
-        return self.db.add_holiday(date_sql, name, h_type)
+        result = self.db.add_holiday(date_sql, name, h_type)
+        self._invalidate_holidays(date_sql)
+        return result
 
     def delete_holiday(self, date_sql):
-        return self.db.delete_holiday(date_sql)
+        result = self.db.delete_holiday(date_sql)
+        self._invalidate_holidays(date_sql)
+        return result
 
     def add_or_update_holiday(self, date_sql, name, h_type):
-        return self.db.add_or_update_holiday(date_sql, name, h_type)
+        result = self.db.add_or_update_holiday(date_sql, name, h_type)
+        self._invalidate_holidays(date_sql)
+        return result
+
+    def _invalidate_holidays(self, date_sql):
+        holiday_date = validate_date(date_sql)
+        self.holidays_cache.invalidate(holiday_date.year if holiday_date else None)
+        self.events.publish(ChangeType.HOLIDAY_CHANGED, annees=[holiday_date.year] if holiday_date else [])
 
     # --- Logique des Soldes ---
     def _debiter_solde(self, agent_id, jours_a_prendre):
         if jours_a_prendre <= 0: return
-        agent = self.get_agent_by_id(agent_id)
-        if agent.get_solde_total_actif() < jours_a_prendre:
-            raise ValueError(f"Solde total insuffisant ({agent.get_solde_total_actif()}j) pour décompter {jours_a_prendre}j.")
+        soldes_actifs = self.db.get_active_soldes(agent_id)
+        solde_total = sum(s.solde for s in soldes_actifs)
+        if solde_total < jours_a_prendre:
+            raise ValueError(f"Solde total insuffisant ({solde_total}j) pour décompter {jours_a_prendre}j.")
         
-        soldes_actifs = sorted([s for s in agent.soldes_annuels if s.statut == SoldeStatus.ACTIF], key=lambda s: s.annee)
+        updates = []
         jours_restants_a_debiter = float(jours_a_prendre)
         for solde_annuel in soldes_actifs:
             if jours_restants_a_debiter < 0.001: break
             jours_pris = min(float(solde_annuel.solde), jours_restants_a_debiter)
             if jours_pris > 0:
-                self.db.update_solde_by_id(solde_annuel.id, solde_annuel.solde - jours_pris)
+                updates.append((solde_annuel.id, solde_annuel.solde - jours_pris))
                 jours_restants_a_debiter -= jours_pris
         if jours_restants_a_debiter > 0.001:
             raise sqlite3.Error("Incohérence de solde détectée lors du débit.")
+        self.db.update_soldes_by_ids(updates)
+        self.events.publish(ChangeType.SOLDES_CHANGED, agent_ids=[agent_id])
 
     def _crediter_solde(self, agent_id, jours_a_rendre):
         if jours_a_rendre <= 0: return
-        agent = self.get_agent_by_id(agent_id)
-        soldes_actifs = sorted([s for s in agent.soldes_annuels if s.statut == SoldeStatus.ACTIF], key=lambda s: s.annee, reverse=True)
+        soldes_actifs = list(reversed(self.db.get_active_soldes(agent_id)))
         
+        nouvelles_valeurs = {}
         jours_restants_a_rendre = float(jours_a_rendre)
         solde_max = float(CONFIG['conges'].get('solde_annuel_par_defaut', 22.0))
 
@@ -147,23 +261,20 @@ class CongeManager:
             if jours_restants_a_rendre < 0.001: break
             jours_a_ajouter = min(jours_restants_a_rendre, solde_max - solde_annuel.solde)
             if jours_a_ajouter > 0:
-                self.db.update_solde_by_id(solde_annuel.id, solde_annuel.solde + jours_a_ajouter)
+                nouvelles_valeurs[solde_annuel.id] = solde_annuel.solde + jours_a_ajouter
                 jours_restants_a_rendre -= jours_a_ajouter
 
         if jours_restants_a_rendre > 0.001 and soldes_actifs:
             solde_plus_recent = soldes_actifs[0]
-            self.db.update_solde_by_id(solde_plus_recent.id, solde_plus_recent.solde + jours_restants_a_rendre)
+            nouvelles_valeurs[solde_plus_recent.id] = nouvelles_valeurs.get(solde_plus_recent.id, solde_plus_recent.solde) + jours_restants_a_rendre
+        self.db.update_soldes_by_ids(list(nouvelles_valeurs.items()))
+        if nouvelles_valeurs: self.events.publish(ChangeType.SOLDES_CHANGED, agent_ids=[agent_id])
 
     def get_deduction_details(self, agent_id, jours_a_prendre):
         if jours_a_prendre <= 0: return {}
-        agent = self.get_agent_by_id(agent_id)
-        if not agent: return {}
-        
         jours_restants = float(jours_a_prendre)
         details = {}
-        soldes_tries = sorted([s for s in agent.soldes_annuels if s.statut == SoldeStatus.ACTIF], key=lambda s: s.annee)
-
-        for solde in soldes_tries:
+        for solde in self.db.get_active_soldes(agent_id):
             if jours_restants < 0.001: break
             jours_pris = min(solde.solde, jours_restants)
             if jours_pris > 0:
@@ -175,21 +286,61 @@ class CongeManager:
 
     def save_full_agent(self, agent_data, is_modification=False):
         try:
-            agent_id = self.db.save_agent(agent_data, is_modification)
-            if not agent_id:
-                raise Exception("La sauvegarde des infos de base de l'agent a échoué.")
-            if not is_modification and 'soldes' in agent_data:
-                for annee, solde_val in agent_data['soldes'].items():
-                    if solde_val > 0:
-                        self.db.create_solde_annuel(agent_id, annee, solde_val, SoldeStatus.ACTIF)
-            cadre = agent_data.get('cadre', '').lower()
-            if "résident" in cadre:
-                profile_data = { 'agent_id': agent_id, 'type_residanat': agent_data.get('type_residanat'), 'statut_contrat': agent_data.get('statut_contrat_resident'), 'date_fin_formation': agent_data.get('date_fin_formation') }
-                self.db.save_resident_profile(profile_data)
+            with self._unit_of_work():
+                agent_id = self.db.save_agent(agent_data, is_modification)
+                if not agent_id:
+                    raise Exception("La sauvegarde des infos de base de l'agent a échoué.")
+                if not is_modification and 'soldes' in agent_data:
+                    for annee, solde_val in agent_data['soldes'].items():
+                        if solde_val > 0:
+                            self.db.create_solde_annuel(agent_id, annee, solde_val, SoldeStatus.ACTIF)
+                cadre = agent_data.get('cadre', '').lower()
+                if "résident" in cadre:
+                    profile_data = { 'agent_id': agent_id, 'type_residanat': agent_data.get('type_residanat'), 'statut_contrat': agent_data.get('statut_contrat_resident'), 'date_fin_formation': agent_data.get('date_fin_formation') }
+                    self.db.save_resident_profile(profile_data)
+                self.events.publish(ChangeType.AGENT_SAVED, agent_ids=[agent_id])
             return True
         except Exception as e:
             logging.error(f"Échec sauvegarde complète agent : {e}", exc_info=True); raise e
 
+    def get_agent_ids_by_ppr(self):
+        return self.db.get_agent_ids_by_ppr()
+
+    def import_agents_bulk(self, nouveaux, modifies):
+        """
+        Enregistre des agents déjà validés en une seule unité de travail (tout ou rien) : insertions et mises à
+        jour par executemany, soldes initiaux des nouveaux agents et profils des résidents en masse.
+        nouveaux : agent_data (nom, prenom, ppr, cadre, soldes) ; modifies : agent_data avec 'id'.
+        Retourne (nombre d'agents ajoutés, nombre d'agents mis à jour).
+        """
+        try:
+            with self._unit_of_work():
+                self.db.insert_agents_bulk(nouveaux)
+                self.db.update_agents_bulk(modifies)
+                self.db.create_soldes_bulk([(a['ppr'], annee, valeur) for a in nouveaux for annee, valeur in a.get('soldes', {}).items() if valeur > 0])
+                self.db.ensure_resident_profiles([a['ppr'] for a in list(nouveaux) + list(modifies) if "résident" in a['cadre'].lower()])
+                self.events.publish(ChangeType.AGENT_SAVED, agent_ids=None)
+            return len(nouveaux), len(modifies)
+        except Exception as e:
+            logging.error(f"Échec de l'import en masse des agents : {e}", exc_info=True); raise e
+
+    def import_soldes_bulk(self, soldes):
+        """Fixe des soldes validés [(agent_id, annee, solde, statut), ...] en une unité de travail."""
+        with self._unit_of_work():
+            self.db.upsert_soldes_bulk(soldes)
+            self.events.publish(ChangeType.SOLDES_CHANGED, agent_ids={agent_id for agent_id, *_ in soldes})
+        return len(soldes)
+
+    def import_conges_bulk(self, conges):
+        """
+        Enregistre un historique de congés validé en une unité de travail. Les soldes ne sont pas débités :
+        ils sont synchronisés par leur propre fichier. Retourne le nombre de congés ajoutés (hors doublons).
+        """
+        with self._unit_of_work():
+            inserted = self.db.insert_conges_bulk(conges)
+            self.events.publish(ChangeType.LEAVE_ADDED, agent_ids={c['agent_id'] for c in conges})
+        return inserted
+
     def handle_conge_submission(self, form_data, is_modification):
         start_date = validate_date(form_data['date_debut'])
         end_date = validate_date(form_data['date_fin'])
@@ -199,19 +350,15 @@ class CongeManager:
             raise ValueError("Dates ou type de congé invalides.")
 
         conge_id_exclu = form_data.get('conge_id') if is_modification else None
-        overlaps = self.db.get_overlapping_leaves(form_data['agent_id'], start_date, end_date, conge_id_exclu)
+        chevauchement = self.db.get_overlap_summary(form_data['agent_id'], start_date, end_date, conge_id_exclu)
         
-        if not overlaps:
-            self.db.conn.execute('BEGIN TRANSACTION')
-            try:
+        if not chevauchement:
+            with self._unit_of_work():
                 self._execute_simple_save(form_data, is_modification)
-                self.db.conn.commit()
-                return True
-            except (ValueError, sqlite3.Error) as e:
-                self.db.conn.rollback(); raise e
+            return True
         
-        if len(overlaps) == 1:
-            conflit = overlaps[0]
+        conflit = chevauchement.conge
+        if chevauchement.nb_conflits == 1:
             if conflit.type_conge == "Congé annuel" and nouveau_type == "Congé annuel":
                 raise ValueError("Un congé annuel ne peut pas chevaucher un autre congé annuel.")
             
@@ -219,23 +366,23 @@ class CongeManager:
             types_prioritaires_split = types_prioritaires + ["Congé de paternité"]
 
             if conflit.type_conge == "Congé annuel":
-                if nouveau_type in types_prioritaires_split and start_date > conflit.date_debut and end_date < conflit.date_fin:
+                if nouveau_type in types_prioritaires_split and chevauchement.est_contenu:
                     msg = f"Ce {nouveau_type.lower()} chevauche un congé annuel. Voulez-vous diviser le congé annuel en deux ?"
                     raise SplitConfirmationRequired(msg, form_data, conflit)
-                if nouveau_type == "Congé de maladie" and start_date == conflit.date_debut and end_date == conflit.date_fin:
+                if nouveau_type == "Congé de maladie" and chevauchement.est_identique:
                     msg = "Un congé annuel existe déjà sur ces dates. Voulez-vous le remplacer par ce congé maladie ?"
                     raise ReplaceConfirmationRequired(msg, form_data, conflit)
-                if nouveau_type in types_prioritaires and start_date <= conflit.date_debut and end_date >= conflit.date_fin:
+                if nouveau_type in types_prioritaires and chevauchement.englobe:
                     msg = "Ce nouveau congé englobe un congé annuel existant. Voulez-vous remplacer l'ancien congé par celui-ci ?"
                     raise ReplaceConfirmationRequired(msg, form_data, conflit)
-                if nouveau_type in types_prioritaires and start_date > conflit.date_debut and start_date <= conflit.date_fin:
+                if nouveau_type in types_prioritaires and chevauchement.chevauche_fin:
                     msg = "Ce nouveau congé chevauche la fin d'un congé annuel. Voulez-vous ajuster le congé annuel existant ?"
                     raise TrimConfirmationRequired(msg, form_data, conflit, 'end')
-                if nouveau_type in types_prioritaires and end_date >= conflit.date_debut and end_date < conflit.date_fin:
+                if nouveau_type in types_prioritaires and chevauchement.chevauche_debut:
                     msg = "Ce nouveau congé chevauche le début d'un congé annuel. Voulez-vous ajuster le congé annuel existant ?"
                     raise TrimConfirmationRequired(msg, form_data, conflit, 'start')
 
-        conflit_bloquant = overlaps[0]
+        conflit_bloquant = conflit
         msg_erreur = (
             "Chevauchement de congés détecté.\n\n"
             f"- Type existant : {conflit_bloquant.type_conge}\n"
@@ -250,39 +397,45 @@ class CongeManager:
             old_conge = self.get_conge_by_id(form_data['conge_id'])
             if old_conge and old_conge.type_conge in CONFIG['conges']['types_decompte_solde']:
                 self._crediter_solde(old_conge.agent_id, old_conge.jours_pris)
-            self.db.supprimer_conge(form_data['conge_id'])
+            self._supprimer_conge(form_data['conge_id'], old_conge.agent_id if old_conge else agent_id)
 
         if type_conge in CONFIG['conges']['types_decompte_solde']:
             self._debiter_solde(agent_id, jours_pris)
 
         conge_model = Conge(id=None, agent_id=agent_id, type_conge=type_conge, justif=form_data.get('justif'), interim_id=form_data.get('interim_id'), date_debut=validate_date(form_data['date_debut']), date_fin=validate_date(form_data['date_fin']), jours_pris=jours_pris)
-        new_conge_id = self.db.ajouter_conge(conge_model)
+        new_conge_id = self._ajouter_conge(conge_model)
         
         if new_conge_id and type_conge == "Congé de maladie": 
             self._handle_certificat_save(form_data, new_conge_id)
         return True
 
     def _create_and_save_leave(self, form_data, leave_type, start_date, end_date, days_to_debit=None):
-        holidays_set = self.get_holidays_set_for_period(start_date.year, end_date.year)
-        
         if days_to_debit is None:
             if leave_type == "Congé annuel":
-                days_to_debit = jours_ouvres(start_date, end_date, holidays_set)
+                days_to_debit = self.get_business_calendar(start_date.year, end_date.year).count(start_date, end_date)
             else:
                 days_to_debit = (end_date - start_date).days + 1
         
         if days_to_debit > 0:
             model = Conge(id=None, agent_id=form_data['agent_id'], type_conge=leave_type, justif=form_data.get('justif'), interim_id=form_data.get('interim_id'), date_debut=start_date, date_fin=end_date, jours_pris=days_to_debit)
-            new_id = self.db.ajouter_conge(model)
+            new_id = self._ajouter_conge(model)
             if leave_type in CONFIG['conges']['types_decompte_solde']:
                 self._debiter_solde(form_data['agent_id'], days_to_debit)
             return new_id
         return None
 
+    def _ajouter_conge(self, conge_model):
+        conge_id = self.db.ajouter_conge(conge_model)
+        self.events.publish(ChangeType.LEAVE_ADDED, agent_ids=[conge_model.agent_id], conge_ids=[conge_id])
+        return conge_id
+
+    def _supprimer_conge(self, conge_id, agent_id):
+        self.db.supprimer_conge(conge_id)
+        self.events.publish(ChangeType.LEAVE_REMOVED, agent_ids=[agent_id], conge_ids=[conge_id])
+
     def execute_split_leave(self, form_data, old_leave):
-        self.db.conn.execute('BEGIN TRANSACTION')
-        try:
-            self.db.supprimer_conge(old_leave.id)
+        with self._unit_of_work():
+            self._supprimer_conge(old_leave.id, old_leave.agent_id)
             self._crediter_solde(old_leave.agent_id, old_leave.jours_pris)
             new_start = validate_date(form_data['date_debut'])
             new_end = validate_date(form_data['date_fin'])
@@ -293,26 +446,18 @@ class CongeManager:
             self._create_and_save_leave(form_data, "Congé annuel", old_leave.date_debut, part1_end)
             part2_start = new_end + timedelta(days=1)
             self._create_and_save_leave(form_data, "Congé annuel", part2_start, old_leave.date_fin)
-            self.db.conn.commit()
-            return True
-        except Exception as e:
-            self.db.conn.rollback(); raise e
+        return True
 
     def execute_replace_leave(self, form_data, old_leave):
-        self.db.conn.execute('BEGIN TRANSACTION')
-        try:
-            self.db.supprimer_conge(old_leave.id)
+        with self._unit_of_work():
+            self._supprimer_conge(old_leave.id, old_leave.agent_id)
             self._crediter_solde(old_leave.agent_id, old_leave.jours_pris)
             self._execute_simple_save(form_data, is_modification=False)
-            self.db.conn.commit()
-            return True
-        except Exception as e:
-            self.db.conn.rollback(); raise e
+        return True
 
     def execute_trim_leave(self, form_data, old_leave, trim_side):
-        self.db.conn.execute('BEGIN TRANSACTION')
-        try:
-            self.db.supprimer_conge(old_leave.id)
+        with self._unit_of_work():
+            self._supprimer_conge(old_leave.id, old_leave.agent_id)
             self._crediter_solde(old_leave.agent_id, old_leave.jours_pris)
             self._execute_simple_save(form_data, is_modification=False)
             
@@ -324,24 +469,16 @@ class CongeManager:
             elif trim_side == 'start':
                 new_annual_start = new_end + timedelta(days=1)
                 self._create_and_save_leave(form_data, "Congé annuel", new_annual_start, old_leave.date_fin)
-
-            self.db.conn.commit()
-            return True
-        except Exception as e:
-            self.db.conn.rollback(); raise e
+        return True
 
     def delete_conge(self, conge_id):
         conge = self.get_conge_by_id(conge_id)
         if not conge: raise ValueError("Congé introuvable.")
-        self.db.conn.execute('BEGIN TRANSACTION')
-        try:
+        with self._unit_of_work():
             if conge.type_conge in CONFIG['conges']['types_decompte_solde']:
                 self._crediter_solde(conge.agent_id, conge.jours_pris)
-            self.db.supprimer_conge(conge_id)
-            self.db.conn.commit()
-            return True
-        except (ValueError, sqlite3.Error) as e:
-            self.db.conn.rollback(); raise e
+            self._supprimer_conge(conge_id, conge.agent_id)
+        return True
 
     def _handle_certificat_save(self, form_data, conge_id):
         source_path = form_data.get('cert_path')
@@ -360,11 +497,11 @@ class CongeManager:
 
     def find_inconsistent_annual_leaves(self, year):
         inconsistencies = []
-        holidays_set = self.get_holidays_set_for_period(year, year + 1)
+        calendar = self.get_business_calendar(year, year + 1)
         all_conges = self.get_all_conges()
         leaves_in_year = [c for c in all_conges if c.type_conge == "Congé annuel" and c.date_debut.year == year and c.statut == 'Actif']
         for conge in leaves_in_year:
-            recalculated_days = jours_ouvres(conge.date_debut, conge.date_fin, holidays_set)
+            recalculated_days = calendar.count(conge.date_debut, conge.date_fin)
             if conge.jours_pris != recalculated_days:
                 inconsistencies.append((conge, recalculated_days))
         return inconsistencies
\ No newline at end of file
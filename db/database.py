@@ -6,31 +6,141 @@ from tkinter import messagebox
 import logging
 import os
 import re
-from datetime import datetime
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
 from collections import defaultdict
 
-from db.models import Agent, Conge, SoldeAnnuel, HistoriqueCarriere, ProfilMedecinResident
+from db.pool import open_connection, ReaderPool
+from db.models import Agent, Conge, SoldeAnnuel, HistoriqueCarriere, ProfilMedecinResident, Chevauchement, LigneHistoriqueConge
 from core.constants import SoldeStatus
 
+def split_sql_script(script):
+    """
+    Découpe un script de migration en instructions complètes. Un ';' ne termine une instruction
+    que si SQLite la juge complète : les corps de triggers (BEGIN ... END) restent entiers.
+    """
+    commands, buffer = [], ""
+    for piece in script.split(';'):
+        buffer += piece + ';'
+        if sqlite3.complete_statement(buffer):
+            if buffer.strip(' \t\r\n;'):
+                commands.append(buffer.strip())
+            buffer = ""
+    return commands
+
+def fts_match_query(term):
+    """
+    Traduit une saisie libre en requête FTS5 : chaque mot devient un préfixe ("mot"*),
+    tous les mots devant être présents. Retourne None si la saisie ne contient aucun mot.
+    """
+    tokens = re.findall(r'\w+', term or "")
+    return " ".join(f'"{token}"*' for token in tokens) or None
+
+# Tris autorisés pour get_agents (clé -> expression SQL). 'solde_<année>' trie sur le solde de l'année.
+AGENT_SORT_EXPRESSIONS = {
+    'nom': "a.nom", 'prenom': "IFNULL(a.prenom, '')", 'ppr': "a.ppr", 'cadre': "a.cadre",
+    'solde_total': f"(SELECT COALESCE(SUM(s.solde), 0) FROM soldes_annuels s WHERE s.agent_id = a.id AND s.statut = '{SoldeStatus.ACTIF}')",
+}
+
+def agent_sort_expression(order_by):
+    """Expression SQL d'une clé de tri de get_agents ; ValueError si la clé n'est pas autorisée."""
+    if order_by in AGENT_SORT_EXPRESSIONS: return AGENT_SORT_EXPRESSIONS[order_by]
+    annee = re.fullmatch(r'solde_(\d{4})', order_by or "")
+    if annee:
+        return f"(SELECT COALESCE(SUM(s.solde), 0) FROM soldes_annuels s WHERE s.agent_id = a.id AND s.annee = {int(annee.group(1))})"
+    raise ValueError(f"Tri des agents non pris en charge : {order_by}")
+
+# Clé de pagination keyset des agents : elle suit l'index idx_agents_statut_tri (prénom NULL -> '').
+AGENT_KEYSET_COLUMNS = ["a.nom", "IFNULL(a.prenom, '')", "a.id"]
+# Nombre maximal de résultats (comptages filtrés, valeurs distinctes) gardés en cache.
+COUNT_CACHE_SIZE = 256
+# Filtres du tableau de bord : clé -> colonne de la table agents.
+DASHBOARD_FILTER_COLUMNS = {'cadre': "a.cadre", 'service': "a.service_affectation", 'specialite': "a.specialite"}
+# Lignes lues à la fois par les exports en flux (iter_*_export) : la mémoire ne dépend pas de la taille de la table.
+EXPORT_BATCH_SIZE = 1000
+
 class DatabaseManager:
     def __init__(self, db_file):
         self.db_file = db_file
         self.conn = None
+        self._transaction_depth = 0
+        self._reader_pool = None
+        self._pool_lock = threading.Lock()
+        self.read_only = False  # Vrai pour les connexions du pool de lecture (PRAGMA query_only).
+        # Résultats calculés sur les agents, valides tant que la version de agents_comptage ne change pas :
+        # clé -> (version, valeur). Partagé avec les connexions de lecture.
+        self._agents_cache = {}
 
     def connect(self):
         try:
-            self.conn = sqlite3.connect(self.db_file, detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES)
-            self.conn.row_factory = sqlite3.Row
-            self.conn.execute("PRAGMA foreign_keys = ON")
+            # PRAGMAs (WAL, synchronous, cache...) lus dans la section db.pragmas de config.yaml.
+            self.conn = open_connection(self.db_file)
             return True
-        except sqlite3.Error as e:
+        except (sqlite3.Error, ValueError) as e:
             messagebox.showerror("Erreur Base de Données", f"Impossible de se connecter : {e}")
             return False
 
     def close(self):
+        if self._reader_pool:
+            self._reader_pool.close()
+            self._reader_pool = None
         if self.conn:
             self.conn.close()
 
+    @contextmanager
+    def reader(self):
+        """
+        Fournit un DatabaseManager adossé à une connexion du pool de lecture, utilisable
+        depuis un thread d'arrière-plan sans bloquer (ni être bloqué par) la connexion principale.
+        Une base en mémoire n'est pas partageable : la connexion principale est alors réutilisée.
+        """
+        if self.db_file == ":memory:":
+            yield self
+            return
+        with self._pool_lock:
+            if self._reader_pool is None:
+                self._reader_pool = ReaderPool(self.db_file)
+            pool = self._reader_pool
+        with pool.connection() as conn:
+            reader_db = DatabaseManager(self.db_file)
+            reader_db.conn = conn
+            reader_db.read_only = True
+            reader_db._agents_cache = self._agents_cache
+            yield reader_db
+
+    @property
+    def in_transaction(self):
+        return self._transaction_depth > 0
+
+    @contextmanager
+    def transaction(self):
+        """
+        Unité de travail : les écritures du bloc sont validées en une seule fois à la sortie
+        du bloc le plus externe, ou toutes annulées si une exception en sort.
+        Un bloc imbriqué pose un SAVEPOINT et n'annule que son propre travail.
+        """
+        cursor = self.conn.cursor()
+        savepoint = f"sp_{self._transaction_depth}" if self._transaction_depth else None
+        cursor.execute(f"SAVEPOINT {savepoint}" if savepoint else "BEGIN")
+        self._transaction_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._transaction_depth -= 1
+            if savepoint:
+                cursor.execute(f"ROLLBACK TO {savepoint}")
+                cursor.execute(f"RELEASE {savepoint}")
+            else:
+                self.conn.rollback()
+            raise
+        else:
+            self._transaction_depth -= 1
+            if savepoint:
+                cursor.execute(f"RELEASE {savepoint}")
+            else:
+                self.conn.commit()
+
     def execute_query(self, query, params=(), fetch=None):
         try:
             cursor = self.conn.cursor()
@@ -39,13 +149,30 @@ class DatabaseManager:
                 return cursor.fetchone()
             if fetch == "all":
                 return cursor.fetchall()
-            self.conn.commit()
+            # Dans une unité de travail, la validation est laissée au bloc le plus externe.
+            if not self.in_transaction:
+                self.conn.commit()
             return cursor.lastrowid
         except sqlite3.Error as e:
-            self.conn.rollback()
+            if not self.in_transaction:
+                self.conn.rollback()
             logging.error(f"Erreur SQL: {query} avec params {params} -> {e}", exc_info=True)
             raise e
 
+    def execute_many(self, query, seq_of_params):
+        """Exécute une même instruction pour une séquence de paramètres (executemany)."""
+        try:
+            cursor = self.conn.cursor()
+            cursor.executemany(query, seq_of_params)
+            if not self.in_transaction:
+                self.conn.commit()
+            return cursor.rowcount
+        except sqlite3.Error as e:
+            if not self.in_transaction:
+                self.conn.rollback()
+            logging.error(f"Erreur SQL (executemany): {query} -> {e}", exc_info=True)
+            raise e
+
     def run_migrations(self):
         self.execute_query("CREATE TABLE IF NOT EXISTS db_version (version INTEGER PRIMARY KEY)")
         current_version_row = self.execute_query("SELECT version FROM db_version", fetch="one")
@@ -66,7 +193,7 @@ class DatabaseManager:
                     with open(script_path, 'r', encoding='utf-8') as f:
                         script = f.read()
                     
-                    sql_commands = [cmd.strip() for cmd in script.split(';') if cmd.strip()]
+                    sql_commands = split_sql_script(script)
                     try:
                         for command in sql_commands:
                             try:
@@ -86,7 +213,10 @@ class DatabaseManager:
     def get_annee_exercice(self):
         result = self.execute_query("SELECT config_value FROM system_config WHERE config_key = 'annee_exercice'", fetch="one")
         if result: return int(result['config_value'])
-        current_year = datetime.now().year; self.set_annee_exercice(current_year); return current_year
+        # Première lecture : l'année en cours est enregistrée, sauf sur une connexion de lecture (export en arrière-plan).
+        current_year = datetime.now().year
+        if not self.read_only: self.set_annee_exercice(current_year)
+        return current_year
 
     def set_annee_exercice(self, annee):
         self.execute_query("REPLACE INTO system_config (config_key, config_value) VALUES ('annee_exercice', ?)", (str(annee),))
@@ -102,6 +232,16 @@ class DatabaseManager:
     def update_solde_by_id(self, solde_id, new_value):
         self.execute_query("UPDATE soldes_annuels SET solde = ? WHERE id = ?", (new_value, solde_id))
 
+    def update_soldes_by_ids(self, updates):
+        """Applique plusieurs mises à jour de soldes en une seule instruction. updates : [(solde_id, nouvelle_valeur), ...]"""
+        if not updates: return
+        self.execute_many("UPDATE soldes_annuels SET solde = ? WHERE id = ?", [(valeur, solde_id) for solde_id, valeur in updates])
+
+    def get_active_soldes(self, agent_id):
+        """Soldes actifs d'un agent, triés par année, sans charger le reste de sa fiche."""
+        query = "SELECT id, agent_id, annee, solde, statut FROM soldes_annuels WHERE agent_id = ? AND statut = ? ORDER BY annee"
+        return [SoldeAnnuel.from_db_row(r) for r in self.execute_query(query, (agent_id, str(SoldeStatus.ACTIF)), fetch="all")]
+
     # --- MÉTHODE AJOUTÉE ---
     def create_solde_annuel(self, agent_id, annee, solde_valeur, statut):
         """
@@ -113,19 +253,86 @@ class DatabaseManager:
         return self.execute_query(query, params)
     # --- FIN DE L'AJOUT ---
 
-    def get_agents(self, statut='Actif', term=None, limit=None, offset=None, exclude_id=None):
-        q = "SELECT id, nom, prenom, ppr, cadre, statut_agent FROM agents"
-        p = [statut]
-        c = ["statut_agent = ?"]
-        if term: t = f"%{term.lower()}%"; c.append("(LOWER(nom) LIKE ? OR LOWER(prenom) LIKE ? OR LOWER(ppr) LIKE ?)"); p.extend([t, t, t])
-        if exclude_id is not None: c.append("id != ?"); p.append(exclude_id)
-        q += " WHERE " + " AND ".join(c) + " ORDER BY nom, prenom"
+    def glissement_annuel_soldes(self, nouvelle_annee, annee_a_expirer, solde_initial):
+        """
+        Clôture ensembliste de l'exercice, dans une seule transaction :
+        crée le solde de la nouvelle année pour tous les agents actifs qui ne l'ont pas encore,
+        expire les soldes de l'année annee_a_expirer et enregistre le nouvel exercice.
+        Retourne (nombre de soldes créés, nombre de soldes expirés).
+        """
+        try:
+            with self.transaction():
+                cursor = self.conn.cursor()
+                cursor.execute("""
+                    INSERT INTO soldes_annuels (agent_id, annee, solde, statut)
+                    SELECT a.id, ?, ?, ? FROM agents a
+                    WHERE a.statut_agent = 'Actif'
+                      AND NOT EXISTS (SELECT 1 FROM soldes_annuels s WHERE s.agent_id = a.id AND s.annee = ?)""",
+                    (nouvelle_annee, solde_initial, str(SoldeStatus.ACTIF), nouvelle_annee))
+                soldes_crees = cursor.rowcount
+                cursor.execute("""
+                    UPDATE soldes_annuels SET statut = ?
+                    WHERE annee = ? AND statut = ?
+                      AND agent_id IN (SELECT id FROM agents WHERE statut_agent = 'Actif')""",
+                    (str(SoldeStatus.EXPIRE), annee_a_expirer, str(SoldeStatus.ACTIF)))
+                soldes_expires = cursor.rowcount
+                cursor.execute("REPLACE INTO system_config (config_key, config_value) VALUES ('annee_exercice', ?)", (str(nouvelle_annee),))
+            return soldes_crees, soldes_expires
+        except sqlite3.Error as e:
+            logging.error(f"Échec du glissement annuel des soldes vers {nouvelle_annee}: {e}", exc_info=True)
+            raise e
+
+    def get_agents(self, statut='Actif', term=None, limit=None, offset=None, exclude_id=None, order_by=None, descending=False):
+        q = "SELECT a.id, a.nom, a.prenom, a.ppr, a.cadre, a.statut_agent FROM agents a"
+        p = []
+        c = ["a.statut_agent = ?"]
+        order = "a.nom, a.prenom"
+        match = fts_match_query(term)
+        if match:
+            # Recherche classée : les meilleurs résultats (bm25) d'abord, puis l'ordre alphabétique.
+            q += " JOIN agents_fts f ON f.rowid = a.id"; c.insert(0, "agents_fts MATCH ?"); p.append(match)
+            order = "f.rank, " + order
+        if order_by:
+            # Tri explicite (en-tête de colonne) : prioritaire sur le classement de la recherche.
+            order = ", ".join(f"{k} {'DESC' if descending else 'ASC'}" for k in [agent_sort_expression(order_by)] + AGENT_KEYSET_COLUMNS)
+        p.append(statut)
+        if exclude_id is not None: c.append("a.id != ?"); p.append(exclude_id)
+        q += " WHERE " + " AND ".join(c) + " ORDER BY " + order
         if limit is not None: q += " LIMIT ? OFFSET ?"; p.extend([limit, offset])
         
         agents_rows = self.execute_query(q, tuple(p), fetch="all")
         if not agents_rows: return []
-        
-        agents = [Agent.from_db_row(r) for r in agents_rows]
+        return self._attach_soldes([Agent.from_db_row(r) for r in agents_rows])
+
+    def get_agents_page(self, statut='Actif', term=None, limit=50, cursor=None, direction='next', order_by=None, descending=False):
+        """
+        Page d'agents en pagination « keyset » : au lieu d'un OFFSET, qui relit toutes les lignes
+        des pages précédentes, la requête reprend à la clé de tri (nom, prénom, id) d'une ligne déjà
+        vue, précédée de la colonne triée s'il y en a une.
+        direction : 'next' (après cursor), 'prev' (avant cursor) ou 'start' (à partir de cursor inclus,
+        pour réafficher la page courante). Sans cursor, renvoie la première page.
+        Retourne (agents, curseur de la première ligne, curseur de la dernière ligne).
+        """
+        keys = ([agent_sort_expression(order_by)] if order_by else []) + AGENT_KEYSET_COLUMNS
+        backwards = direction == 'prev'
+        ascending = descending == backwards
+        q = f"SELECT a.id, a.nom, a.prenom, a.ppr, a.cadre, a.statut_agent, {', '.join(f'{k} AS k{i}' for i, k in enumerate(keys))} FROM agents a"
+        c, p = ["a.statut_agent = ?"], [statut]
+        match = fts_match_query(term)
+        if match: c.append("a.id IN (SELECT rowid FROM agents_fts WHERE agents_fts MATCH ?)"); p.append(match)
+        if cursor is not None:
+            operator = ('>' if ascending else '<') + ('=' if direction == 'start' else '')
+            c.append(f"({', '.join(keys)}) {operator} ({', '.join('?' for _ in keys)})"); p.extend(cursor)
+        q += " WHERE " + " AND ".join(c) + " ORDER BY " + ", ".join(f"{k} {'ASC' if ascending else 'DESC'}" for k in keys) + " LIMIT ?"
+        p.append(limit)
+
+        rows = self.execute_query(q, tuple(p), fetch="all")
+        if backwards: rows = rows[::-1]
+        if not rows: return [], None, None
+        cursor_of = lambda row: tuple(row[f"k{i}"] for i in range(len(keys)))
+        return self._attach_soldes([Agent.from_db_row(r) for r in rows]), cursor_of(rows[0]), cursor_of(rows[-1])
+
+    def _attach_soldes(self, agents):
         agent_ids = [agent.id for agent in agents]
         if not agent_ids: return agents
         
@@ -137,6 +344,13 @@ class DatabaseManager:
         for agent in agents: agent.soldes_annuels = soldes_map.get(agent.id, [])
         return agents
 
+    def get_agents_by_ids(self, agent_ids):
+        """Agents donnés (mêmes colonnes et soldes que get_agents), pour mettre à jour quelques lignes d'une liste."""
+        agent_ids = list(agent_ids)
+        if not agent_ids: return []
+        q = f"SELECT a.id, a.nom, a.prenom, a.ppr, a.cadre, a.statut_agent FROM agents a WHERE a.id IN ({','.join('?' for _ in agent_ids)}) ORDER BY a.nom, a.prenom"
+        return self._attach_soldes([Agent.from_db_row(r) for r in self.execute_query(q, tuple(agent_ids), fetch="all")])
+
     def get_agent_by_id(self, agent_id):
         query = "SELECT * FROM agents WHERE id=?"
         row_dict = self.execute_query(query, (agent_id,), fetch="one")
@@ -153,12 +367,28 @@ class DatabaseManager:
         return agent
 
     def get_agents_count(self, statut='Actif', term=None):
-        q = "SELECT COUNT(*) as count FROM agents"
-        p = [statut]
-        c = ["statut_agent = ?"]
-        if term: t = f"%{term.lower()}%"; c.append("(LOWER(nom) LIKE ? OR LOWER(prenom) LIKE ? OR LOWER(ppr) LIKE ?)"); p.extend([t, t, t])
-        q += " WHERE " + " AND ".join(c)
-        return self.execute_query(q, tuple(p), fetch="one")['count']
+        """
+        Sans recherche, le nombre est lu dans agents_comptage (tenu à jour par triggers).
+        Avec recherche, le COUNT(*) est mis en cache et réutilisé tant que la version du statut
+        dans agents_comptage n'a pas changé (aucun agent de ce statut ajouté, modifié ou supprimé).
+        """
+        nb, version = self._agents_version(statut)
+        match = fts_match_query(term)
+        if not match: return nb
+        q = "SELECT COUNT(*) as count FROM agents WHERE statut_agent = ? AND id IN (SELECT rowid FROM agents_fts WHERE agents_fts MATCH ?)"
+        return self._cached(('count', statut, match), version, lambda: self.execute_query(q, (statut, match), fetch="one")['count'])
+
+    def _agents_version(self, statut):
+        row = self.execute_query("SELECT nb, version FROM agents_comptage WHERE statut_agent = ?", (statut,), fetch="one")
+        return (row['nb'], row['version']) if row else (0, 0)
+
+    def _cached(self, key, version, compute):
+        cached = self._agents_cache.get(key)
+        if cached and cached[0] == version: return cached[1]
+        value = compute()
+        if len(self._agents_cache) >= COUNT_CACHE_SIZE: self._agents_cache.clear()
+        self._agents_cache[key] = (version, value)
+        return value
 
     def save_agent(self, agent_data, is_modification=False):
         if isinstance(agent_data.get('date_prise_service'), datetime): agent_data['date_prise_service'] = agent_data['date_prise_service'].strftime('%Y-%m-%d')
@@ -179,6 +409,34 @@ class DatabaseManager:
             params = tuple(agent_data.get(k) for k in common_fields)
             return self.execute_query(query, params)
 
+    # --- Import en masse (utils.file_utils.import_agents_from_excel) : une instruction par type d'écriture ---
+    def get_agent_ids_by_ppr(self):
+        """Index PPR -> id de tous les agents, lu en une requête pour rapprocher un fichier importé."""
+        return {r['ppr']: r['id'] for r in self.execute_query("SELECT ppr, id FROM agents", fetch="all")}
+
+    def insert_agents_bulk(self, agents):
+        """Insère les agents (dictionnaires nom, prenom, ppr, cadre) en un seul executemany."""
+        if not agents: return 0
+        return self.execute_many("INSERT INTO agents (nom, prenom, ppr, cadre) VALUES (?, ?, ?, ?)",
+                                 [(a['nom'], a['prenom'], a['ppr'], a['cadre']) for a in agents])
+
+    def update_agents_bulk(self, agents):
+        """Met à jour nom, prénom et cadre des agents (identifiés par 'id') ; les autres colonnes sont conservées."""
+        if not agents: return 0
+        return self.execute_many("UPDATE agents SET nom = ?, prenom = ?, cadre = ? WHERE id = ?",
+                                 [(a['nom'], a['prenom'], a['cadre'], a['id']) for a in agents])
+
+    def create_soldes_bulk(self, soldes):
+        """Crée des soldes actifs. soldes : [(ppr, annee, valeur), ...] ; l'agent est retrouvé par son PPR (index unique)."""
+        if not soldes: return 0
+        return self.execute_many("INSERT INTO soldes_annuels (agent_id, annee, solde, statut) VALUES ((SELECT id FROM agents WHERE ppr = ?), ?, ?, ?)",
+                                 [(ppr, annee, valeur, str(SoldeStatus.ACTIF)) for ppr, annee, valeur in soldes])
+
+    def ensure_resident_profiles(self, pprs):
+        """Crée le profil résident (vide) des agents qui n'en ont pas encore ; un profil existant n'est pas modifié."""
+        if not pprs: return 0
+        return self.execute_many("INSERT OR IGNORE INTO profil_medecin_resident (agent_id) SELECT id FROM agents WHERE ppr = ?", [(ppr,) for ppr in pprs])
+
     def supprimer_agent(self, agent_id):
         return self.execute_query("DELETE FROM agents WHERE id=?", (agent_id,))
     
@@ -214,6 +472,114 @@ class DatabaseManager:
         else: q += " ORDER BY date_debut DESC"
         return [Conge.from_db_row(r) for r in self.execute_query(q, p, fetch="all") if r]
 
+    def _iter_rows(self, query, params=(), batch_size=EXPORT_BATCH_SIZE):
+        """Parcourt le résultat par lots (fetchmany) sur un curseur dédié, sans le charger en entier."""
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows: return
+                yield from rows
+        finally:
+            cursor.close()
+
+    def iter_agents_export(self, annee_exercice, statut='Actif', batch_size=EXPORT_BATCH_SIZE):
+        """
+        Agents d'un statut avec leurs soldes actifs des trois derniers exercices et leur solde actif total,
+        dans l'ordre alphabétique. Le regroupement suit idx_agents_statut_tri : aucune étape de tri.
+        """
+        q = f"""
+            SELECT a.id, a.nom, a.prenom, a.ppr, a.cadre,
+                   COALESCE(SUM(CASE WHEN s.annee = ?1 THEN s.solde END), 0) AS solde_n2,
+                   COALESCE(SUM(CASE WHEN s.annee = ?2 THEN s.solde END), 0) AS solde_n1,
+                   COALESCE(SUM(CASE WHEN s.annee = ?3 THEN s.solde END), 0) AS solde_n,
+                   COALESCE(SUM(s.solde), 0) AS solde_total
+            FROM agents a
+            LEFT JOIN soldes_annuels s ON s.agent_id = a.id AND s.statut = '{SoldeStatus.ACTIF}'
+            WHERE a.statut_agent = ?4
+            GROUP BY {", ".join(AGENT_KEYSET_COLUMNS)} ORDER BY {", ".join(AGENT_KEYSET_COLUMNS)}"""
+        return self._iter_rows(q, (annee_exercice - 2, annee_exercice - 1, annee_exercice, statut), batch_size)
+
+    def get_conges_count(self):
+        return self.execute_query("SELECT COUNT(*) AS count FROM conges", fetch="one")['count']
+
+    def iter_conges_export(self, batch_size=EXPORT_BATCH_SIZE):
+        """
+        Tous les congés, du plus récent au plus ancien, avec l'agent et l'intérimaire ; dates au format JJ/MM/AAAA
+        (debut, fin) et ISO (date_debut, date_fin).
+        Parcours de l'index idx_conges_debut : les lignes arrivent sans étape de tri préalable.
+        """
+        q = """
+            SELECT a.nom AS agent_nom, a.prenom AS agent_prenom, a.ppr AS agent_ppr, c.type_conge,
+                   strftime('%d/%m/%Y', c.date_debut) AS debut, strftime('%d/%m/%Y', c.date_fin) AS fin,
+                   date(c.date_debut) AS date_debut, date(c.date_fin) AS date_fin,
+                   c.jours_pris, c.statut, c.justif, c.interim_id, i.nom AS interim_nom, i.prenom AS interim_prenom, i.ppr AS interim_ppr
+            FROM conges c
+            LEFT JOIN agents a ON a.id = c.agent_id
+            LEFT JOIN agents i ON i.id = c.interim_id
+            ORDER BY c.date_debut DESC"""
+        return self._iter_rows(q, (), batch_size)
+
+    def get_soldes_count(self):
+        return self.execute_query("SELECT COUNT(*) AS count FROM soldes_annuels", fetch="one")['count']
+
+    def iter_soldes_export(self, batch_size=EXPORT_BATCH_SIZE):
+        """Tous les soldes annuels (ppr, nom, prenom, annee, solde, statut), regroupés par agent."""
+        q = """
+            SELECT a.ppr, a.nom, a.prenom, s.annee, s.solde, s.statut
+            FROM soldes_annuels s JOIN agents a ON a.id = s.agent_id
+            ORDER BY s.agent_id, s.annee"""
+        return self._iter_rows(q, (), batch_size)
+
+    def upsert_soldes_bulk(self, soldes):
+        """
+        Fixe les soldes donnés : [(agent_id, annee, solde, statut), ...]. Le solde existant d'une année est
+        mis à jour, les autres sont créés (deux executemany).
+        """
+        if not soldes: return 0
+        params = [(solde, str(statut), agent_id, annee) for agent_id, annee, solde, statut in soldes]
+        self.execute_many("UPDATE soldes_annuels SET solde = ?1, statut = ?2 WHERE agent_id = ?3 AND annee = ?4", params)
+        self.execute_many("""
+            INSERT INTO soldes_annuels (agent_id, annee, solde, statut) SELECT ?3, ?4, ?1, ?2
+            WHERE NOT EXISTS (SELECT 1 FROM soldes_annuels WHERE agent_id = ?3 AND annee = ?4)""", params)
+        return len(soldes)
+
+    def insert_conges_bulk(self, conges):
+        """
+        Insère des congés (dictionnaires aux colonnes de la table conges) en un executemany. Un congé déjà
+        présent (même agent, type et dates) est ignoré : réimporter un fichier ne crée pas de doublons.
+        Retourne le nombre de congés insérés.
+        """
+        if not conges: return 0
+        def day(value):
+            # Jour à minuit (écrit 'AAAA-MM-JJ 00:00:00', comme les congés saisis) et sa forme 'AAAA-MM-JJ'.
+            value = datetime(value.year, value.month, value.day)
+            return value, value.date().isoformat()
+        params = []
+        for c in conges:
+            (debut, debut_iso), (fin, fin_iso) = day(c['date_debut']), day(c['date_fin'])
+            params.append((c['agent_id'], c['type_conge'], c.get('justif'), c.get('interim_id'), debut, fin, c['jours_pris'], c.get('statut', 'Actif'), debut_iso, fin_iso))
+        # Colonnes comparées telles quelles (sans date()) : le doublon est cherché par index.
+        return self.execute_many("""
+            INSERT INTO conges (agent_id, type_conge, justif, interim_id, date_debut, date_fin, jours_pris, statut)
+            SELECT ?1, ?2, ?3, ?4, ?5, ?6, ?7, ?8
+            WHERE NOT EXISTS (SELECT 1 FROM conges WHERE agent_id = ?1 AND type_conge = ?2
+                              AND date_debut IN (?5, ?9) AND date_fin IN (?6, ?10))""", params)
+
+    def get_conges_history(self, agent_id, type_conge=None):
+        """Congés d'un agent avec leur certificat et le nom de l'intérimaire, en une seule requête."""
+        q = """
+            SELECT c.*, cm.chemin_fichier AS chemin_certificat, i.nom AS interim_nom, i.prenom AS interim_prenom
+            FROM conges c
+            LEFT JOIN certificats_medicaux cm ON cm.conge_id = c.id
+            LEFT JOIN agents i ON i.id = c.interim_id
+            WHERE c.agent_id = ?"""
+        p = [agent_id]
+        if type_conge: q += " AND c.type_conge = ?"; p.append(type_conge)
+        q += " ORDER BY c.date_debut DESC"
+        return [LigneHistoriqueConge.from_db_row(r) for r in self.execute_query(q, tuple(p), fetch="all")]
+
     def get_conge_by_id(self, conge_id):
         r = self.execute_query("SELECT * FROM conges WHERE id=?", (conge_id,), fetch="one")
         return Conge.from_db_row(r) if r else None
@@ -224,8 +590,34 @@ class DatabaseManager:
         if conge_id_exclu: q += " AND id != ?"; p.append(conge_id_exclu)
         return [Conge.from_db_row(r) for r in self.execute_query(q, tuple(p), fetch="all") if r]
 
+    def get_overlap_summary(self, agent_id, start_date, end_date, conge_id_exclu=None):
+        """
+        Chevauchements avec la période [start_date, end_date] en une seule requête : None s'il n'y en a aucun,
+        sinon un Chevauchement (premier conflit par date, nombre total de conflits et position de la période
+        demandée par rapport à ce conflit). Seul le conflit retenu est converti en objet Conge.
+        """
+        q = """
+            SELECT c.*, COUNT(*) OVER () AS nb_conflits,
+                   date(?1) > date(c.date_debut) AND date(?2) < date(c.date_fin) AS est_contenu,
+                   date(?1) = date(c.date_debut) AND date(?2) = date(c.date_fin) AS est_identique,
+                   date(?1) <= date(c.date_debut) AND date(?2) >= date(c.date_fin) AS englobe,
+                   date(?1) > date(c.date_debut) AND date(?1) <= date(c.date_fin) AS chevauche_fin,
+                   date(?2) >= date(c.date_debut) AND date(?2) < date(c.date_fin) AS chevauche_debut
+            FROM conges c
+            WHERE c.agent_id = ?3 AND c.statut = 'Actif' AND c.date_fin >= ?1 AND c.date_debut <= ?2"""
+        p = [start_date, end_date, agent_id]
+        if conge_id_exclu: q += " AND c.id != ?4"; p.append(conge_id_exclu)
+        q += " ORDER BY c.date_debut LIMIT 1"
+        return Chevauchement.from_db_row(self.execute_query(q, tuple(p), fetch="one"))
+
     def get_holidays_for_year(self, year):
-        return self.execute_query("SELECT date, nom, type FROM jours_feries_personnalises WHERE strftime('%Y', date) = ? ORDER BY date", (str(year),), fetch="all")
+        return self.get_holidays_between(f"{int(year)}-01-01", f"{int(year)}-12-31")
+
+    def get_holidays_between(self, start, end):
+        """Jours fériés personnalisés entre deux dates incluses, en une seule recherche sur l'index de la date."""
+        start, end = [d.strftime('%Y-%m-%d') if hasattr(d, 'strftime') else str(d) for d in (start, end)]
+        query = "SELECT date, nom, type FROM jours_feries_personnalises WHERE date >= ? AND date < date(?, '+1 day') ORDER BY date"
+        return self.execute_query(query, (start, end), fetch="all")
         
     def get_certificat_for_conge(self, conge_id):
         return self.execute_query("SELECT * FROM certificats_medicaux WHERE conge_id = ?", (conge_id,), fetch="one")
@@ -254,20 +646,69 @@ class DatabaseManager:
         if status == 'manquant': join = "LEFT JOIN certificats_medicaux cm ON c.id = cm.conge_id"; clauses.append("cm.id IS NULL")
         elif status == 'justifie': join = "INNER JOIN certificats_medicaux cm ON c.id = cm.conge_id"
         else: join = "LEFT JOIN certificats_medicaux cm ON c.id = cm.conge_id"
-        if search_term:
-            term = f"%{search_term.lower()}%"
-            clauses.append("(LOWER(a.nom) LIKE ? OR LOWER(a.prenom) LIKE ? OR LOWER(a.ppr) LIKE ?)")
-            params.extend([term, term, term])
+        match = fts_match_query(search_term)
+        if match:
+            clauses.append("a.id IN (SELECT rowid FROM agents_fts WHERE agents_fts MATCH ?)")
+            params.append(match)
         return self.execute_query(f"{base} {join} WHERE {' AND '.join(clauses)} ORDER BY c.date_debut DESC", tuple(params), fetch="all")
     
     def get_agents_on_leave_today(self):
         query = """
             SELECT a.nom, a.prenom, a.ppr, c.type_conge, c.date_fin
             FROM conges c JOIN agents a ON c.agent_id = a.id
-            WHERE a.statut_agent = 'Actif' AND c.statut = 'Actif' AND date('now', 'localtime') BETWEEN date(c.date_debut) AND date(c.date_fin)
+            WHERE a.statut_agent = 'Actif' AND c.statut = 'Actif'
+              AND c.date_debut < date('now', 'localtime', '+1 day') AND c.date_fin >= date('now', 'localtime')
             ORDER BY a.nom, a.prenom"""
         return self.execute_query(query, fetch="all")
         
+    # --- Tableau de bord : agrégats et listes calculés en SQL ---
+    def _dashboard_filters(self, filtres):
+        c, p = [], []
+        for key, value in (filtres or {}).items():
+            if key not in DASHBOARD_FILTER_COLUMNS: raise ValueError(f"Filtre du tableau de bord inconnu : {key}")
+            if value: c.append(f"{DASHBOARD_FILTER_COLUMNS[key]} = ?"); p.append(value)
+        return "".join(f" AND {clause}" for clause in c), p
+
+    def get_dashboard_counts(self, filtres=None):
+        """Nombre d'agents actifs correspondant aux filtres, et de leurs congés actifs."""
+        where, p = self._dashboard_filters(filtres)
+        query = f"""
+            SELECT COUNT(*) AS agents_actifs, COALESCE(SUM(nb_conges), 0) AS conges_actifs FROM (
+                SELECT (SELECT COUNT(*) FROM conges c WHERE c.agent_id = a.id AND c.statut = 'Actif') AS nb_conges
+                FROM agents a WHERE a.statut_agent = 'Actif'{where})"""
+        row = self.execute_query(query, tuple(p), fetch="one")
+        return {'agents_actifs': row['agents_actifs'], 'conges_actifs': row['conges_actifs']}
+
+    def get_leaves_in_progress(self, day, filtres=None):
+        """Congés actifs en cours le jour `day` (date) des agents actifs correspondant aux filtres."""
+        where, p = self._dashboard_filters(filtres)
+        # CROSS JOIN : SQLite part des congés non terminés (idx_conges_statut_fin), peu nombreux,
+        # plutôt que de parcourir l'historique de chaque agent actif.
+        query = f"""
+            SELECT a.id AS agent_id, a.nom, a.prenom, a.ppr, c.id AS conge_id, c.type_conge, c.date_debut, c.date_fin
+            FROM conges c CROSS JOIN agents a ON c.agent_id = a.id
+            WHERE c.statut = 'Actif' AND c.date_fin >= ? AND c.date_debut < ? AND a.statut_agent = 'Actif'{where}
+            ORDER BY a.nom, a.prenom"""
+        return self.execute_query(query, (day.isoformat(), (day + timedelta(days=1)).isoformat(), *p), fetch="all")
+
+    def get_leaves_starting_between(self, first_day, last_day, filtres=None):
+        """Congés actifs débutant entre first_day et last_day inclus, des agents actifs correspondant aux filtres."""
+        where, p = self._dashboard_filters(filtres)
+        query = f"""
+            SELECT a.id AS agent_id, a.nom, a.prenom, a.ppr, c.id AS conge_id, c.type_conge, c.date_debut, c.date_fin
+            FROM conges c CROSS JOIN agents a ON c.agent_id = a.id
+            WHERE c.statut = 'Actif' AND c.date_debut >= ? AND c.date_debut < ? AND a.statut_agent = 'Actif'{where}
+            ORDER BY c.date_debut, a.nom, a.prenom"""
+        return self.execute_query(query, (first_day.isoformat(), (last_day + timedelta(days=1)).isoformat(), *p), fetch="all")
+
+    def get_dashboard_filter_values(self):
+        """Valeurs distinctes (agents actifs) de chaque filtre ; recalculées seulement si les agents ont changé."""
+        _, version = self._agents_version('Actif')
+        def compute():
+            return {key: [r[0] for r in self.execute_query(f"SELECT DISTINCT {column} FROM agents a WHERE a.statut_agent = 'Actif' AND {column} IS NOT NULL AND {column} != '' ORDER BY 1", fetch="all")]
+                    for key, column in DASHBOARD_FILTER_COLUMNS.items()}
+        return self._cached(('distinct',), version, compute)
+
     def add_history_event(self, event_data):
         if isinstance(event_data.get('date_evenement'), datetime): event_data['date_evenement'] = event_data['date_evenement'].strftime('%Y-%m-%d')
         query = """INSERT INTO historique_carrieres (agent_id, date_evenement, type_evenement, service_affectation, specialite, centre_formation, details) VALUES (?, ?, ?, ?, ?, ?, ?)"""
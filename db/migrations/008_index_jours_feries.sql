@@ -0,0 +1,10 @@
+-- Fichier : db/migrations/008_index_jours_feries.sql
+-- Description : Aucune modification (numéro de version conservé).
+-- Les recherches de jours fériés personnalisés se font par intervalle (date >= ? AND date < ?) au lieu de
+-- strftime('%Y', date). La colonne date étant la clé primaire de la table, son index automatique
+-- (sqlite_autoindex_jours_feries_personnalises_1) sert déjà ces intervalles : un index de plus ne ferait
+-- que dupliquer le stockage et le coût des écritures.
+
+BEGIN TRANSACTION;
+
+COMMIT;
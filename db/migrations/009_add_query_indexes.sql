@@ -0,0 +1,20 @@
+-- Fichier : db/migrations/009_add_query_indexes.sql
+-- Description : Index composites pour les requêtes fréquentes sur les congés, les agents et les soldes.
+-- La table 'conges' n'avait aucun index : chaque recherche par agent, par type ou par date
+-- (et chaque suppression d'agent, via ON DELETE CASCADE) parcourait toute la table.
+
+BEGIN TRANSACTION;
+
+-- Chevauchements et historique d'un agent (get_overlapping_leaves, get_conges(agent_id), cascade des suppressions)
+CREATE INDEX IF NOT EXISTS idx_conges_agent_statut_dates ON conges (agent_id, statut, date_debut, date_fin);
+
+-- Congés en cours ou à venir (get_agents_on_leave_today, tableau de bord) ; sert aussi le suivi des congés
+-- maladie (get_sick_leaves_by_status), dans l'ordre des dates, sans index dédié au type de congé.
+CREATE INDEX IF NOT EXISTS idx_conges_statut_debut ON conges (statut, date_debut);
+
+-- Listes d'agents : servies par idx_agents_statut_tri (statut, nom, prénom, id), créé par la migration 011.
+
+-- Soldes par statut (apurement des soldes expirés, glissement annuel)
+CREATE INDEX IF NOT EXISTS idx_soldes_statut_annee ON soldes_annuels (statut, annee);
+
+COMMIT;
@@ -0,0 +1,37 @@
+-- Fichier : db/migrations/010_agents_fts.sql
+-- Description : Index plein texte (FTS5) des agents pour la recherche à la frappe.
+-- Remplace les LOWER(...) LIKE '%terme%' qui parcouraient toute la table à chaque touche.
+-- Tokenizer unicode61 sans diacritiques : la recherche ignore la casse et les accents,
+-- les index de préfixes rendent rapides les requêtes "terme*" dès 2 caractères.
+-- Table à contenu externe : les triggers la tiennent à jour à partir de 'agents'.
+
+BEGIN TRANSACTION;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS agents_fts USING fts5(
+    nom, prenom, ppr, cnie, nom_arabe, prenom_arabe,
+    content = 'agents', content_rowid = 'id',
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+
+CREATE TRIGGER IF NOT EXISTS agents_fts_ai AFTER INSERT ON agents BEGIN
+    INSERT INTO agents_fts (rowid, nom, prenom, ppr, cnie, nom_arabe, prenom_arabe)
+    VALUES (new.id, new.nom, new.prenom, new.ppr, new.cnie, new.nom_arabe, new.prenom_arabe);
+END;
+
+CREATE TRIGGER IF NOT EXISTS agents_fts_ad AFTER DELETE ON agents BEGIN
+    INSERT INTO agents_fts (agents_fts, rowid, nom, prenom, ppr, cnie, nom_arabe, prenom_arabe)
+    VALUES ('delete', old.id, old.nom, old.prenom, old.ppr, old.cnie, old.nom_arabe, old.prenom_arabe);
+END;
+
+CREATE TRIGGER IF NOT EXISTS agents_fts_au AFTER UPDATE OF nom, prenom, ppr, cnie, nom_arabe, prenom_arabe ON agents BEGIN
+    INSERT INTO agents_fts (agents_fts, rowid, nom, prenom, ppr, cnie, nom_arabe, prenom_arabe)
+    VALUES ('delete', old.id, old.nom, old.prenom, old.ppr, old.cnie, old.nom_arabe, old.prenom_arabe);
+    INSERT INTO agents_fts (rowid, nom, prenom, ppr, cnie, nom_arabe, prenom_arabe)
+    VALUES (new.id, new.nom, new.prenom, new.ppr, new.cnie, new.nom_arabe, new.prenom_arabe);
+END;
+
+-- Indexation des agents déjà présents
+INSERT INTO agents_fts (agents_fts) VALUES ('rebuild');
+
+COMMIT;
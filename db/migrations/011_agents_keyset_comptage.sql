@@ -0,0 +1,37 @@
+-- Fichier : db/migrations/011_agents_keyset_comptage.sql
+-- Description : Pagination « keyset » et comptage incrémental des agents.
+-- L'index couvre la clé de tri complète (nom, prénom, id) : une page reprend directement après
+-- la dernière ligne affichée au lieu de relire les lignes précédentes (OFFSET).
+-- agents_comptage tient, par statut, le nombre d'agents et un numéro de version incrémenté à
+-- chaque modification : les triggers évitent un COUNT(*) à chaque actualisation, et la version
+-- permet de savoir si un comptage filtré (recherche) gardé en cache est encore valable.
+
+BEGIN TRANSACTION;
+
+CREATE INDEX IF NOT EXISTS idx_agents_statut_tri ON agents (statut_agent, nom, IFNULL(prenom, ''), id);
+
+CREATE TABLE IF NOT EXISTS agents_comptage (
+    statut_agent TEXT PRIMARY KEY,
+    nb INTEGER NOT NULL DEFAULT 0,
+    version INTEGER NOT NULL DEFAULT 0
+);
+
+INSERT INTO agents_comptage (statut_agent, nb, version)
+SELECT statut_agent, COUNT(*), 0 FROM agents GROUP BY statut_agent;
+
+CREATE TRIGGER IF NOT EXISTS agents_comptage_ai AFTER INSERT ON agents BEGIN
+    INSERT INTO agents_comptage (statut_agent, nb, version) VALUES (new.statut_agent, 1, 1)
+    ON CONFLICT (statut_agent) DO UPDATE SET nb = nb + 1, version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS agents_comptage_ad AFTER DELETE ON agents BEGIN
+    UPDATE agents_comptage SET nb = nb - 1, version = version + 1 WHERE statut_agent = old.statut_agent;
+END;
+
+CREATE TRIGGER IF NOT EXISTS agents_comptage_au AFTER UPDATE ON agents BEGIN
+    UPDATE agents_comptage SET nb = nb - 1, version = version + 1 WHERE statut_agent = old.statut_agent;
+    INSERT INTO agents_comptage (statut_agent, nb, version) VALUES (new.statut_agent, 1, 1)
+    ON CONFLICT (statut_agent) DO UPDATE SET nb = nb + 1, version = version + 1;
+END;
+
+COMMIT;
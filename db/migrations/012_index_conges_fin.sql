@@ -0,0 +1,10 @@
+-- Fichier : db/migrations/012_index_conges_fin.sql
+-- Description : Index pour les congés en cours du tableau de bord.
+-- Seuls les congés qui ne sont pas encore terminés (date_fin >= aujourd'hui) sont lus,
+-- au lieu de tout l'historique antérieur à la date du jour.
+
+BEGIN TRANSACTION;
+
+CREATE INDEX IF NOT EXISTS idx_conges_statut_fin ON conges (statut, date_fin);
+
+COMMIT;
@@ -0,0 +1,10 @@
+-- Fichier : db/migrations/013_index_conges_debut.sql
+-- Description : Index pour l'export de tous les congés (iter_conges_export).
+-- Les congés sont lus dans l'ordre de l'index, du plus récent au plus ancien,
+-- au lieu d'être tous triés avant que la première ligne ne soit écrite.
+
+BEGIN TRANSACTION;
+
+CREATE INDEX IF NOT EXISTS idx_conges_debut ON conges (date_debut);
+
+COMMIT;
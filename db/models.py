@@ -107,4 +107,34 @@ class Conge:
         if not row: return None
         return cls(id=row['id'], agent_id=row['agent_id'], type_conge=row['type_conge'], justif=row['justif'], 
                    interim_id=row['interim_id'], date_debut=row['date_debut'], date_fin=row['date_fin'], 
-                   jours_pris=row['jours_pris'], statut=row['statut'])
\ No newline at end of file
+                   jours_pris=row['jours_pris'], statut=row['statut'])
+
+class Chevauchement:
+    """Premier congé en conflit avec une période demandée, et sa position par rapport à elle (calculée en SQL)."""
+    def __init__(self, conge, nb_conflits, est_contenu, est_identique, englobe, chevauche_fin, chevauche_debut):
+        self.conge = conge; self.nb_conflits = nb_conflits
+        self.est_contenu = est_contenu; self.est_identique = est_identique; self.englobe = englobe
+        self.chevauche_fin = chevauche_fin; self.chevauche_debut = chevauche_debut
+
+    @classmethod
+    def from_db_row(cls, row):
+        if not row: return None
+        return cls(conge=Conge.from_db_row(row), nb_conflits=row['nb_conflits'], est_contenu=bool(row['est_contenu']),
+                   est_identique=bool(row['est_identique']), englobe=bool(row['englobe']),
+                   chevauche_fin=bool(row['chevauche_fin']), chevauche_debut=bool(row['chevauche_debut']))
+
+class LigneHistoriqueConge:
+    """Congé tel qu'affiché dans l'historique d'un agent : certificat et intérimaire lus dans la même requête."""
+    def __init__(self, conge, chemin_certificat, interim_nom, date_reprise=None):
+        self.conge = conge; self.chemin_certificat = chemin_certificat
+        self.interim_nom = interim_nom; self.date_reprise = date_reprise
+
+    @property
+    def certificat_fourni(self):
+        return self.chemin_certificat is not None
+
+    @classmethod
+    def from_db_row(cls, row):
+        if not row: return None
+        interim_nom = f"{row['interim_nom']} {row['interim_prenom'] or ''}".strip() if row['interim_nom'] is not None else None
+        return cls(conge=Conge.from_db_row(row), chemin_certificat=row['chemin_certificat'], interim_nom=interim_nom)
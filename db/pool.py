@@ -0,0 +1,116 @@
+# Fichier : db/pool.py
+# Ouverture des connexions SQLite (PRAGMAs de config.yaml) et pool de connexions en lecture.
+
+import sqlite3
+import threading
+import queue
+import re
+import logging
+from contextlib import contextmanager
+
+from utils.config_loader import CONFIG
+
+# Valeurs utilisées si la section db.pragmas de config.yaml est absente ou incomplète.
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'cache_size': -20000,
+    'mmap_size': 268435456,
+    'temp_store': 'MEMORY',
+}
+DEFAULT_READER_POOL_SIZE = 3
+
+_PRAGMA_NAME_RE = re.compile(r'^[a-z_]+$')
+_PRAGMA_VALUE_RE = re.compile(r'^-?[\w]+$')
+
+def get_pragmas():
+    pragmas = dict(DEFAULT_PRAGMAS)
+    pragmas.update(CONFIG.get('db', {}).get('pragmas') or {})
+    return pragmas
+
+def get_reader_pool_size():
+    return int(CONFIG.get('db', {}).get('reader_pool_size', DEFAULT_READER_POOL_SIZE))
+
+def apply_pragmas(conn, pragmas):
+    for name, value in pragmas.items():
+        value = str(value)
+        if not _PRAGMA_NAME_RE.match(name) or not _PRAGMA_VALUE_RE.match(value):
+            raise ValueError(f"PRAGMA invalide dans la configuration : {name} = {value}")
+        conn.execute(f"PRAGMA {name} = {value}").fetchall()
+
+def open_connection(db_file, pragmas=None, read_only=False):
+    """
+    Ouvre une connexion configurée comme celle de l'application (types, Row, clés étrangères).
+    Une connexion en lecture peut être utilisée depuis un autre thread que celui qui l'a créée,
+    mais jamais par deux threads à la fois : c'est le rôle du pool.
+    """
+    conn = sqlite3.connect(db_file, detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES, check_same_thread=not read_only)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    pragmas = get_pragmas() if pragmas is None else pragmas
+    if read_only:
+        # Le mode de journal est persistant dans le fichier : seule la connexion principale le fixe.
+        pragmas = {k: v for k, v in pragmas.items() if k != 'journal_mode'}
+    apply_pragmas(conn, pragmas)
+    if read_only:
+        conn.execute("PRAGMA query_only = ON")
+    return conn
+
+class ReaderPool:
+    """
+    Petit pool de connexions en lecture seule. Avec le journal WAL, les lectures
+    (exports, tableau de bord) ne bloquent pas les écritures de l'interface, et inversement.
+    Les connexions sont créées à la demande, jusqu'à `size` ; au-delà, on attend qu'une se libère.
+    """
+    def __init__(self, db_file, size=None, pragmas=None):
+        self.db_file = db_file
+        self.size = max(1, size or get_reader_pool_size())
+        self.pragmas = pragmas
+        self._idle = queue.LifoQueue()
+        self._all = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def acquire(self, timeout=None):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._closed:
+                raise sqlite3.ProgrammingError("Le pool de connexions est fermé.")
+            if len(self._all) < self.size:
+                conn = open_connection(self.db_file, self.pragmas, read_only=True)
+                self._all.append(conn)
+                return conn
+        try:
+            return self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError("Aucune connexion de lecture disponible.")
+
+    def release(self, conn):
+        if self._closed:
+            conn.close()
+            return
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self, timeout=None):
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            connections, self._all = self._all, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                logging.warning(f"Fermeture d'une connexion de lecture impossible : {e}")
@@ -2,6 +2,9 @@
 # Point d'entrée principal de l'application. Il initialise la configuration,
 # la base de données, la logique métier, puis lance l'interface graphique.
 
+import time
+_DEBUT_DEMARRAGE = time.perf_counter()
+
 import tkinter as tk
 from tkinter import messagebox
 import sys
@@ -13,6 +16,11 @@ from utils.config_loader import load_config, CONFIG
 from db.database import DatabaseManager
 from core.conges.manager import CongeManager
 from ui.main_window import MainWindow
+from utils.startup_timing import StartupTimer
+
+# Rapport des temps de démarrage (journal), de l'import des modules au premier affichage.
+STARTUP = StartupTimer(_DEBUT_DEMARRAGE)
+STARTUP.mark("Import des modules")
 
 
 # --- SECTION 1 : Configuration des chemins d'accès ---
@@ -35,6 +43,7 @@ except Exception as e:
     root.withdraw()
     messagebox.showerror("Erreur Critique de Configuration", f"Impossible de charger la configuration:\n{e}")
     sys.exit(1)
+STARTUP.mark("Configuration")
 
 
 # --- SECTION 3 : Démarrage de l'application ---
@@ -47,6 +56,12 @@ if __name__ == "__main__":
     logging.basicConfig(filename=LOG_FILE_PATH, level=logging.INFO,
                         format='%(asctime)s - %(levelname)s - %(name)s - %(message)s')
 
+    def _report_startup():
+        # Appelé quand la boucle Tk devient inactive : la fenêtre est affichée.
+        STARTUP.mark("Premier affichage")
+        logging.info(STARTUP.report())
+        print(f"--- Démarrage en {STARTUP.total_ms:.0f} ms (détail dans conges.log) ---")
+
     # Boucle permettant un redémarrage propre de l'application.
     restart_app = True
     while restart_app:
@@ -56,6 +71,7 @@ if __name__ == "__main__":
         db_manager = DatabaseManager(DB_PATH_ABS)
         if not db_manager.connect():
             sys.exit(1)
+        STARTUP.mark("Connexion à la base")
 
         try:
             db_manager.run_migrations()
@@ -64,17 +80,21 @@ if __name__ == "__main__":
             messagebox.showerror("Erreur de Migration DB", f"La mise à jour de la base de données a échoué.\nErreur: {e}")
             db_manager.close()
             sys.exit(1)
+        STARTUP.mark("Migrations")
 
         # Initialisation du gestionnaire métier et lancement de l'interface.
         conge_manager = CongeManager(db_manager, CERTIFICATS_DIR_ABS)
         
         print(f"--- Lancement de {CONFIG['app']['title']} v{CONFIG['app']['version']} ---")
         app = MainWindow(conge_manager, BASE_DIR)
+        STARTUP.mark("Fenêtre et première page")
+        app.after_idle(_report_startup)
         app.mainloop()
 
         # Nettoyage à la fermeture.
         if hasattr(app, 'restart_on_close') and app.restart_on_close:
             restart_app = True
+            STARTUP = StartupTimer()
         
         db_manager.close()
     
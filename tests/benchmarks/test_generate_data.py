@@ -0,0 +1,25 @@
+from benchmarks.generate_data import generate
+from db.database import DatabaseManager
+from core.conges.manager import CongeManager
+
+
+def test_generated_database_is_consistent(tmp_path):
+    summary = generate(str(tmp_path / "bench.db"), nb_agents=30, conges_par_agent=15, nb_annees=3, annee_fin=2024, seed=1)
+    assert summary['lignes']['agents'] == 30
+    assert summary['lignes']['soldes_annuels'] == 90
+    assert summary['lignes']['conges'] > 0
+
+    db_manager = DatabaseManager(summary['base'])
+    assert db_manager.connect()
+    try:
+        overlaps = db_manager.execute_query("""
+            SELECT COUNT(*) FROM conges a JOIN conges b
+              ON a.agent_id = b.agent_id AND a.id < b.id AND a.date_debut <= b.date_fin AND b.date_debut <= a.date_fin""", fetch="one")[0]
+        assert overlaps == 0
+        assert db_manager.get_annee_exercice() == 2024
+        # Les congés annuels suivent le calendrier ouvré, à quelques incohérences volontaires près.
+        manager = CongeManager(db_manager, str(tmp_path / "certificats"))
+        annuels = db_manager.execute_query("SELECT COUNT(*) FROM conges WHERE type_conge = 'Congé annuel' AND date_debut >= '2023-01-01' AND date_debut < '2024-01-01'", fetch="one")[0]
+        assert len(manager.find_inconsistent_annual_leaves(2023)) <= max(2, annuels // 20)
+    finally:
+        db_manager.close()
@@ -0,0 +1,61 @@
+import sys
+import os
+
+import pytest
+
+# --- Configuration pour permettre l'importation depuis le dossier racine ---
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT_DIR)
+# ---------------------------------------------------------------------------
+
+from utils.config_loader import load_config, CONFIG
+
+if not CONFIG:
+    load_config(os.path.join(ROOT_DIR, "config.yaml"))
+
+from db.database import DatabaseManager
+from core.conges.manager import CongeManager
+
+
+@pytest.fixture
+def db():
+    """Base SQLite en mémoire, migrée avec les scripts de db/migrations."""
+    db_manager = DatabaseManager(":memory:")
+    assert db_manager.connect()
+    db_manager.run_migrations()
+    yield db_manager
+    db_manager.close()
+
+@pytest.fixture
+def manager(db, tmp_path):
+    return CongeManager(db, str(tmp_path / "certificats"))
+
+@pytest.fixture
+def open_file_db(tmp_path):
+    """Ouvre des bases SQLite sur disque (tmp_path/<nom>), migrées et fermées en fin de test."""
+    opened = []
+    def open_db(name="conges.db"):
+        db_manager = DatabaseManager(str(tmp_path / name))
+        assert db_manager.connect()
+        db_manager.run_migrations()
+        opened.append(db_manager)
+        return db_manager
+    yield open_db
+    for db_manager in opened:
+        db_manager.close()
+
+@pytest.fixture
+def file_db(open_file_db):
+    """Base sur disque : pool de lecture, WAL, et une seconde connexion ne voit que ce qui a été validé."""
+    return open_file_db()
+
+@pytest.fixture
+def file_manager(file_db, tmp_path):
+    return CongeManager(file_db, str(tmp_path / "certificats"))
+
+@pytest.fixture
+def insert_agent():
+    """Insère un agent minimal par SQL brut (sans passer par save_agent) ; une erreur SQL est propagée."""
+    def insert(db_manager, ppr):
+        return db_manager.execute_query("INSERT INTO agents (nom, prenom, ppr, cadre) VALUES (?, ?, ?, ?)", (f"NOM{ppr}", "Test", ppr, "Infirmier"))
+    return insert
@@ -0,0 +1,32 @@
+import pytest
+
+from core.conges.events import ChangeBus, ChangeType
+
+
+def test_batch_merges_events_by_type_and_dispatches_once():
+    bus, recus = ChangeBus(), []
+    bus.subscribe(recus.append, ChangeType.SOLDES_CHANGED)
+    with bus.batch():
+        bus.publish(ChangeType.SOLDES_CHANGED, agent_ids=[1])
+        with bus.batch():
+            bus.publish(ChangeType.SOLDES_CHANGED, agent_ids=[2])
+            bus.publish(ChangeType.LEAVE_ADDED, agent_ids=[2], conge_ids=[7])
+        assert recus == []
+    assert len(recus) == 1 and recus[0].agent_ids == {1, 2}
+    bus.publish(ChangeType.SOLDES_CHANGED, agent_ids=None)
+    assert recus[1].concerns(42)
+
+
+def test_events_of_a_failed_batch_are_dropped_and_subscriber_errors_isolated():
+    bus, recus = ChangeBus(), []
+    bus.subscribe(lambda event: 1 / 0)
+    unsubscribe = bus.subscribe(recus.append)
+    with bus.batch():
+        bus.publish(ChangeType.AGENT_SAVED, agent_ids=[1])
+        with pytest.raises(ValueError), bus.batch():
+            bus.publish(ChangeType.AGENT_DELETED, agent_ids=[2])
+            raise ValueError
+    assert [event.type for event in recus] == [ChangeType.AGENT_SAVED]
+    unsubscribe()
+    bus.publish(ChangeType.AGENT_SAVED, agent_ids=[3])
+    assert len(recus) == 1
@@ -0,0 +1,68 @@
+import sqlite3
+from datetime import date
+
+import pytest
+
+from utils.date_utils import BusinessDayCalendar
+
+
+def test_repeated_lookups_hit_the_cache(manager):
+    first = manager.get_holidays_set_for_period(2024, 2025)
+    second = manager.get_holidays_set_for_period(2024, 2025)
+    assert first is second
+    assert manager.holidays_cache.stats()['hits'] == 1
+    assert manager.holidays_cache.stats()['misses'] == 1
+
+def test_calendar_is_built_once_per_period(manager):
+    calendar = manager.get_business_calendar(2024, 2024)
+    assert isinstance(calendar, BusinessDayCalendar)
+    assert manager.get_business_calendar(2024, 2024) is calendar
+
+def test_holiday_edits_invalidate_the_cache(manager):
+    assert date(2024, 8, 19) not in manager.get_holidays_set_for_period(2024, 2024)
+
+    manager.add_holiday("2024-08-19", "Fermeture", "Personnalisé")
+    assert date(2024, 8, 19) in manager.get_holidays_set_for_period(2024, 2024)
+    assert manager.get_business_calendar(2024, 2024).count(date(2024, 8, 19), date(2024, 8, 23)) == 4
+
+    manager.add_or_update_holiday("2024-08-20", "Fermeture", "Personnalisé")
+    assert date(2024, 8, 20) in manager.get_holidays_set_for_period(2024, 2024)
+
+    manager.delete_holiday("2024-08-19")
+    assert date(2024, 8, 19) not in manager.get_holidays_set_for_period(2024, 2024)
+
+def test_invalidation_keeps_unrelated_periods(manager):
+    manager.get_holidays_set_for_period(2020, 2020)
+    manager.get_holidays_set_for_period(2024, 2024)
+    manager.add_holiday("2024-03-04", "Fermeture", "Personnalisé")
+    stats = manager.holidays_cache.stats()
+    assert stats['periods'] == 1
+    manager.get_holidays_set_for_period(2020, 2020)
+    assert manager.holidays_cache.stats()['hits'] == stats['hits'] + 1
+
+def test_custom_holidays_are_loaded_in_one_indexed_query(manager, db):
+    for date_sql in ("2023-12-31", "2024-01-01", "2025-06-30", "2026-01-01"):
+        db.add_holiday(date_sql, "Fermeture", "Personnalisé")
+    statements = []
+    db.conn.set_trace_callback(statements.append)
+    holidays_set = manager.get_holidays_set_for_period(2024, 2024)
+    db.conn.set_trace_callback(None)
+
+    assert {date(2024, 1, 1), date(2025, 6, 30)} <= holidays_set
+    assert date(2023, 12, 31) not in holidays_set and date(2026, 1, 1) not in holidays_set
+    selects = [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+    assert len(selects) == 1
+    plan = " ".join(row[3] for row in db.conn.execute("EXPLAIN QUERY PLAN " + selects[0]))
+    assert "USING" in plan and "INDEX" in plan
+
+def test_failed_load_is_not_cached(manager, db, monkeypatch):
+    db.add_holiday("2024-08-19", "Fermeture", "Personnalisé")
+    def failing(*args):
+        raise sqlite3.OperationalError("database is locked")
+    monkeypatch.setattr(db, "get_holidays_between", failing)
+    with pytest.raises(sqlite3.OperationalError):
+        manager.get_holidays_set_for_period(2024, 2024)
+    assert manager.holidays_cache.stats()['years'] == 0
+
+    monkeypatch.undo()
+    assert date(2024, 8, 19) in manager.get_holidays_set_for_period(2024, 2024)
@@ -0,0 +1,172 @@
+import sqlite3
+from datetime import date, datetime
+
+import pytest
+
+from db.models import Conge
+from core.conges.events import ChangeType
+from core.constants import SoldeStatus, SplitConfirmationRequired, ReplaceConfirmationRequired, TrimConfirmationRequired
+
+
+def _add_agent(manager, nom, ppr, soldes=None, cadre='Infirmier 1er Grade'):
+    manager.save_full_agent({'nom': nom, 'prenom': 'Test', 'ppr': ppr, 'cadre': cadre, 'soldes': soldes or {}})
+    return manager.db.execute_query("SELECT id FROM agents WHERE ppr=?", (ppr,), fetch="one")['id']
+
+def _soldes(manager, agent_id):
+    return {s.annee: (s.solde, s.statut) for s in manager.get_agent_by_id(agent_id).soldes_annuels}
+
+
+def test_glissement_annuel_is_set_based_and_reports_counts(manager):
+    manager.db.set_annee_exercice(2024)
+    actif = _add_agent(manager, 'ACTIF', '1', {2022: 4, 2023: 10, 2024: 22})
+    deja_cree = _add_agent(manager, 'DEJA', '2', {2022: 1, 2025: 5})
+    archive = _add_agent(manager, 'ARCHIVE', '3', {2022: 6})
+    manager.archive_agents([archive])
+
+    rapport = manager.effectuer_glissement_annuel()
+
+    assert rapport['annee_exercice'] == 2025
+    assert (rapport['soldes_crees'], rapport['soldes_expires']) == (1, 2)
+    assert rapport['duree_ms'] >= 0
+    assert manager.get_annee_exercice() == 2025
+    assert _soldes(manager, actif) == {2022: (4, SoldeStatus.EXPIRE), 2023: (10, SoldeStatus.ACTIF),
+                                       2024: (22, SoldeStatus.ACTIF), 2025: (22, SoldeStatus.ACTIF)}
+    assert _soldes(manager, deja_cree)[2025] == (5, SoldeStatus.ACTIF)
+    assert _soldes(manager, archive) == {2022: (6, SoldeStatus.ACTIF)}
+
+def test_debit_and_credit_use_oldest_then_newest_active_soldes(manager):
+    agent_id = _add_agent(manager, 'SOLDE', '10', {2022: 3, 2023: 20, 2024: 22})
+    manager.db.execute_query("UPDATE soldes_annuels SET statut = ? WHERE annee = 2022", (str(SoldeStatus.EXPIRE),))
+
+    assert manager.get_deduction_details(agent_id, 25) == {2023: 20, 2024: 5}
+    manager._debiter_solde(agent_id, 25)
+    assert {annee: solde for annee, (solde, _) in _soldes(manager, agent_id).items()} == {2022: 3, 2023: 0, 2024: 17}
+
+    manager._crediter_solde(agent_id, 30)
+    assert {annee: solde for annee, (solde, _) in _soldes(manager, agent_id).items()} == {2022: 3, 2023: 22, 2024: 25}
+
+def test_debit_refuses_insufficient_balance_without_writing(manager):
+    agent_id = _add_agent(manager, 'PAUVRE', '11', {2024: 2})
+    with pytest.raises(ValueError):
+        manager._debiter_solde(agent_id, 5)
+    assert _soldes(manager, agent_id)[2024][0] == 2
+
+def test_failed_leave_operation_leaves_no_partial_write(manager, monkeypatch):
+    agent_id = _add_agent(manager, 'ATOMIQUE', '12', {2024: 22})
+    def echec(*args, **kwargs):
+        raise sqlite3.Error("échec simulé")
+    monkeypatch.setattr(manager.db, 'ajouter_conge', echec)
+
+    form_data = {'agent_id': agent_id, 'type_conge': 'Congé annuel', 'date_debut': '05/08/2024', 'date_fin': '09/08/2024', 'jours_pris': 5}
+    with pytest.raises(sqlite3.Error):
+        manager.handle_conge_submission(form_data, is_modification=False)
+    assert _soldes(manager, agent_id)[2024][0] == 22
+
+def test_read_only_manager_shares_holiday_cache(manager):
+    with manager.read_only() as reader:
+        assert reader.holidays_cache is manager.holidays_cache
+        assert reader.certificats_dir == manager.certificats_dir
+
+def _submit(manager, agent_id, type_conge, debut, fin, jours_pris=1):
+    form_data = {'agent_id': agent_id, 'type_conge': type_conge, 'date_debut': debut, 'date_fin': fin, 'jours_pris': jours_pris}
+    return manager.handle_conge_submission(form_data, is_modification=False)
+
+@pytest.mark.parametrize("type_conge, debut, fin, attendu, trim_side", [
+    ('Congé de maladie', '07/08/2024', '08/08/2024', SplitConfirmationRequired, None),
+    ('Congé de maladie', '05/08/2024', '16/08/2024', ReplaceConfirmationRequired, None),
+    ('Congé de maternité', '01/08/2024', '20/08/2024', ReplaceConfirmationRequired, None),
+    ('Congé de maladie', '14/08/2024', '22/08/2024', TrimConfirmationRequired, 'end'),
+    ('Congé de maladie', '01/08/2024', '06/08/2024', TrimConfirmationRequired, 'start'),
+    ('Congé annuel', '14/08/2024', '22/08/2024', ValueError, None),
+    ('Congé exceptionnel', '07/08/2024', '08/08/2024', ValueError, None),
+])
+def test_overlap_classification_drives_submission(manager, type_conge, debut, fin, attendu, trim_side):
+    agent_id = _add_agent(manager, 'CHEVAUCHE', '13', {2024: 22})
+    _submit(manager, agent_id, 'Congé annuel', '05/08/2024', '16/08/2024', 10)
+
+    with pytest.raises(attendu) as excinfo:
+        _submit(manager, agent_id, type_conge, debut, fin)
+    if attendu is not ValueError:
+        assert excinfo.value.overlap_conge.date_debut.day == 5
+    if trim_side:
+        assert excinfo.value.trim_side == trim_side
+
+def test_overlap_summary_counts_every_conflict(manager):
+    agent_id = _add_agent(manager, 'MULTI', '14', {2024: 22})
+    _submit(manager, agent_id, 'Congé annuel', '05/08/2024', '06/08/2024', 2)
+    _submit(manager, agent_id, 'Congé exceptionnel', '12/08/2024', '13/08/2024', 2)
+
+    resume = manager.db.get_overlap_summary(agent_id, datetime(2024, 8, 1), datetime(2024, 8, 31))
+    assert resume.nb_conflits == 2 and resume.englobe
+    assert resume.conge.type_conge == 'Congé annuel'
+    assert manager.db.get_overlap_summary(agent_id, datetime(2024, 9, 1), datetime(2024, 9, 30)) is None
+    with pytest.raises(ValueError, match="Chevauchement"):
+        _submit(manager, agent_id, 'Congé de maladie', '01/08/2024', '31/08/2024')
+
+def test_conges_history_is_one_query_with_certificate_interim_and_reprise(manager):
+    agent_id = _add_agent(manager, 'HISTO', '40')
+    interim_id = _add_agent(manager, 'INTERIM', '41')
+    manager.db.add_holiday('2024-03-11', 'Fermeture', 'Personnalisé')
+    malade = manager.db.ajouter_conge(Conge(None, agent_id, 'Congé de maladie', '', interim_id, datetime(2024, 3, 4), datetime(2024, 3, 8), 5))
+    manager.db.add_certificat(malade, "certificat.pdf")
+    manager.db.ajouter_conge(Conge(None, agent_id, 'Congé annuel', '', None, datetime(2023, 6, 5), datetime(2023, 6, 9), 5))
+
+    statements = []
+    manager.db.conn.set_trace_callback(statements.append)
+    lignes = manager.get_conges_history(agent_id)
+    manager.db.conn.set_trace_callback(None)
+
+    assert len([sql for sql in statements if 'FROM conges' in sql]) == 1
+    assert [(l.conge.type_conge, l.certificat_fourni, l.interim_nom) for l in lignes] == [
+        ('Congé de maladie', True, 'INTERIM Test'), ('Congé annuel', False, None)]
+    assert [l.date_reprise for l in lignes] == [date(2024, 3, 12), date(2023, 6, 12)]
+    assert [l.conge.id for l in manager.get_conges_history(agent_id, 'Congé de maladie')] == [malade]
+
+def test_dashboard_leaves_carry_dates_and_reprise(manager):
+    agent_id = _add_agent(manager, 'BORD', '50')
+    manager.db.add_holiday('2024-03-11', 'Fermeture', 'Personnalisé')
+    manager.db.ajouter_conge(Conge(None, agent_id, 'Congé annuel', '', None, datetime(2024, 3, 4), datetime(2024, 3, 8), 5))
+    manager.db.ajouter_conge(Conge(None, agent_id, 'Congé annuel', '', None, datetime(2024, 3, 13), datetime(2024, 3, 14), 2))
+
+    [en_cours] = manager.get_leaves_in_progress(date(2024, 3, 6))
+    assert (en_cours['date_debut'], en_cours['date_fin'], en_cours['date_reprise']) == (date(2024, 3, 4), date(2024, 3, 8), date(2024, 3, 12))
+    assert [l['date_debut'] for l in manager.get_leaves_starting_soon(date(2024, 3, 6))] == [date(2024, 3, 13)]
+    assert manager.get_leaves_starting_soon(date(2024, 3, 6), nb_jours=6) == []
+
+def test_leave_submission_notifies_once_after_commit(manager):
+    agent_id = _add_agent(manager, 'NOTIFIE', '50', {2023: 3, 2024: 22})
+    recus = []
+    manager.events.subscribe(lambda event: recus.append((event, _soldes(manager, agent_id)[2024][0])))
+    _submit(manager, agent_id, 'Congé annuel', '05/08/2024', '09/08/2024', 5)
+
+    assert sorted(event.type for event, _ in recus) == [ChangeType.LEAVE_ADDED, ChangeType.SOLDES_CHANGED]
+    assert all(event.agent_ids == {agent_id} for event, _ in recus)
+    assert all(solde == 20 for _, solde in recus)  # Notifié après la validation : le débit est visible.
+
+    recus.clear()
+    with pytest.raises(ValueError):
+        _submit(manager, agent_id, 'Congé annuel', '01/09/2024', '30/09/2024', 40)
+    assert recus == []
+
+def test_bulk_import_inserts_and_updates_in_one_unit_of_work(manager):
+    existant = _add_agent(manager, 'ANCIEN', '60')
+    manager.db.execute_query("UPDATE agents SET service_affectation = 'Urgences' WHERE id = ?", (existant,))
+    recus = []
+    manager.events.subscribe(recus.append)
+
+    nouveaux = [{'nom': 'RESIDENT', 'prenom': 'Test', 'ppr': '61', 'cadre': 'Médecin Résident', 'soldes': {2024: 12, 2023: 0}}]
+    modifies = [{'id': existant, 'nom': 'ANCIEN', 'prenom': 'Renommé', 'ppr': '60', 'cadre': 'Infirmier Grade principal'}]
+    assert manager.import_agents_bulk(nouveaux, modifies) == (1, 1)
+
+    ids = manager.get_agent_ids_by_ppr()
+    resident = manager.get_agent_by_id(ids['61'])
+    assert _soldes(manager, resident.id) == {2024: (12, SoldeStatus.ACTIF)}
+    assert resident.profil is not None
+    ancien = manager.get_agent_by_id(existant)
+    assert (ancien.prenom, ancien.cadre, ancien.service_affectation) == ('Renommé', 'Infirmier Grade principal', 'Urgences')
+    assert [(event.type, event.agent_ids) for event in recus] == [(ChangeType.AGENT_SAVED, None)]
+
+    with pytest.raises(sqlite3.IntegrityError):
+        manager.import_agents_bulk([{'nom': 'NOUVEAU', 'prenom': 'Test', 'ppr': '62', 'cadre': 'Infirmier 1er Grade'},
+                                    {'nom': 'DOUBLON', 'prenom': 'Test', 'ppr': '60', 'cadre': 'Infirmier 1er Grade'}], [])
+    assert '62' not in manager.get_agent_ids_by_ppr()
@@ -0,0 +1,66 @@
+from db.database import DatabaseManager
+
+
+def _add(db, nom, prenom, ppr, statut='Actif'):
+    agent_id = db.save_agent({'nom': nom, 'prenom': prenom, 'ppr': ppr, 'cadre': 'Infirmier'})
+    if statut != 'Actif': db.update_agents_status([agent_id], statut)
+    return agent_id
+
+def _walk(db, limit, **kwargs):
+    pages, cursor = [], None
+    while True:
+        agents, first, last = db.get_agents_page(limit=limit, cursor=cursor, direction='next', **kwargs)
+        if not agents: return pages
+        pages.append(([a.id for a in agents], first, last))
+        cursor = last
+
+
+def test_keyset_pages_cover_the_list_once_in_order_with_null_firstnames(db):
+    for i, (nom, prenom) in enumerate([("TAZI", "Omar"), ("ALAOUI", None), ("ALAOUI", "Sara"), ("BENNANI", "Amine"), ("ALAOUI", "Amine"), ("TAZI", "Omar")]):
+        _add(db, nom, prenom, f"P{i}")
+    pages = _walk(db, 2)
+    assert [len(ids) for ids, _, _ in pages] == [2, 2, 2]
+    assert [i for ids, _, _ in pages for i in ids] == [a.id for a in db.get_agents()]
+
+    ids, first, last = pages[1]
+    assert [a.id for a in db.get_agents_page(limit=2, cursor=first, direction='prev')[0]] == pages[0][0]
+    assert [a.id for a in db.get_agents_page(limit=2, cursor=first, direction='start')[0]] == ids
+
+def test_keyset_follows_sql_sort_descending(db):
+    for i, solde in enumerate([5, 20, 12, 20]):
+        db.create_solde_annuel(_add(db, f"AGENT{i}", "X", f"P{i}"), 2024, solde, 'Actif')
+    walked = [i for ids, _, _ in _walk(db, 3, order_by='solde_total', descending=True) for i in ids]
+    assert walked == [a.id for a in db.get_agents(order_by='solde_total', descending=True)]
+    assert [db.get_agent_by_id(i).get_solde_total_actif() for i in walked] == [20, 20, 12, 5]
+
+def test_counts_are_maintained_by_triggers_and_search_counts_are_cached(db):
+    ids = [_add(db, "ALAOUI", "Sara", "P1"), _add(db, "ALAMI", "Omar", "P2"), _add(db, "TAZI", "Omar", "P3", statut='Archivé')]
+    assert (db.get_agents_count('Actif'), db.get_agents_count('Archivé')) == (2, 1)
+    assert db.get_agents_count('Actif', 'ala') == 2
+
+    statements = []
+    db.conn.set_trace_callback(statements.append)
+    assert db.get_agents_count('Actif', 'ala') == 2
+    db.conn.set_trace_callback(None)
+    assert not any("COUNT(*)" in sql for sql in statements)
+
+    db.update_agents_status([ids[0]], 'Archivé')
+    assert (db.get_agents_count('Actif'), db.get_agents_count('Archivé')) == (1, 2)
+    assert db.get_agents_count('Actif', 'ala') == 1
+    db.supprimer_agent(ids[1])
+    assert db.get_agents_count('Actif') == 0 and db.get_agents_count('Actif', 'ala') == 0
+
+def test_search_count_cache_sees_writes_from_other_connections(tmp_path):
+    path = str(tmp_path / "conges.db")
+    writer, ui = DatabaseManager(path), DatabaseManager(path)
+    assert writer.connect() and ui.connect()
+    try:
+        writer.run_migrations()
+        _add(writer, "ALAOUI", "Sara", "P1")
+        assert ui.get_agents_count('Actif', 'ala') == 1
+        _add(writer, "ALAMI", "Omar", "P2")
+        assert ui.get_agents_count('Actif', 'ala') == 2
+        with ui.reader() as reader:
+            assert reader.get_agents_count('Actif', 'ala') == 2
+    finally:
+        writer.close(); ui.close()
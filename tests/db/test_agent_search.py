@@ -0,0 +1,60 @@
+from db.database import split_sql_script, fts_match_query
+
+
+def _add(db, nom, prenom, ppr, statut='Actif', **extra):
+    fields = {'nom': nom, 'prenom': prenom, 'ppr': ppr, 'cadre': 'Infirmier', 'statut_agent': statut, **extra}
+    db.execute_query(f"INSERT INTO agents ({', '.join(fields)}) VALUES ({', '.join('?' for _ in fields)})", tuple(fields.values()))
+    return db.execute_query("SELECT id FROM agents WHERE ppr = ?", (ppr,), fetch="one")['id']
+
+def _noms(agents):
+    return [a.nom for a in agents]
+
+
+def test_search_ignores_case_and_accents_and_matches_prefixes(db):
+    _add(db, "LÉVÊQUE", "Hélène", "P001")
+    _add(db, "BENNANI", "Amine", "P002")
+    _add(db, "ALAOUI", "Éric", "P003")
+
+    assert _noms(db.get_agents(term="leveque")) == ["LÉVÊQUE"]
+    assert _noms(db.get_agents(term="hel")) == ["LÉVÊQUE"]
+    assert _noms(db.get_agents(term="ERIC")) == ["ALAOUI"]
+    assert _noms(db.get_agents(term="p002")) == ["BENNANI"]
+    assert db.get_agents_count(term="al") == 1
+
+def test_search_covers_cnie_and_arabic_names_and_requires_every_word(db):
+    _add(db, "TAZI", "Omar", "P010", cnie="AB123456", nom_arabe="التازي", prenom_arabe="عمر")
+    _add(db, "TAZI", "Salma", "P011")
+
+    assert _noms(db.get_agents(term="ab1234")) == ["TAZI"]
+    assert _noms(db.get_agents(term="التازي")) == ["TAZI"]
+    assert [a.prenom for a in db.get_agents(term="tazi sal")] == ["Salma"]
+    assert db.get_agents_count(term="tazi") == 2
+
+def test_index_follows_updates_deletes_and_status(db):
+    agent_id = _add(db, "CHRAIBI", "Karim", "P020")
+    archive_id = _add(db, "CHRAIBI", "Nadia", "P021", statut='Archivé')
+
+    db.execute_query("UPDATE agents SET nom = 'FASSI' WHERE id = ?", (agent_id,))
+    assert db.get_agents(term="chraibi") == []
+    assert _noms(db.get_agents(term="fassi")) == ["FASSI"]
+    assert [a.id for a in db.get_agents(statut='Archivé', term="chraibi")] == [archive_id]
+
+    db.supprimer_agent(agent_id)
+    assert db.get_agents_count(term="fassi") == 0
+
+def test_blank_or_punctuation_only_search_does_not_filter(db):
+    _add(db, "HAJJI", "Leila", "P030")
+    assert fts_match_query("  -  ") is None
+    assert db.get_agents_count(term=" - ") == 1
+
+def test_migration_splitter_keeps_trigger_bodies_whole():
+    script = """-- commentaire ; avec point-virgule
+    CREATE TABLE t (x);
+    CREATE TRIGGER tr AFTER INSERT ON t BEGIN
+        INSERT INTO t VALUES (1);
+        INSERT INTO t VALUES (2);
+    END;
+    """
+    commands = split_sql_script(script)
+    assert len(commands) == 2
+    assert commands[1].startswith("CREATE TRIGGER") and commands[1].endswith("END;")
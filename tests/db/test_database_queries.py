@@ -0,0 +1,96 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from db.models import Conge
+
+
+def _add_agent(db, nom, ppr, cadre='Infirmier 1er Grade'):
+    return db.save_agent({'nom': nom, 'prenom': 'Test', 'ppr': ppr, 'cadre': cadre})
+
+def test_agents_on_leave_today_includes_first_and_last_day(db):
+    today = datetime.combine(datetime.now().date(), datetime.min.time())
+    starts_today = _add_agent(db, 'DEBUT', '1')
+    ends_today = _add_agent(db, 'FIN', '2')
+    finished = _add_agent(db, 'PASSE', '3')
+    db.ajouter_conge(Conge(None, starts_today, 'Congé annuel', '', None, today, today + timedelta(days=3), 4))
+    db.ajouter_conge(Conge(None, ends_today, 'Congé annuel', '', None, today - timedelta(days=3), today, 4))
+    db.ajouter_conge(Conge(None, finished, 'Congé annuel', '', None, today - timedelta(days=5), today - timedelta(days=1), 4))
+
+    assert [row['nom'] for row in db.get_agents_on_leave_today()] == ['DEBUT', 'FIN']
+
+def test_get_agents_sorts_in_sql_by_whitelisted_keys(db):
+    ids = {nom: _add_agent(db, nom, ppr) for nom, ppr in (('CHRAIBI', '1'), ('ALAOUI', '2'), ('BENNANI', '3'))}
+    for nom, solde in (('CHRAIBI', 5), ('ALAOUI', 20), ('BENNANI', 12)):
+        db.create_solde_annuel(ids[nom], 2024, solde, 'Actif')
+    db.create_solde_annuel(ids['CHRAIBI'], 2023, 30, 'Expiré')
+
+    assert [a.nom for a in db.get_agents(order_by='nom', descending=True)] == ['CHRAIBI', 'BENNANI', 'ALAOUI']
+    assert [a.nom for a in db.get_agents(order_by='solde_total', limit=2, offset=0)] == ['CHRAIBI', 'BENNANI']
+    assert [a.nom for a in db.get_agents(order_by='solde_2023', descending=True)][0] == 'CHRAIBI'
+    with pytest.raises(ValueError):
+        db.get_agents(order_by='nom; DROP TABLE agents')
+
+def test_dashboard_queries_apply_filters_and_date_bounds(db):
+    today = datetime.combine(datetime.now().date(), datetime.min.time())
+    urgences = db.save_agent({'nom': 'URG', 'prenom': 'Test', 'ppr': '1', 'cadre': 'Médecin', 'service_affectation': 'Urgences'})
+    pediatrie = db.save_agent({'nom': 'PED', 'prenom': 'Test', 'ppr': '2', 'cadre': 'Médecin', 'service_affectation': 'Pédiatrie'})
+    archive = db.save_agent({'nom': 'ARC', 'prenom': 'Test', 'ppr': '3', 'cadre': 'Technicien', 'service_affectation': 'Urgences'})
+    db.update_agents_status([archive], 'Archivé')
+    db.ajouter_conge(Conge(None, urgences, 'Congé annuel', '', None, today - timedelta(days=2), today, 3))
+    db.ajouter_conge(Conge(None, pediatrie, 'Congé annuel', '', None, today + timedelta(days=7), today + timedelta(days=9), 3))
+    db.ajouter_conge(Conge(None, pediatrie, 'Congé annuel', '', None, today + timedelta(days=8), today + timedelta(days=9), 2))
+    db.ajouter_conge(Conge(None, archive, 'Congé annuel', '', None, today, today + timedelta(days=1), 2))
+
+    assert db.get_dashboard_counts() == {'agents_actifs': 2, 'conges_actifs': 3}
+    assert db.get_dashboard_counts({'service': 'Urgences'}) == {'agents_actifs': 1, 'conges_actifs': 1}
+    assert [r['nom'] for r in db.get_leaves_in_progress(today.date())] == ['URG']
+    assert [r['nom'] for r in db.get_leaves_in_progress(today.date(), {'service': 'Pédiatrie'})] == []
+    prochains = db.get_leaves_starting_between(today.date() + timedelta(days=1), today.date() + timedelta(days=7))
+    assert [r['date_debut'][:10] for r in prochains] == [(today + timedelta(days=7)).strftime('%Y-%m-%d')]
+    with pytest.raises(ValueError):
+        db.get_dashboard_counts({'nom': 'URG'})
+
+def test_dashboard_filter_values_are_cached_until_agents_change(db):
+    db.save_agent({'nom': 'URG', 'prenom': 'Test', 'ppr': '1', 'cadre': 'Médecin', 'service_affectation': 'Urgences'})
+    assert db.get_dashboard_filter_values() == {'cadre': ['Médecin'], 'service': ['Urgences'], 'specialite': []}
+    statements = []
+    db.conn.set_trace_callback(statements.append)
+    db.get_dashboard_filter_values()
+    db.conn.set_trace_callback(None)
+    assert not any('DISTINCT' in sql for sql in statements)
+    db.save_agent({'nom': 'PED', 'prenom': 'Test', 'ppr': '2', 'cadre': 'Infirmier', 'service_affectation': 'Pédiatrie'})
+    assert db.get_dashboard_filter_values()['service'] == ['Pédiatrie', 'Urgences']
+
+def test_export_iterators_stream_rows_in_order_by_batches(db):
+    alaoui, bennani = _add_agent(db, 'ALAOUI', '1'), _add_agent(db, 'BENNANI', '2')
+    archive = _add_agent(db, 'CHRAIBI', '3')
+    db.update_agents_status([archive], 'Archivé')
+    db.create_solde_annuel(alaoui, 2023, 4, 'Actif')
+    db.create_solde_annuel(alaoui, 2024, 22, 'Actif')
+    db.create_solde_annuel(alaoui, 2022, 7, 'Expiré')
+    for jour in (3, 1, 2):
+        db.ajouter_conge(Conge(None, bennani, 'Congé annuel', '', archive, datetime(2024, 6, jour), datetime(2024, 6, jour), 1))
+
+    agents = [dict(r) for r in db.iter_agents_export(2024, batch_size=1)]
+    assert [a['nom'] for a in agents] == ['ALAOUI', 'BENNANI']
+    assert (agents[0]['solde_n2'], agents[0]['solde_n1'], agents[0]['solde_n'], agents[0]['solde_total']) == (0, 4, 22, 26)
+    assert agents[1]['solde_total'] == 0
+
+    conges = list(db.iter_conges_export(batch_size=2))
+    assert db.get_conges_count() == 3
+    assert [r['debut'] for r in conges] == ['03/06/2024', '02/06/2024', '01/06/2024']
+    assert conges[0]['agent_nom'] == 'BENNANI' and conges[0]['interim_nom'] == 'CHRAIBI'
+
+def test_bulk_leave_import_skips_leaves_stored_with_or_without_a_time(db):
+    agent_id = _add_agent(db, 'ALAOUI', '1')
+    db.ajouter_conge(Conge(None, agent_id, 'Congé annuel', '', None, datetime(2024, 7, 1), datetime(2024, 7, 5), 5))
+    db.execute_query("INSERT INTO conges (agent_id, type_conge, date_debut, date_fin, jours_pris) VALUES (?, 'Congé annuel', '2024-08-05', '2024-08-09', 5)", (agent_id,))
+    conge = {'agent_id': agent_id, 'type_conge': 'Congé annuel', 'jours_pris': 5}
+
+    added = db.insert_conges_bulk([dict(conge, date_debut=datetime(2024, 7, 1), date_fin=datetime(2024, 7, 5)),
+                                   dict(conge, date_debut=datetime(2024, 8, 5).date(), date_fin=datetime(2024, 8, 9).date()),
+                                   dict(conge, date_debut=datetime(2024, 9, 2), date_fin=datetime(2024, 9, 6))])
+
+    assert added == 1
+    assert len(db.get_conges(agent_id)) == 3
@@ -0,0 +1,54 @@
+import sqlite3
+import threading
+
+import pytest
+
+from db.pool import ReaderPool, apply_pragmas
+
+
+def test_connection_uses_configured_pragmas(file_db):
+    assert file_db.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert file_db.conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+    assert file_db.conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+
+def test_reader_is_not_blocked_by_an_open_write_transaction(file_db, insert_agent):
+    insert_agent(file_db, "1")
+    with file_db.transaction():
+        insert_agent(file_db, "2")
+        # Lecture depuis un autre thread pendant que l'écriture est en cours.
+        result = []
+        def read():
+            with file_db.reader() as reader_db:
+                result.append(len(reader_db.get_agents()))
+        thread = threading.Thread(target=read)
+        thread.start(); thread.join(timeout=5)
+        assert result == [1]
+    with file_db.reader() as reader_db:
+        assert len(reader_db.get_agents()) == 2
+
+def test_reader_connections_are_read_only_and_reused(file_db, insert_agent):
+    with file_db.reader() as reader_db:
+        first_conn = reader_db.conn
+        with pytest.raises(sqlite3.OperationalError):
+            insert_agent(reader_db, "X")
+    with file_db.reader() as reader_db:
+        assert reader_db.conn is first_conn
+
+def test_pool_never_exceeds_its_size(file_db):
+    pool = ReaderPool(file_db.get_db_path(), size=1)
+    try:
+        conn = pool.acquire()
+        with pytest.raises(TimeoutError):
+            pool.acquire(timeout=0.05)
+        pool.release(conn)
+        assert pool.acquire(timeout=0.05) is conn
+    finally:
+        pool.close()
+
+def test_memory_database_reader_reuses_main_connection(db):
+    with db.reader() as reader_db:
+        assert reader_db is db
+
+def test_invalid_pragma_is_rejected(file_db):
+    with pytest.raises(ValueError):
+        apply_pragmas(file_db.conn, {'cache_size': '1; DROP TABLE agents'})
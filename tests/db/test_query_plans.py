@@ -0,0 +1,166 @@
+import inspect
+import re
+from datetime import date, datetime, timedelta
+
+from db.database import DatabaseManager
+from db.models import Conge
+
+# Méthodes de DatabaseManager qui n'émettent pas de requête métier à auditer.
+NON_QUERY_METHODS = {'connect', 'close', 'execute_query', 'execute_many', 'transaction', 'reader', 'run_migrations', 'get_db_path'}
+
+# Lectures volontairement exhaustives (nom de la table ou de son alias dans le plan) : exports, comptages
+# d'une table entière, index d'import et agrégats du tableau de bord. Tout autre SCAN est signalé,
+# y compris le parcours complet d'un index (« SCAN x USING COVERING INDEX ... »).
+FULL_SCAN_ALLOWED = {
+    ('get_conges', 'conges'),  # Appel sans agent_id : liste de tous les congés.
+    ('get_agents', 'soldes_annuels'),  # Appel sans limite : soldes de tous les agents.
+    ('get_conges_count', 'conges'),
+    ('get_soldes_count', 'soldes_annuels'),
+    ('get_agent_ids_by_ppr', 'agents'),  # Index PPR -> id de tous les agents, préparé avant un import.
+    ('iter_conges_export', 'c'),
+    ('iter_soldes_export', 's'),
+    ('get_dashboard_counts', 'a'),
+    ('get_dashboard_filter_values', 'a'),
+}
+
+FULL_SCAN_RE = re.compile(r"^SCAN (?!CONSTANT ROW)(?:TABLE )?(\w+)\b(?! VIRTUAL TABLE INDEX \d+:M)")  # Recherche FTS (MATCH) : pas un parcours.
+INDEX_RE = re.compile(r"USING (?:COVERING )?INDEX (\w+)")
+AUDITED_PREFIXES = ("SELECT", "UPDATE", "DELETE", "INSERT", "REPLACE", "WITH")
+# Volume de la base auditée, analysée (ANALYZE) : le planificateur choisit comme sur une vraie base.
+SEED_AGENTS, SEED_CONGES_PAR_AGENT = 300, 10
+SEED_TYPES = ('Congé annuel', 'Congé de maladie', 'Congé annuel', 'Congé exceptionnel')
+
+
+def _seed(db):
+    agent_id = db.save_agent({'nom': 'ALAOUI', 'prenom': 'Sara', 'ppr': '1001', 'cadre': 'Médecin Résident'})
+    other_id = db.save_agent({'nom': 'BENNANI', 'prenom': 'Omar', 'ppr': '1002', 'cadre': 'Infirmier 1er Grade'})
+    db.create_solde_annuel(agent_id, 2024, 10, 'Actif')
+    db.create_solde_annuel(agent_id, 2021, 3, 'Expiré')
+    conge = Conge(None, agent_id, 'Congé de maladie', '', other_id, datetime(2024, 3, 4), datetime(2024, 3, 8), 5)
+    conge_id = db.ajouter_conge(conge)
+    db.add_certificat(conge_id, "certificat.pdf")
+
+    db.insert_agents_bulk([{'nom': f'NOM{i:03}', 'prenom': None if i % 7 == 0 else 'Test', 'ppr': f'S{i}', 'cadre': 'Infirmier'}
+                           for i in range(SEED_AGENTS)])
+    db.create_soldes_bulk([(f'S{i}', annee, 10.0) for i in range(SEED_AGENTS) for annee in (2023, 2024, 2025)])
+    rows = []
+    for n, (seed_id,) in enumerate(db.conn.execute("SELECT id FROM agents WHERE ppr LIKE 'S%'")):
+        for k in range(SEED_CONGES_PAR_AGENT):
+            debut = date(2020, 1, 6) + timedelta(days=37 * k + n % 30)
+            rows.append((seed_id, SEED_TYPES[k % len(SEED_TYPES)], debut, debut + timedelta(days=4), 'Actif' if k % 5 else 'Annulé'))
+    db.execute_many("INSERT INTO conges (agent_id, type_conge, date_debut, date_fin, jours_pris, statut) VALUES (?, ?, ?, ?, 5, ?)", rows)
+    db.execute_query("INSERT INTO certificats_medicaux (conge_id, chemin_fichier) "
+                     "SELECT id, 'seed.pdf' FROM conges WHERE type_conge = 'Congé de maladie' AND id > ? AND id % 3 != 0", (conge_id,))
+    for mois in range(1, 13):
+        db.add_holiday(f"2024-{mois:02d}-15", "Fermeture", "Personnalisé")
+    db.conn.execute("ANALYZE")
+    return agent_id, other_id, conge_id
+
+def _calls(db, agent_id, other_id, conge_id):
+    """Chaque méthode de DatabaseManager avec des arguments représentatifs."""
+    conge = Conge(None, agent_id, 'Congé annuel', '', None, datetime(2024, 5, 6), datetime(2024, 5, 10), 5)
+    return [
+        ('get_annee_exercice', ()),
+        ('set_annee_exercice', (2024,)),
+        ('get_soldes_by_status', ('Expiré',)),
+        ('apurer_soldes_by_ids', ([1],)),
+        ('update_solde_by_id', (1, 9.0)),
+        ('update_soldes_by_ids', ([(1, 8.0), (2, 3.0)],)),
+        ('get_active_soldes', (agent_id,)),
+        ('create_solde_annuel', (agent_id, 2025, 22, 'Actif')),
+        ('glissement_annuel_soldes', (2026, 2023, 22.0)),
+        ('get_agents', ()),
+        ('get_agents', ('Actif', 'ala', 50, 0, other_id)),
+        ('get_agents', ('Actif', None, 50, 0, None, 'solde_total', True)),
+        ('get_agents', ('Actif', None, 50, 0, None, 'solde_2024')),
+        ('get_agents_page', ()),
+        ('get_agents_page', ('Actif', 'ala', 50, ('ALAOUI', 'Sara', agent_id), 'next')),
+        ('get_agents_page', ('Actif', None, 50, ('ALAOUI', 'Sara', agent_id), 'prev')),
+        ('get_agents_page', ('Actif', None, 50, (10.0, 'ALAOUI', 'Sara', agent_id), 'start', 'solde_total', True)),
+        ('get_agent_by_id', (agent_id,)),
+        ('get_agents_by_ids', ([agent_id, other_id],)),
+        ('get_agents_count', ()),
+        ('get_agents_count', ('Actif', 'ala')),
+        ('save_agent', ({'id': other_id, 'nom': 'BENNANI', 'prenom': 'Omar', 'ppr': '1002', 'cadre': 'Infirmier 1er Grade'}, True)),
+        ('update_agents_status', ([other_id], 'Actif')),
+        ('get_agent_ids_by_ppr', ()),
+        ('insert_agents_bulk', ([{'nom': 'CHRAIBI', 'prenom': 'Ali', 'ppr': '1003', 'cadre': 'Médecin Résident'}],)),
+        ('update_agents_bulk', ([{'id': other_id, 'nom': 'BENNANI', 'prenom': 'Omar', 'cadre': 'Infirmier 1er Grade'}],)),
+        ('create_soldes_bulk', ([('1003', 2024, 22.0)],)),
+        ('ensure_resident_profiles', (['1003'],)),
+        ('ajouter_conge', (conge,)),
+        ('get_conges', (agent_id,)),
+        ('get_conges', ()),
+        ('get_conges_count', ()),
+        ('iter_conges_export', ()),
+        ('iter_agents_export', (2024,)),
+        ('get_soldes_count', ()),
+        ('iter_soldes_export', ()),
+        ('upsert_soldes_bulk', ([(agent_id, 2024, 12.0, 'Actif'), (agent_id, 2030, 5.0, 'Actif')],)),
+        ('insert_conges_bulk', ([{'agent_id': agent_id, 'type_conge': 'Congé annuel', 'date_debut': datetime(2024, 7, 1),
+                                  'date_fin': datetime(2024, 7, 5), 'jours_pris': 5}],)),
+        ('get_conges_history', (agent_id,)),
+        ('get_conges_history', (agent_id, 'Congé de maladie')),
+        ('get_conge_by_id', (conge_id,)),
+        ('get_overlapping_leaves', (agent_id, datetime(2024, 3, 1), datetime(2024, 3, 31), conge_id)),
+        ('get_overlap_summary', (agent_id, datetime(2024, 3, 1), datetime(2024, 3, 31), conge_id)),
+        ('get_holidays_for_year', (2024,)),
+        ('get_holidays_between', ('2024-01-01', '2025-12-31')),
+        ('get_certificat_for_conge', (conge_id,)),
+        ('add_certificat', (conge_id, "autre.pdf")),
+        ('add_holiday', ('2024-08-19', 'Fermeture', 'Personnalisé')),
+        ('add_or_update_holiday', ('2024-08-19', 'Fermeture', 'Personnalisé')),
+        ('delete_holiday', ('2024-08-19',)),
+        ('get_sick_leaves_by_status', ('manquant', None)),
+        ('get_sick_leaves_by_status', ('justifie', 'ala')),
+        ('get_sick_leaves_by_status', ('tous', None)),
+        ('get_agents_on_leave_today', ()),
+        ('get_dashboard_counts', ()),
+        ('get_dashboard_counts', ({'cadre': 'Médecin Résident', 'service': None},)),
+        ('get_leaves_in_progress', (datetime(2024, 3, 5).date(),)),
+        ('get_leaves_in_progress', (datetime(2024, 3, 5).date(), {'specialite': 'Cardiologie'})),
+        ('get_leaves_starting_between', (datetime(2024, 3, 1).date(), datetime(2024, 3, 7).date(), {'cadre': 'Médecin Résident'})),
+        ('get_dashboard_filter_values', ()),
+        ('add_history_event', ({'agent_id': agent_id, 'date_evenement': '2024-01-01', 'type_evenement': 'Affectation'},)),
+        ('save_resident_profile', ({'agent_id': agent_id, 'type_residanat': 'Sur titre'},)),
+        ('supprimer_conge', (conge_id,)),
+        ('supprimer_agent', (other_id,)),
+        ('supprimer_agents_definitivement', ([agent_id],)),
+    ]
+
+def _record_statements(db):
+    agent_id, other_id, conge_id = _seed(db)
+    recorded = []
+    for method_name, args in _calls(db, agent_id, other_id, conge_id):
+        statements = []
+        db.conn.set_trace_callback(statements.append)
+        try:
+            result = getattr(db, method_name)(*args)
+            if inspect.isgenerator(result): list(result)  # Exports en flux : requête exécutée au parcours.
+        finally:
+            db.conn.set_trace_callback(None)
+        recorded.extend((method_name, sql) for sql in statements if sql.lstrip().upper().startswith(AUDITED_PREFIXES))
+    return recorded
+
+
+def test_every_query_method_is_audited(db):
+    public_methods = {name for name in dir(DatabaseManager) if not name.startswith('_') and callable(getattr(DatabaseManager, name))}
+    audited = {method_name for method_name, _ in _calls(db, 0, 0, 0)}
+    assert public_methods - NON_QUERY_METHODS - audited == set()
+
+def _plans(db):
+    recorded = _record_statements(db)
+    return [(method_name, sql, row[3]) for method_name, sql in recorded for row in db.conn.execute("EXPLAIN QUERY PLAN " + sql)]
+
+def test_no_query_does_a_full_scan(db):
+    offenders = []
+    for method_name, sql, detail in _plans(db):
+        match = FULL_SCAN_RE.match(detail)
+        if match and (method_name, match.group(1)) not in FULL_SCAN_ALLOWED:
+            offenders.append(f"{method_name}: {detail} <- {sql}")
+    assert offenders == []
+
+def test_every_secondary_index_serves_a_query(db):
+    used = {match.group(1) for _, _, detail in _plans(db) for match in [INDEX_RE.search(detail)] if match}
+    indexes = {row[0] for row in db.conn.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL")}
+    assert indexes - used == set()
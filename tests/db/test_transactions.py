@@ -0,0 +1,44 @@
+import sqlite3
+
+import pytest
+
+
+def _count_agents(path):
+    other = sqlite3.connect(path)
+    try:
+        return other.execute("SELECT COUNT(*) FROM agents").fetchone()[0]
+    finally:
+        other.close()
+
+
+def test_execute_query_defers_commit_to_outermost_scope(file_db, insert_agent):
+    with file_db.transaction():
+        insert_agent(file_db, "1")
+        with file_db.transaction():
+            insert_agent(file_db, "2")
+        assert _count_agents(file_db.get_db_path()) == 0
+    assert _count_agents(file_db.get_db_path()) == 2
+    assert not file_db.in_transaction
+
+def test_exception_rolls_back_the_whole_unit_of_work(file_db, insert_agent):
+    with pytest.raises(ValueError):
+        with file_db.transaction():
+            insert_agent(file_db, "1")
+            raise ValueError("boom")
+    assert _count_agents(file_db.get_db_path()) == 0
+    assert not file_db.in_transaction
+
+def test_nested_failure_only_rolls_back_its_savepoint(file_db, insert_agent):
+    with file_db.transaction():
+        insert_agent(file_db, "1")
+        with pytest.raises(sqlite3.IntegrityError):
+            with file_db.transaction():
+                insert_agent(file_db, "2")
+                insert_agent(file_db, "1")  # PPR en double
+        insert_agent(file_db, "3")
+    pprs = [r['ppr'] for r in file_db.execute_query("SELECT ppr FROM agents ORDER BY ppr", fetch="all")]
+    assert pprs == ["1", "3"]
+
+def test_statement_outside_transaction_is_still_committed(file_db, insert_agent):
+    insert_agent(file_db, "1")
+    assert _count_agents(file_db.get_db_path()) == 1
@@ -0,0 +1,130 @@
+import threading
+import time
+
+import pytest
+
+from ui.widgets.async_query import DebouncedQuery, SectionedRefresh
+
+
+class FakeWidget:
+    """Remplace la boucle Tk : les after() sont exécutés à la demande par run_pending()."""
+    def __init__(self):
+        self.callbacks = {}
+        self._next_id = 0
+
+    def after(self, delay_ms, callback):
+        self._next_id += 1
+        self.callbacks[self._next_id] = callback
+        return self._next_id
+
+    def after_cancel(self, after_id):
+        self.callbacks.pop(after_id, None)
+
+    def run_pending(self):
+        callbacks, self.callbacks = list(self.callbacks.values()), {}
+        for callback in callbacks:
+            callback()
+
+def _drain(widget, query, timeout=5):
+    deadline = time.monotonic() + timeout
+    while query.busy:
+        assert time.monotonic() < deadline, "la requête ne s'est pas terminée"
+        widget.run_pending()
+        time.sleep(0.005)
+
+
+def test_burst_of_keystrokes_runs_a_single_query(file_manager):
+    widget, executed, applied = FakeWidget(), [], []
+    def fetch(manager, term):
+        executed.append((term, threading.current_thread() is not threading.main_thread()))
+        return manager.get_agents_count(term=term)
+    query = DebouncedQuery(widget, file_manager, fetch, applied.append)
+
+    for term in ("a", "al", "ala"):
+        query.request(term)
+    _drain(widget, query)
+
+    assert executed == [("ala", True)]
+    assert applied == [0]
+
+def test_stale_result_is_discarded(file_manager):
+    widget, applied = FakeWidget(), []
+    release_first = threading.Event()
+    def fetch(manager, term):
+        if term == "lent":
+            release_first.wait(5)
+        return term
+    query = DebouncedQuery(widget, file_manager, fetch, applied.append)
+
+    query.request("lent"); widget.run_pending()
+    query.request("rapide"); widget.run_pending()
+    release_first.set()
+    _drain(widget, query)
+
+    assert applied == ["rapide"]
+
+def test_newer_request_interrupts_running_sql(file_manager):
+    widget, applied, errors = FakeWidget(), [], []
+    started = threading.Event()
+    def fetch(manager, slow):
+        if slow:
+            started.set()
+            manager.db.execute_query("WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n) SELECT COUNT(*) FROM n", fetch="one")
+        return "fini"
+    query = DebouncedQuery(widget, file_manager, fetch, applied.append, on_error=errors.append)
+
+    query.request(True); widget.run_pending()
+    assert started.wait(5)
+    query.request(False); widget.run_pending()
+    _drain(widget, query)
+
+    assert applied == ["fini"] and errors == []
+
+def test_cancel_drops_pending_request(file_manager):
+    widget, applied = FakeWidget(), []
+    query = DebouncedQuery(widget, file_manager, lambda manager, term: term, applied.append)
+    query.request("x")
+    query.cancel()
+    _drain(widget, query)
+    assert applied == []
+
+
+def test_sections_are_delivered_one_by_one_from_a_worker(file_manager):
+    widget, rendered, done = FakeWidget(), [], []
+    release_second = threading.Event()
+    def lent(manager, statut):
+        release_second.wait(5)
+        return manager.get_agents_count(statut=statut)
+    refresh = SectionedRefresh(widget, file_manager, [
+        ('thread', lambda manager, statut: threading.current_thread() is not threading.main_thread()),
+        ('comptage', lent),
+    ], lambda name, result: rendered.append((name, result)), on_done=lambda: done.append(True))
+
+    refresh.request('Actif')
+    deadline = time.monotonic() + 5
+    while not rendered:
+        assert time.monotonic() < deadline
+        widget.run_pending(); time.sleep(0.005)
+    assert rendered == [('thread', True)] and done == []
+    release_second.set()
+    _drain(widget, refresh)
+    assert rendered == [('thread', True), ('comptage', 0)] and done == [True]
+
+def test_requests_during_a_refresh_are_coalesced(file_manager):
+    widget, rendered, executed = FakeWidget(), [], []
+    started, release = threading.Event(), threading.Event()
+    def section(manager, n):
+        executed.append(n)
+        if n == 1:
+            started.set(); release.wait(5)
+        return n
+    refresh = SectionedRefresh(widget, file_manager, [('n', section)], lambda name, result: rendered.append(result))
+
+    refresh.request(1)
+    assert started.wait(5)
+    for n in (2, 3, 4):
+        refresh.request(n)
+    release.set()
+    _drain(widget, refresh)
+
+    assert executed == [1, 4] and rendered == [4]
@@ -0,0 +1,71 @@
+from datetime import date
+from types import SimpleNamespace
+
+from ui.widgets.virtual_list import ListDataSource, GroupedDataSource, display_sort_key
+
+
+def _agents(*noms):
+    return [SimpleNamespace(id=i + 1, nom=nom) for i, nom in enumerate(noms)]
+
+
+def test_values_are_computed_lazily_and_cached():
+    calls = []
+    source = ListDataSource(_agents("B", "A", "C"), values_fn=lambda a: calls.append(a.id) or (a.nom,))
+    assert len(source) == 3 and calls == []
+    assert source.values(1) == ("A",)
+    source.values(1)
+    assert calls == [2]
+    assert source.key(2) == 3 and source.index_of(3) == 2 and source.index_of(99) is None
+
+
+def test_sort_reorders_records_and_index():
+    source = ListDataSource(_agents("b", "A", "c"), values_fn=lambda a: (a.nom,))
+    source.sort(0)
+    assert [source.key(i) for i in range(3)] == [2, 1, 3]
+    source.sort(0, reverse=True)
+    assert source.index_of(3) == 0
+
+
+def test_display_sort_key_orders_numbers_before_text():
+    valeurs = ["10.0 j", "2,5 j", "abc", "", "3"]
+    assert sorted(valeurs, key=display_sort_key) == ["2,5 j", "3", "10.0 j", "", "abc"]
+
+
+def test_grouped_source_flattens_and_sorts_within_groups():
+    conges = {2024: _agents("z", "a"), 2023: [SimpleNamespace(id=10, nom="m")]}
+    source = GroupedDataSource(conges.items(), key_fn=lambda c: c.id, values_fn=lambda c: (c.nom,),
+                               header_key_fn=lambda annee: ('annee', annee), header_values_fn=lambda annee: (str(annee),),
+                               tags_fn=lambda c: ('annule',) if c.nom == "z" else ())
+    assert [source.key(i) for i in range(len(source))] == [('annee', 2024), 1, 2, ('annee', 2023), 10]
+    assert source.tags(0) == ("summary",) and source.tags(1) == ('annule',)
+    source.sort(0)
+    assert [source.key(i) for i in range(len(source))] == [('annee', 2024), 2, 1, ('annee', 2023), 10]
+
+
+def test_typed_sort_keys_sort_raw_values_not_display_text():
+    agents = [SimpleNamespace(id=1, debut=date(2023, 12, 1)), SimpleNamespace(id=2, debut=None), SimpleNamespace(id=3, debut=date(2024, 1, 5))]
+    source = ListDataSource(agents, values_fn=lambda a: (a.debut.strftime('%d/%m/%Y') if a.debut else '',), sort_keys={0: lambda a: a.debut})
+    source.sort(0)
+    assert [source.key(i) for i in range(3)] == [1, 3, 2]
+    source.sort(0, reverse=True)
+    assert [source.key(i) for i in range(3)] == [3, 1, 2]
+    grouped = GroupedDataSource([(2024, agents)], key_fn=lambda a: a.id, values_fn=lambda a: (), sort_keys={0: lambda a: a.debut},
+                                header_key_fn=lambda annee: annee, header_values_fn=lambda annee: ())
+    grouped.sort(0, reverse=True)
+    assert [grouped.key(i) for i in range(4)] == [2024, 3, 1, 2]
+
+
+def test_patch_replaces_inserts_and_removes_without_rebuilding():
+    source = ListDataSource(_agents("A", "C", "E"), values_fn=lambda a: (a.nom,))
+    assert source.values(0) == ("A",) and source.values(1) == ("C",)
+    source.patch([SimpleNamespace(id=1, nom="A2"), SimpleNamespace(id=9, nom="D")], removed_keys=[2], position_key=lambda a: a.nom)
+    assert [source.key(i) for i in range(len(source))] == [1, 9, 3]
+    assert source.values(0) == ("A2",) and source.index_of(2) is None
+
+
+def test_patch_inserts_agents_without_first_name_among_namesakes():
+    agents = [SimpleNamespace(id=1, nom="ALAOUI", prenom="Sara"), SimpleNamespace(id=2, nom="BENNANI", prenom=None)]
+    source = ListDataSource(agents, values_fn=lambda a: (a.nom,))
+    source.patch([SimpleNamespace(id=3, nom="ALAOUI", prenom=None), SimpleNamespace(id=4, nom="BENNANI", prenom="Omar")],
+                 position_key=lambda a: (a.nom, a.prenom or '', a.id))
+    assert [source.key(i) for i in range(len(source))] == [3, 1, 2, 4]
@@ -0,0 +1,72 @@
+import sys
+import os
+import random
+from datetime import date, datetime, timedelta
+
+# --- Configuration pour permettre l'importation depuis le dossier racine ---
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+# ---------------------------------------------------------------------------
+
+from utils.date_utils import BusinessDayCalendar, get_business_calendar, jours_ouvres, calculate_reprise_date
+
+HOLIDAYS_SET_FIXTURE = {
+    date(2024, 8, 19),   # Un lundi
+    date(2024, 12, 31),  # Un mardi
+    date(2025, 1, 1),    # Un mercredi
+    date(2025, 1, 11),   # Un samedi
+}
+
+def _naive_count(start, end, holidays_set):
+    jours, current = 0, start
+    while current <= end:
+        if current.weekday() < 5 and current not in holidays_set:
+            jours += 1
+        current += timedelta(days=1)
+    return jours
+
+def _naive_end_date(start, days_to_add, holidays_set):
+    current, counted = start, 0
+    while True:
+        if current.weekday() < 5 and current not in holidays_set:
+            counted += 1
+            if counted == days_to_add:
+                return current
+        current += timedelta(days=1)
+
+
+def test_count_matches_day_by_day_loop():
+    calendar = BusinessDayCalendar(HOLIDAYS_SET_FIXTURE)
+    rng = random.Random(42)
+    for _ in range(500):
+        start = date(2023, 1, 1) + timedelta(days=rng.randrange(1200))
+        end = start + timedelta(days=rng.randrange(800))
+        assert calendar.count(start, end) == _naive_count(start, end, HOLIDAYS_SET_FIXTURE)
+
+def test_add_business_days_matches_day_by_day_loop():
+    calendar = BusinessDayCalendar(HOLIDAYS_SET_FIXTURE)
+    rng = random.Random(7)
+    for _ in range(500):
+        start = date(2023, 1, 1) + timedelta(days=rng.randrange(1200))
+        days_to_add = rng.randrange(1, 400)
+        assert calendar.add_business_days(start, days_to_add) == _naive_end_date(start, days_to_add, HOLIDAYS_SET_FIXTURE)
+
+def test_count_across_new_year_with_holidays():
+    # Lundi 30/12/2024 -> vendredi 03/01/2025 : 31/12 et 01/01 sont fériés
+    assert jours_ouvres(date(2024, 12, 30), date(2025, 1, 3), HOLIDAYS_SET_FIXTURE) == 3
+
+def test_count_accepts_datetimes_and_invalid_ranges():
+    assert jours_ouvres(datetime(2024, 8, 5, 10, 0), datetime(2024, 8, 9), HOLIDAYS_SET_FIXTURE) == 5
+    assert jours_ouvres(date(2024, 8, 9), date(2024, 8, 5), HOLIDAYS_SET_FIXTURE) == 0
+    assert jours_ouvres(None, date(2024, 8, 5), HOLIDAYS_SET_FIXTURE) == 0
+
+def test_add_business_days_keeps_datetime_type():
+    result = BusinessDayCalendar(HOLIDAYS_SET_FIXTURE).add_business_days(datetime(2024, 8, 16), 2)
+    assert result == datetime(2024, 8, 20)
+
+def test_reprise_date_skips_weekend_and_holidays():
+    # Fin le vendredi 16/08/2024, lundi 19 férié -> reprise le mardi 20
+    assert calculate_reprise_date(datetime(2024, 8, 16), HOLIDAYS_SET_FIXTURE) == date(2024, 8, 20)
+    assert calculate_reprise_date(None, HOLIDAYS_SET_FIXTURE) is None
+
+def test_calendar_is_shared_for_identical_holiday_sets():
+    assert get_business_calendar(set(HOLIDAYS_SET_FIXTURE)) is get_business_calendar(frozenset(HOLIDAYS_SET_FIXTURE))
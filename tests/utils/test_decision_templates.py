@@ -0,0 +1,58 @@
+import zipfile
+
+import pytest
+
+from utils.decision_templates import _chunks, _decision_jobs, generate_decisions_batch, get_template
+
+
+def _add_conge(manager, agent_id, debut, fin, jours):
+    manager.db.execute_query("INSERT INTO conges (agent_id, type_conge, date_debut, date_fin, jours_pris) VALUES (?, 'Congé annuel', ?, ?, ?)",
+                             (agent_id, debut, fin, jours))
+    return manager.db.execute_query("SELECT MAX(id) FROM conges", fetch="one")[0]
+
+def test_decision_jobs_report_missing_templates_and_dedupe_file_names(manager, tmp_path):
+    (tmp_path / "templates").mkdir()
+    (tmp_path / "templates" / "infirmier.docx").write_bytes(b"")
+    infirmier = manager.db.save_agent({'nom': 'ALAOUI', 'prenom': 'Sara', 'ppr': '1', 'cadre': 'Infirmier'})
+    medecin = manager.db.save_agent({'nom': 'BENNANI', 'prenom': 'Omar', 'ppr': '2', 'cadre': 'Médecin'})
+    premier = _add_conge(manager, infirmier, "2024-03-04", "2024-03-08", 5)
+    doublon = _add_conge(manager, infirmier, "2024-03-04", "2024-03-05", 2)
+    sans_modele = _add_conge(manager, medecin, "2024-03-11", "2024-03-12", 2)
+
+    jobs, errors = _decision_jobs(manager, str(tmp_path), [premier, doublon, sans_modele, 999])
+
+    assert [filename for _, filename, _ in jobs] == ["Decision_Conge_ALAOUI_2024-03-04.docx", f"Decision_Conge_ALAOUI_2024-03-04_{doublon}.docx"]
+    assert jobs[0][0].endswith("infirmier.docx")
+    assert jobs[0][2]["{{nom_complet}}"] == "ALAOUI Sara" and jobs[1][2]["{{jours_pris}}"] == "2"
+    assert errors == ["BENNANI Omar : modèle 'médecin.docx' introuvable.", "Congé 999 introuvable."]
+
+def test_chunks_never_mix_templates_and_spread_the_work():
+    jobs = [("a.docx", f"a{i}", {}) for i in range(10)] + [("b.docx", "b0", {})]
+    chunks = _chunks(jobs, workers=2)
+    assert [(template, len(items)) for template, items in chunks] == [("a.docx", 2)] * 5 + [("b.docx", 1)]
+
+def test_compiled_template_fills_split_placeholders_and_batches_to_zip(manager, tmp_path):
+    docx = pytest.importorskip("docx")
+    (tmp_path / "templates").mkdir()
+    template_path = tmp_path / "templates" / "infirmier.docx"
+    document = docx.Document()
+    paragraph = document.add_paragraph("Décision pour ")
+    paragraph.add_run("{{nom_")
+    paragraph.add_run("complet}} du {{date_debut}}.")
+    document.save(template_path)
+
+    template = get_template(str(template_path))
+    assert get_template(str(template_path)) is template
+    assert template.placeholders == {"nom_complet", "date_debut"}
+    for nom in ("A", "B"):
+        template.render({"nom_complet": nom, "date_debut": "04/03/2024"}, str(tmp_path / f"{nom}.docx"))
+        assert docx.Document(str(tmp_path / f"{nom}.docx")).paragraphs[0].text == f"Décision pour {nom} du 04/03/2024."
+
+    agent_id = manager.db.save_agent({'nom': 'ALAOUI', 'prenom': 'Sara', 'ppr': '1', 'cadre': 'Infirmier'})
+    conge_ids = [_add_conge(manager, agent_id, f"2024-03-0{jour}", f"2024-03-0{jour}", 1) for jour in (4, 5, 6)]
+    rapports = []
+    done, errors = generate_decisions_batch(manager, str(tmp_path), conge_ids, str(tmp_path / "decisions.zip"),
+                                            lambda fait, total: rapports.append((fait, total)), max_workers=1)
+    assert (done, errors, rapports[-1]) == (3, [], (3, 3))
+    with zipfile.ZipFile(tmp_path / "decisions.zip") as archive:
+        assert sorted(archive.namelist()) == [f"Decision_Conge_ALAOUI_2024-03-0{jour}.docx" for jour in (4, 5, 6)]
@@ -0,0 +1,123 @@
+from datetime import datetime
+
+import pytest
+
+from db.models import Conge
+from core.conges.manager import CongeManager
+from utils.file_utils import (EXCHANGE_DATASETS, estimate_column_widths, export_all_conges_to_excel, export_dataset, import_dataset,
+                              prepare_agent_import, prepare_conges_import, _open_rows)
+
+
+def test_column_widths_follow_longest_sampled_value_and_are_capped():
+    widths = estimate_column_widths(["Nom", "Justification"], [("ALAOUI", None), ("B", "x" * 200)], max_width=40)
+    assert widths == [8, 40]
+
+
+def test_conges_export_streams_rows_and_reports_progress(manager, tmp_path, monkeypatch):
+    openpyxl = pytest.importorskip("openpyxl")
+    import utils.file_utils as file_utils
+    monkeypatch.setattr(file_utils, "EXPORT_PROGRESS_STEP", 2)
+    agent_id = manager.db.save_agent({'nom': 'EXPORT', 'prenom': 'Test', 'ppr': '1', 'cadre': 'Infirmier'})
+    for jour in range(1, 6):
+        manager.db.execute_query("INSERT INTO conges (agent_id, type_conge, date_debut, date_fin, jours_pris) VALUES (?, 'Congé annuel', ?, ?, 1)",
+                                 (agent_id, f"2024-03-0{jour}", f"2024-03-0{jour}"))
+    rapports = []
+    save_path = str(tmp_path / "export" / "conges.xlsx")
+
+    export_all_conges_to_excel(manager, save_path, lambda fait, total: rapports.append((fait, total)))
+
+    assert rapports == [(2, 5), (4, 5), (5, 5)]
+    lignes = list(openpyxl.load_workbook(save_path).active.values)
+    assert len(lignes) == 6 and lignes[1][:2] == ('EXPORT', 'Test') and lignes[1][4] == '05/03/2024'
+
+
+def test_agent_import_is_validated_and_split_before_any_write():
+    header = ["Nom", "Prenom", "PPR", "Cadre", "solde_2024"]
+    rows = [("ALAOUI", "Sara", "1001", "Médecin Résident", 10),
+            (None, None, None, None, None),
+            ("BENNANI", "Omar", "2002", None, "5,5"),
+            ("BENNANI", "Omar B.", "2002", "Infirmier 1er Grade", 99),
+            ("CHRAIBI", "", "3003", None, None),
+            ("DAOUDI", "Ali", "4004", "Pilote", -1)]
+
+    nouveaux, modifies, erreurs = prepare_agent_import(header, rows, {"1001": 7})
+
+    assert modifies == [{'nom': 'ALAOUI', 'prenom': 'Sara', 'ppr': '1001', 'cadre': 'Médecin Résident', 'id': 7}]
+    assert nouveaux == [{'nom': 'BENNANI', 'prenom': 'Omar B.', 'ppr': '2002', 'cadre': 'Infirmier 1er Grade', 'soldes': {2024: 5.5}}]
+    assert [e.split(":")[0] for e in erreurs] == ["Ligne 6", "Ligne 7"]
+    with pytest.raises(ValueError, match="Colonnes requises"):
+        prepare_agent_import(["Nom", "PPR"], [], {})
+
+
+def _export_and_import(source, target, tmp_path, extension):
+    for dataset in EXCHANGE_DATASETS:
+        export_path = str(tmp_path / "echange" / f"{dataset}{extension}")
+        export_dataset(source, dataset, export_path)
+        import_dataset(target.db.get_db_path(), target.certificats_dir, dataset, export_path)
+
+@pytest.mark.parametrize("extension", [".csv", ".parquet"])
+def test_exchange_files_round_trip_agents_soldes_and_conges(tmp_path, extension, file_manager, open_file_db):
+    if extension == ".parquet":
+        pytest.importorskip("pyarrow")
+    source, target = file_manager, CongeManager(open_file_db("cible.db"), file_manager.certificats_dir)
+    source.db.set_annee_exercice(2024)
+    sara = source.db.save_agent({'nom': 'ALAOUI', 'prenom': 'Sara', 'ppr': '1001', 'cadre': 'Médecin Résident'})
+    omar = source.db.save_agent({'nom': 'BENNANI', 'prenom': 'Omar', 'ppr': '1002', 'cadre': 'Infirmier 1er Grade'})
+    source.db.create_solde_annuel(sara, 2024, 12.5, 'Actif')
+    source.db.create_solde_annuel(sara, 2021, 3, 'Expiré')
+    source.db.ajouter_conge(Conge(None, sara, 'Congé annuel', 'Été', omar, datetime(2024, 7, 1), datetime(2024, 7, 5), 5))
+
+    _export_and_import(source, target, tmp_path, extension)
+    ids = target.get_agent_ids_by_ppr()
+    assert set(ids) == {'1001', '1002'}
+    assert {(s.annee, s.solde, str(s.statut)) for s in target.get_agent_by_id(ids['1001']).soldes_annuels} == {(2024, 12.5, 'Actif'), (2021, 3, 'Expiré')}
+    conge, = target.get_conges_for_agent(ids['1001'])
+    assert (conge.date_debut.date(), conge.jours_pris, conge.interim_id, conge.justif) == (datetime(2024, 7, 1).date(), 5, ids['1002'], 'Été')
+
+    # Réimporter les mêmes fichiers ne crée aucun doublon.
+    _export_and_import(source, target, tmp_path, extension)
+    assert len(target.get_conges_for_agent(ids['1001'])) == 1 and len(target.get_agent_by_id(ids['1001']).soldes_annuels) == 2
+
+def test_exchange_import_rejects_the_whole_file_on_any_invalid_row(tmp_path, manager):
+    csv_path = tmp_path / "conges.csv"
+    csv_path.write_text("ppr;type_conge;date_debut;date_fin;jours_pris\n"
+                        "1001;Congé annuel;2024-07-01;2024-07-05;5\n"
+                        "9999;Congé annuel;2024-07-01;2024-07-05;5\n"
+                        "1001;Vacances;2024-07-01;2024-07-05;5\n"
+                        "1001;Congé annuel;05/07/2024;01/07/2024;5\n", encoding="utf-8")
+    with _open_rows(str(csv_path)) as (header, rows):
+        conges, erreurs = prepare_conges_import(header, rows, {'1001': 1})
+    assert len(conges) == 1 and conges[0]['date_debut'] == datetime(2024, 7, 1)
+    assert [e.split(":")[0] for e in erreurs] == ["Ligne 3", "Ligne 4", "Ligne 5"]
+
+
+def test_cancelled_csv_export_leaves_no_partial_file(manager, tmp_path, monkeypatch):
+    import utils.file_utils as file_utils
+    from utils.jobs import JobCancelled
+    monkeypatch.setattr(file_utils, "EXPORT_PROGRESS_STEP", 1)
+    for i in range(3):
+        manager.db.save_agent({'nom': f'AGENT{i}', 'prenom': 'Test', 'ppr': str(i), 'cadre': 'Infirmier'})
+    def progress(fait, total):
+        if fait == 2: raise JobCancelled()
+    save_path = tmp_path / "agents.csv"
+
+    with pytest.raises(JobCancelled):
+        export_dataset(manager, 'agents', str(save_path), progress)
+
+    assert not save_path.exists()
+
+def test_export_accepts_a_bare_file_name_relative_to_the_working_directory(manager, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    manager.db.save_agent({'nom': 'ALAOUI', 'prenom': 'Sara', 'ppr': '1001', 'cadre': 'Infirmier'})
+
+    export_dataset(manager, 'agents', 'agents.csv')
+
+    assert (tmp_path / "agents.csv").read_text(encoding='utf-8').splitlines()[1].startswith("1,ALAOUI,Sara,1001")
+
+def test_agents_export_on_a_reader_does_not_store_the_fiscal_year(file_manager, tmp_path):
+    file_manager.db.save_agent({'nom': 'ALAOUI', 'prenom': 'Sara', 'ppr': '1001', 'cadre': 'Infirmier'})
+
+    export_dataset(file_manager, 'agents', str(tmp_path / "agents.csv"))
+
+    assert f"solde_{datetime.now().year}" in (tmp_path / "agents.csv").read_text(encoding='utf-8').splitlines()[0]
+    assert file_manager.db.execute_query("SELECT 1 FROM system_config WHERE config_key = 'annee_exercice'", fetch="one") is None
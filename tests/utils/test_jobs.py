@@ -0,0 +1,57 @@
+import threading
+import time
+
+from utils.config_loader import CONFIG
+from utils.jobs import JobCancelled, JobExecutor
+
+
+def _compter(n, progress=None):
+    for i in range(1, n + 1):
+        progress(i, n)
+    return n, CONFIG['app']['title']
+
+def _terminees(executor, timeout=60):
+    terminees, limite = [], time.monotonic() + timeout
+    while executor.jobs and time.monotonic() < limite:
+        terminees += executor.poll()
+        time.sleep(0.01)
+    return terminees + executor.poll()
+
+def test_thread_job_reports_progress_and_result():
+    executor = JobExecutor(max_threads=2)
+    try:
+        job = executor.submit("Comptage", _compter, 3, with_progress=True)
+        assert _terminees(executor) == [job]
+        assert job.result() == (3, CONFIG['app']['title']) and job.progress == (3, 3) and not job.cancelled
+    finally:
+        executor.shutdown()
+
+def test_cancelled_jobs_stop_while_waiting_or_at_next_progress():
+    executor = JobExecutor(max_threads=1)
+    started = threading.Event()
+    def boucle(progress=None):
+        started.set()
+        while True:
+            progress(0, 0)
+            time.sleep(0.01)
+    try:
+        en_cours = executor.submit("Boucle", boucle, with_progress=True)
+        en_attente = executor.submit("Comptage", _compter, 3, with_progress=True)
+        assert started.wait(5)
+        assert en_attente.describe() == "Comptage (en attente)"
+        en_attente.cancel()
+        en_cours.cancel()
+        assert {job.id for job in _terminees(executor)} == {en_cours.id, en_attente.id}
+        assert en_attente.future.cancelled() and isinstance(en_cours.result(), JobCancelled)
+        assert en_cours.cancelled and en_attente.cancelled
+    finally:
+        executor.shutdown()
+
+def test_cpu_bound_job_runs_in_a_worker_process_with_the_configuration():
+    executor = JobExecutor(max_processes=1)
+    try:
+        job = executor.submit("Comptage", _compter, 2, cpu_bound=True, with_progress=True)
+        assert _terminees(executor) == [job]
+        assert job.result() == (2, CONFIG['app']['title']) and job.progress == (2, 2)
+    finally:
+        executor.shutdown()
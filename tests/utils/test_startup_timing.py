@@ -0,0 +1,24 @@
+import json
+import os
+import subprocess
+import sys
+
+from utils.startup_timing import StartupTimer
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+
+def test_timer_reports_each_step_and_total():
+    timer = StartupTimer(start=0.0)
+    timer._last = 0.0
+    timer.mark("Import des modules")
+    timer.mark("Connexion à la base")
+    assert [step for step, _ in timer.steps] == ["Import des modules", "Connexion à la base"]
+    assert abs(sum(ms for _, ms in timer.steps) - timer.total_ms) < 1e-6
+    assert "Connexion à la base" in timer.report() and "Total" in timer.report()
+
+def test_startup_does_not_import_pages_or_heavy_libraries():
+    code = ("import sys, json, main; print(json.dumps([m for m in sys.modules if m.startswith('ui.pages') "
+            "or m.split('.')[0] in ('openpyxl', 'docx', 'holidays', 'tkcalendar')]))")
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT_DIR, capture_output=True, text=True, check=True)
+    assert json.loads(result.stdout.strip().splitlines()[-1]) == []
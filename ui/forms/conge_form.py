@@ -170,8 +170,8 @@ class CongeForm(tk.Toplevel):
     def _close_and_refresh(self, message=None):
         if message is None:
             message = "Congé modifié." if self.is_modification else "Congé ajouté."
+        # Les pages concernées se mettent à jour d'elles-mêmes (notifications de CongeManager).
         self.parent.set_status(message)
-        self.parent.refresh_all(self.agent_id)
         self.destroy()
 
     def _on_type_change(self, event=None):
@@ -76,7 +76,6 @@ class SoldeForm(tk.Toplevel):
         try:
             if self.manager.save_manual_soldes(self.agent_id, updates, creations):
                 messagebox.showinfo("Succès", "Les soldes ont été mis à jour.", parent=self)
-                self.parent.refresh_all(self.agent_id)
                 self.destroy()
         except Exception as e:
              messagebox.showerror("Erreur de Sauvegarde", f"La mise à jour a échoué : {e}", parent=self)
\ No newline at end of file
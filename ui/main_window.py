@@ -3,24 +3,31 @@
 
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
+import importlib
 import logging
 import os
 import sqlite3
-import threading
 from datetime import datetime, date
 import subprocess
 import sys
+import time
 
 from core.conges.manager import CongeManager
-from utils.file_utils import generate_decision_from_template
 from utils.date_utils import format_date_for_display, calculate_reprise_date
 from utils.config_loader import CONFIG
+from utils.jobs import JobExecutor
 
-from ui.pages.dashboard_page import DashboardPage
-from ui.pages.conges_management_page import CongesManagementPage
-from ui.pages.agents_management_page import AgentsManagementPage
-from ui.pages.administration_page import AdministrationPage
+# Pages de l'application (nom de classe -> module). Une page n'est importée et construite qu'à sa
+# première ouverture : ses requêtes d'initialisation ne retardent plus le démarrage.
+PAGE_MODULES = {
+    "AgentsManagementPage": "ui.pages.agents_management_page",
+    "CongesManagementPage": "ui.pages.conges_management_page",
+    "DashboardPage": "ui.pages.dashboard_page",
+    "AdministrationPage": "ui.pages.administration_page",
+}
 
+# Intervalle de relevé de l'avancement et de la fin des tâches longues.
+JOB_POLL_MS = 100
 
 class MainWindow(tk.Tk):
     def __init__(self, manager: CongeManager, base_dir: str):
@@ -33,6 +40,10 @@ class MainWindow(tk.Tk):
         
         self.restart_on_close = False
         self.status_var = tk.StringVar(value="Prêt.")
+        self.jobs_var = tk.StringVar()
+        # Tâches longues (exports, décisions, imports) : processus pour le calcul, threads pour les entrées-sorties.
+        self.jobs = JobExecutor()
+        self._job_poll_pending = False
 
         self.pages = {}
 
@@ -44,6 +55,10 @@ class MainWindow(tk.Tk):
         if messagebox.askokcancel("Quitter", "Voulez-vous vraiment quitter ?"):
             self.destroy()
 
+    def destroy(self):
+        self.jobs.shutdown()
+        super().destroy()
+
     def trigger_restart(self):
         self.restart_on_close = True
         self.destroy()
@@ -54,20 +69,30 @@ class MainWindow(tk.Tk):
 
     def show_page(self, page_name):
         """Affiche la page demandée et cache les autres."""
-        if page_name not in self.pages:
+        if page_name not in PAGE_MODULES:
             self.set_status(f"La page '{page_name}' n'est pas encore disponible.")
             return
 
         for page in self.pages.values():
             page.pack_forget()
         
-        page_to_show = self.pages[page_name]
+        page_to_show = self._get_page(page_name)
         page_to_show.pack(fill="both", expand=True, padx=10, pady=(0,10))
         
-        if hasattr(page_to_show, 'refresh_all'):
-            page_to_show.refresh_all()
-        elif hasattr(page_to_show, 'refresh_stats'):
-            page_to_show.refresh_stats()
+        # Les pages visibles suivent les modifications au fil de l'eau (CongeManager.events) ; une page
+        # n'est relue à l'ouverture que si elle a été modifiée pendant qu'elle était cachée.
+        # Le tableau de bord se charge en arrière-plan : la page s'affiche tout de suite et se remplit ensuite.
+        if getattr(page_to_show, 'dirty', True):
+            self._refresh_page(page_to_show)
+
+    def _get_page(self, page_name):
+        """Renvoie la page, en l'important et la construisant à la première demande."""
+        if page_name not in self.pages:
+            start = time.perf_counter()
+            PageClass = getattr(importlib.import_module(PAGE_MODULES[page_name]), page_name)
+            self.pages[page_name] = PageClass(parent=self, main_app=self, manager=self.manager)
+            logging.info(f"Page {page_name} construite en {(time.perf_counter() - start) * 1000:.0f} ms")
+        return self.pages[page_name]
 
     def create_widgets(self):
         style = ttk.Style(self)
@@ -86,22 +111,34 @@ class MainWindow(tk.Tk):
         ttk.Button(toolbar, text="Tableau de Bord", command=lambda: self.show_page("DashboardPage")).pack(side="left", padx=5)
         ttk.Button(toolbar, text="Administration", command=lambda: self.show_page("AdministrationPage")).pack(side="left", padx=5)
 
-        # --- CRÉATION DE TOUTES LES PAGES ---
-        for PageClass in (AgentsManagementPage, CongesManagementPage, DashboardPage, AdministrationPage):
-            page_name = PageClass.__name__
-            page = PageClass(parent=self, main_app=self, manager=self.manager)
-            self.pages[page_name] = page
+        # Les pages sont créées à leur première ouverture (voir _get_page).
             
-        status_bar = ttk.Label(self, textvariable=self.status_var, relief=tk.SUNKEN, anchor=tk.W)
+        status_bar = ttk.Frame(self)
         status_bar.pack(side="bottom", fill="x")
+        # File des tâches en cours : n'apparaît que s'il y en a ; son menu permet d'annuler chacune d'elles.
+        self.jobs_button = ttk.Menubutton(status_bar, textvariable=self.jobs_var)
+        self.jobs_menu = tk.Menu(self.jobs_button, tearoff=False, postcommand=self._build_jobs_menu)
+        self.jobs_button["menu"] = self.jobs_menu
+        self.status_label = ttk.Label(status_bar, textvariable=self.status_var, relief=tk.SUNKEN, anchor=tk.W)
+        self.status_label.pack(side="left", fill="x", expand=True)
         
     def refresh_all(self, agent_to_select_id=None):
-        """Rafraîchit toutes les pages."""
-        for page_name, page in self.pages.items():
-            if hasattr(page, 'refresh_all'):
-                page.refresh_all(agent_to_select_id)
-            elif hasattr(page, 'refresh_stats'):
-                page.refresh_stats()
+        """
+        Relit entièrement la page affichée et marque les autres à relire à leur ouverture. Sert après
+        une modification faite hors des notifications de l'interface (import en arrière-plan).
+        """
+        for page in self.pages.values():
+            if page.winfo_manager():
+                self._refresh_page(page, agent_to_select_id)
+            else:
+                page.dirty = True
+
+    def _refresh_page(self, page, agent_to_select_id=None):
+        if hasattr(page, 'refresh_all'):
+            page.refresh_all(agent_to_select_id)
+        elif hasattr(page, 'refresh_stats'):
+            page.refresh_stats()
+        page.dirty = False
 
     def _open_file(self, filepath):
         filepath = os.path.realpath(filepath)
@@ -112,28 +149,60 @@ class MainWindow(tk.Tk):
         except Exception as e:
             messagebox.showerror("Erreur d'Ouverture", f"Impossible d'ouvrir le fichier:\n{e}", parent=self)
             
-    def _run_long_task(self, task_lambda, on_complete, status_message):
-        self.set_status(status_message)
-        self.config(cursor="watch")
-        
-        result_container = []
-        def task_wrapper():
-            try: result_container.append(task_lambda())
-            except Exception as e: result_container.append(e)
-                
-        worker_thread = threading.Thread(target=task_wrapper)
-        worker_thread.start()
-        self._check_thread_completion(worker_thread, result_container, on_complete)
-    
-    def _check_thread_completion(self, thread, result_container, on_complete):
-        if thread.is_alive():
-            self.after(100, lambda: self._check_thread_completion(thread, result_container, on_complete))
+    def _run_long_task(self, task_lambda, on_complete, status_message, with_progress=False):
+        """
+        Exécute task_lambda dans le pool de threads des tâches (voir submit_job). Avec with_progress,
+        task_lambda reçoit progress(fait, total) : l'avancement s'affiche dans la barre d'état.
+        """
+        return self.submit_job(status_message, task_lambda, on_complete=on_complete, with_progress=with_progress)
+
+    def submit_job(self, label, fn, *args, on_complete=None, cpu_bound=False, with_progress=False, **kwargs):
+        """
+        Soumet fn(*args, **kwargs) à la file des tâches (utils.jobs.JobExecutor) : pool de processus si
+        cpu_bound, sinon pool de threads. on_complete(résultat ou exception) est appelé dans le thread Tk,
+        sauf si la tâche a été annulée.
+        """
+        job = self.jobs.submit(label, fn, *args, cpu_bound=cpu_bound, with_progress=with_progress, on_complete=on_complete, **kwargs)
+        self._show_jobs()
+        self._schedule_job_poll()
+        return job
+
+    def _schedule_job_poll(self):
+        # Une seule vérification programmée à la fois, quel que soit le nombre de tâches.
+        if not self._job_poll_pending:
+            self._job_poll_pending = True
+            self.after(JOB_POLL_MS, self._poll_jobs)
+
+    def _poll_jobs(self):
+        self._job_poll_pending = False
+        message = "Prêt."
+        for job in self.jobs.poll():
+            if job.cancelled:
+                message = f"{job.label} : annulé."
+            elif job.on_complete:
+                try: job.on_complete(job.result())
+                except Exception: logging.exception(f"Erreur à la fin de la tâche « {job.label} »")
+        if self.jobs.jobs:
+            self._show_jobs()
+            self._schedule_job_poll()
         else:
-            result = result_container[0] if result_container else None
-            on_complete(result)
-            self.config(cursor="")
-            self.set_status("Prêt.")
-    
+            self.jobs_button.pack_forget()
+            self.set_status(message)
+
+    def _show_jobs(self):
+        active = self.jobs.jobs
+        if not active: return
+        waiting = sum(1 for job in active if not (job.future.running() or job.future.done()))
+        self.jobs_var.set(f"Tâches : {len(active)}" + (f" (dont {waiting} en attente)" if waiting else "") + " ▾")
+        self.jobs_button.pack(side="right", before=self.status_label)
+        self.set_status(active[0].describe())
+
+    def _build_jobs_menu(self):
+        self.jobs_menu.delete(0, "end")
+        for job in self.jobs.jobs:
+            self.jobs_menu.add_command(label=f"Annuler : {job.describe()}", command=job.cancel,
+                                       state="disabled" if job.cancel_requested else "normal")
+
     def _on_task_complete(self, result):
         if isinstance(result, Exception):
             messagebox.showerror("Erreur", f"L'opération a échoué:\n{result}")
@@ -3,20 +3,15 @@
 
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-from datetime import datetime
+from datetime import datetime, date, timedelta
 import os
 import shutil
-import sys
-
-try:
-    import holidays
-except ImportError:
-    pass
 
 from ui.widgets.date_picker import DatePickerWindow
-from utils.date_utils import validate_date, format_date_for_display
+from utils.date_utils import validate_date, format_date_for_display, get_holidays_module
 from utils.config_loader import CONFIG
 from ui.widgets.secondary_windows import BackupWindow, EditHolidayWindow
+from core.conges.events import ChangeType
 
 class AdministrationPage(ttk.Frame):
     def __init__(self, parent, main_app, manager):
@@ -27,6 +22,8 @@ class AdministrationPage(ttk.Frame):
         self.annee_exercice = self.manager.get_annee_exercice()
         
         self._create_widgets()
+        self.dirty = True
+        self.manager.events.subscribe(self._on_data_changed, ChangeType.SOLDES_CHANGED, ChangeType.HOLIDAY_CHANGED)
         
     def _create_widgets(self):
         notebook = ttk.Notebook(self)
@@ -57,6 +54,17 @@ class AdministrationPage(ttk.Frame):
         backup_btn = ttk.Button(glissement_frame, text="Gérer les Sauvegardes / Restaurer", command=self._open_backup_window)
         backup_btn.pack(pady=5)
         
+        decisions_frame = ttk.LabelFrame(main_pane, text="Décisions de Congé du Mois", padding=10)
+        main_pane.add(decisions_frame, weight=1)
+        today = datetime.now()
+        self.decisions_month_var = tk.IntVar(value=today.month)
+        self.decisions_year_var = tk.IntVar(value=today.year)
+        ttk.Label(decisions_frame, text="Mois :").pack(side="left")
+        ttk.Spinbox(decisions_frame, from_=1, to=12, textvariable=self.decisions_month_var, width=4).pack(side="left", padx=5)
+        ttk.Label(decisions_frame, text="Année :").pack(side="left")
+        ttk.Spinbox(decisions_frame, from_=today.year - 5, to=today.year + 5, textvariable=self.decisions_year_var, width=6).pack(side="left", padx=5)
+        ttk.Button(decisions_frame, text="Générer les décisions (archive zip)", command=self._generate_month_decisions).pack(side="left", padx=10)
+
         apurement_frame = ttk.LabelFrame(main_pane, text="Apurement des Soldes Expirés", padding=10)
         main_pane.add(apurement_frame, weight=3)
         
@@ -121,6 +129,15 @@ class AdministrationPage(ttk.Frame):
         self.refresh_soldes_expires_list()
         self.refresh_holidays_list()
         
+    def _on_data_changed(self, event):
+        # Les listes de la page sont relues par ces notifications, y compris après ses propres actions.
+        if not self.winfo_manager():
+            self.dirty = True
+        elif event.type == ChangeType.HOLIDAY_CHANGED:
+            self.refresh_holidays_list()
+        else:
+            self.refresh_soldes_expires_list()
+
     def refresh_soldes_expires_list(self):
         for row in self.tree_expires.get_children(): self.tree_expires.delete(row)
         try:
@@ -147,8 +164,11 @@ class AdministrationPage(ttk.Frame):
                 return
             
             try:
-                self.manager.effectuer_glissement_annuel()
-                messagebox.showinfo("Succès", "Le glissement annuel a été effectué.\nUne sauvegarde a été créée.\n\nL'application va maintenant redémarrer.", parent=self)
+                rapport = self.manager.effectuer_glissement_annuel()
+                messagebox.showinfo("Succès", f"Le glissement annuel a été effectué en {rapport['duree_ms']} ms.\n"
+                                    f"- Soldes {rapport['annee_exercice']} créés : {rapport['soldes_crees']}\n"
+                                    f"- Soldes expirés : {rapport['soldes_expires']}\n"
+                                    "Une sauvegarde a été créée.\n\nL'application va maintenant redémarrer.", parent=self)
                 self.main_app.trigger_restart()
             except Exception as e:
                 messagebox.showerror("Erreur de Clôture", f"Le glissement a échoué : {e}", parent=self)
@@ -163,17 +183,49 @@ class AdministrationPage(ttk.Frame):
         if messagebox.askyesno("Confirmation", f"Mettre à zéro les {len(solde_ids)} soldes expirés sélectionnés ?\nCette action est irréversible.", parent=self):
             try:
                 self.manager.apurer_soldes(solde_ids)
-                self.refresh_soldes_expires_list()
             except Exception as e:
                 messagebox.showerror("Erreur", f"L'apurement a échoué : {e}", parent=self)
 
+    def _generate_month_decisions(self):
+        try:
+            annee, mois = self.decisions_year_var.get(), self.decisions_month_var.get()
+            first_day = date(annee, mois, 1)
+        except (tk.TclError, ValueError):
+            messagebox.showerror("Erreur", "Veuillez choisir un mois et une année valides.", parent=self)
+            return
+        last_day = date(annee + mois // 12, mois % 12 + 1, 1) - timedelta(days=1)
+        conge_ids = self.manager.get_conge_ids_starting_between(first_day, last_day)
+        if not conge_ids:
+            messagebox.showinfo("Aucun congé", f"Aucun congé ne débute en {first_day:%m/%Y}.", parent=self)
+            return
+        save_path = filedialog.asksaveasfilename(title="Enregistrer les décisions", initialfile=f"Decisions_{first_day:%Y-%m}.zip",
+                                                 defaultextension=".zip", filetypes=[("Archives zip", "*.zip")], parent=self)
+        if not save_path: return
+        from utils.decision_templates import generate_decisions_batch
+        # Lecture des contextes dans un thread ; rendu des .docx réparti sur le pool de processus des tâches.
+        jobs = self.main_app.jobs
+        self.main_app.submit_job(
+            f"Génération de {len(conge_ids)} décisions", generate_decisions_batch, self.manager, self.main_app.base_dir, conge_ids, save_path,
+            max_workers=jobs.max_processes, pool=jobs.process_pool, on_complete=self._on_decisions_generated, with_progress=True)
+
+    def _on_decisions_generated(self, result):
+        if isinstance(result, Exception):
+            messagebox.showerror("Erreur de Génération", f"La génération a échoué :\n{result}", parent=self)
+            return
+        done, errors = result
+        message = f"{done} décision(s) générée(s)."
+        if errors:
+            message += f"\n\n{len(errors)} congé(s) ignoré(s) :\n" + "\n".join(errors[:10])
+        messagebox.showinfo("Décisions du mois", message, parent=self)
+
     def refresh_holidays_list(self):
         for row in self.holidays_tree.get_children(): self.holidays_tree.delete(row)
         try:
             year = int(self.year_var.get())
             country_code = CONFIG['conges']['holidays_country']
             all_holidays = {}
-            if 'holidays' in sys.modules:
+            holidays = get_holidays_module()
+            if holidays:
                  for h_date, h_name in holidays.country_holidays(country_code, years=year).items():
                     all_holidays[h_date] = (h_name, "Officiel")
             
@@ -200,9 +252,7 @@ class AdministrationPage(ttk.Frame):
         if not date_obj: return
         
         if messagebox.askyesno("Confirmation", f"Supprimer le jour férié personnalisé '{date_str}' ?", parent=self):
-            if self.manager.delete_holiday(date_obj.strftime('%Y-%m-%d')):
-                self.refresh_holidays_list()
-            else:
+            if not self.manager.delete_holiday(date_obj.strftime('%Y-%m-%d')):
                 messagebox.showerror("Échec", "La suppression a échoué.", parent=self)
 
     def _edit_holiday(self):
@@ -215,9 +265,7 @@ class AdministrationPage(ttk.Frame):
         new_date_sql = new_date_obj.strftime('%Y-%m-%d')
         if original_date_sql != new_date_sql:
             self.manager.delete_holiday(original_date_sql)
-        if self.manager.add_or_update_holiday(new_date_sql, new_name, "Personnalisé"):
-            self.refresh_holidays_list()
-        else:
+        if not self.manager.add_or_update_holiday(new_date_sql, new_name, "Personnalisé"):
             messagebox.showerror("Échec", "La mise à jour a échoué.", parent=self)
 
     def add_holiday(self):
@@ -229,6 +277,5 @@ class AdministrationPage(ttk.Frame):
         
         if self.manager.add_holiday(validated_date.strftime("%Y-%m-%d"), desc, "Personnalisé"):
             self.desc_entry.delete(0, tk.END); self.date_entry.delete(0, tk.END)
-            self.refresh_holidays_list()
         else:
             messagebox.showerror("Erreur", "Cette date est déjà enregistrée.", parent=self)
\ No newline at end of file
@@ -5,10 +5,20 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 
 from utils.config_loader import CONFIG
-from ui.ui_utils import treeview_sort_column
 from ui.forms.agent_detail_form import AgentDetailForm
 from ui.agent_synthesis_window import AgentSynthesisWindow
+from ui.widgets.async_query import DebouncedQuery
+from ui.widgets.virtual_list import VirtualList, ListDataSource
 from utils.date_utils import format_date_for_display
+from core.conges.events import ChangeType
+
+# Valeurs brutes (dates, nombres) utilisées pour trier les colonnes dont l'affichage est formaté.
+# Les autres colonnes sont triées sur la valeur de leur accesseur.
+TYPED_SORT_KEYS = {
+    "Solde Total": lambda a: a.get_solde_total_actif(),
+    "Date prise de service": lambda a: a.date_prise_service,
+    "Date de fin de formation": lambda a: a.profil.date_fin_formation if a.profil else None,
+}
 
 class AgentsManagementPage(ttk.Frame):
     def __init__(self, parent, main_app, manager):
@@ -99,6 +109,10 @@ class AgentsManagementPage(ttk.Frame):
 
         self._create_widgets()
         self.category_panel.select_first_category()
+        # La liste vient d'être chargée ; une modification survenue pendant que la page est cachée
+        # la fera relire à sa prochaine ouverture (MainWindow.show_page).
+        self.dirty = False
+        self.manager.events.subscribe(self._on_data_changed, ChangeType.AGENT_SAVED, ChangeType.AGENT_DELETED, ChangeType.SOLDES_CHANGED)
 
     def _create_widgets(self):
         main_pane = ttk.PanedWindow(self, orient=tk.HORIZONTAL)
@@ -114,10 +128,13 @@ class AgentsManagementPage(ttk.Frame):
         search_frame.pack(fill=tk.X, padx=5, pady=5)
         ttk.Label(search_frame, text="Rechercher:").pack(side=tk.LEFT)
         self.search_var = tk.StringVar()
-        self.search_var.trace_add("write", lambda *args: self.refresh_all())
+        # Saisie : requête différée en arrière-plan ; seul le dernier résultat est affiché.
+        self.search_query = DebouncedQuery(self, self.manager, self._fetch_agents, self._render_agents)
+        self.search_var.trace_add("write", lambda *args: self.search_query.request(*self._query_params()))
         ttk.Entry(search_frame, textvariable=self.search_var).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
         
-        self.list_agents = ttk.Treeview(agents_container, show="headings", selectmode="extended")
+        # Liste virtuelle : seules les lignes visibles sont créées, même pour des milliers d'agents.
+        self.list_agents = VirtualList(agents_container, columns=(), selectmode="extended")
         self.list_agents.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         self.list_agents.bind("<Double-1>", self._on_double_click)
         
@@ -136,47 +153,61 @@ class AgentsManagementPage(ttk.Frame):
         column_defs = self.categories_config[self.current_category]["columns"]
         column_names = [name for name, _ in column_defs]
         
-        self.list_agents.config(columns=column_names)
-        for item in self.list_agents.get_children():
-            self.list_agents.delete(item)
-            
+        if tuple(column_names) == self.list_agents.columns: return
+
+        self.list_agents.set_columns(column_names)
         for col_name in column_names:
-            self.list_agents.heading(col_name, text=col_name, command=lambda c=col_name: treeview_sort_column(self.list_agents, c, False))
+            self.list_agents.heading(col_name, text=col_name)
             self.list_agents.column(col_name, width=120, anchor='w')
+        self.list_agents.enable_sorting()
 
     def refresh_all(self, agent_to_select_id=None):
+        # Actualisation directe (après un enregistrement) : synchrone, et prioritaire sur une recherche en cours.
+        self.search_query.cancel()
+        self._render_agents(self._fetch_agents(self.manager, *self._query_params()), agent_to_select_id)
+
+    def _on_data_changed(self, event):
+        """Modification publiée par le gestionnaire : seules les lignes des agents concernés sont relues."""
+        if not self.winfo_manager():
+            self.dirty = True
+            return
+        if event.agent_ids is None or self.search_var.get():
+            # Tous les agents, ou recherche en cours (classement fait par la base) : relecture complète.
+            self.refresh_all()
+            return
+        agents = [] if event.type == ChangeType.AGENT_DELETED else self.manager.get_agents_by_ids(event.agent_ids)
+        visibles = [a for a in agents if a.statut_agent == 'Actif' and self._in_category(a, self.current_category)]
+        # Même ordre que la liste lue par la base (AGENT_KEYSET_COLUMNS) : le prénom peut être NULL.
+        self.list_agents.patch(visibles, event.agent_ids - {a.id for a in visibles}, position_key=lambda a: (a.nom, a.prenom or '', a.id))
+
+    def _query_params(self):
+        return self.current_category, self.search_var.get() or None
+
+    def _in_category(self, agent, category):
+        category_conf = self.categories_config[category]
+        keywords = category_conf.get("keywords", [])
+        if not keywords: return True  # Cas "Tout le personnel"
+        cadre_lower = agent.cadre.lower()
+        # Doit contenir un mot-clé positif, et aucun mot-clé d'exclusion
+        return any(k.lower() in cadre_lower for k in keywords) and not any(ek.lower() in cadre_lower for ek in category_conf.get("exclude_keywords", []))
+
+    def _fetch_agents(self, manager, category, term):
+        """Agents actifs de la catégorie correspondant à la recherche. N'utilise aucun widget (appelé hors du thread Tk)."""
+        if not category: return []
+        return [agent for agent in manager.get_all_agents(statut='Actif', term=term) if self._in_category(agent, category)]
+
+    def _render_agents(self, agents_in_category, agent_to_select_id=None):
         self._setup_agent_list_columns()
         if not self.current_category: return
         
-        category_conf = self.categories_config[self.current_category]
-        keywords = category_conf.get("keywords", [])
-        exclude_keywords = category_conf.get("exclude_keywords", [])
-        
-        all_agents = self.manager.get_all_agents(statut='Actif', term=self.search_var.get() or None)
-        
-        agents_in_category = []
-        if not keywords: # Cas "Tout le personnel"
-            agents_in_category = all_agents
-        else:
-            for agent in all_agents:
-                cadre_lower = agent.cadre.lower()
-                # Doit contenir un mot-clé positif
-                if any(k.lower() in cadre_lower for k in keywords):
-                    # Ne doit contenir aucun mot-clé d'exclusion
-                    if not any(ek.lower() in cadre_lower for ek in exclude_keywords):
-                        agents_in_category.append(agent)
-        
-        for agent in agents_in_category:
-            values = self._get_agent_values(agent)
-            self.list_agents.insert("", "end", values=values, iid=agent.id)
-            
+        column_defs = self.categories_config[self.current_category]["columns"]
+        sort_keys = {i: TYPED_SORT_KEYS.get(name, accessor) for i, (name, accessor) in enumerate(column_defs)}
+        # Les valeurs des colonnes ne sont calculées que pour les lignes affichées.
+        self.list_agents.set_source(ListDataSource(agents_in_category, key_fn=lambda a: a.id, values_fn=self._get_agent_values, sort_keys=sort_keys))
+
         if agent_to_select_id:
-            try:
-                self.list_agents.selection_set(str(agent_to_select_id))
-                self.list_agents.focus(str(agent_to_select_id))
-                self.list_agents.see(str(agent_to_select_id))
-            except tk.TclError:
-                pass
+            self.list_agents.selection_set(agent_to_select_id)
+            self.list_agents.see(agent_to_select_id)
 
     def _get_agent_values(self, agent):
         if not self.current_category: return []
@@ -190,11 +221,16 @@ class AgentsManagementPage(ttk.Frame):
     def _open_agent_profile(self):
         selected_items = self.list_agents.selection()
         if len(selected_items) == 1:
-            agent_id = int(selected_items[0])
-            AgentDetailForm(self.main_app, self.manager, agent_id_to_modify=agent_id, on_close_callback=self.refresh_all)
+            agent_id = selected_items[0]
+            AgentDetailForm(self.main_app, self.manager, agent_id_to_modify=agent_id, on_close_callback=self._select_agent)
 
     def _add_agent(self):
-        AgentDetailForm(self.main_app, self.manager, on_close_callback=self.refresh_all)
+        # La ligne est ajoutée par la notification d'enregistrement ; il ne reste qu'à la sélectionner.
+        AgentDetailForm(self.main_app, self.manager, on_close_callback=self._select_agent)
+
+    def _select_agent(self, agent_id):
+        self.list_agents.selection_set(agent_id)
+        self.list_agents.see(agent_id)
 
 
 class CategoryPanel(ttk.Frame):
@@ -4,17 +4,18 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import os
-from datetime import datetime, date
 from collections import defaultdict
 
 from ui.panels.agents_panel import AgentsPanel
-from utils.date_utils import format_date_for_display_short, calculate_reprise_date, format_date_for_display
+from utils.date_utils import format_date_for_display_short
 from utils.config_loader import CONFIG
 from ui.forms.conge_form import CongeForm
 from ui.forms.solde_form import SoldeForm
 from ui.agent_synthesis_window import AgentSynthesisWindow
-from ui.ui_utils import treeview_sort_column
+from ui.widgets.virtual_list import VirtualList, ListDataSource, GroupedDataSource
 from utils.file_utils import generate_decision_from_template
+from utils.decision_templates import build_decision_context, decision_template_path, decision_filename
+from core.conges.events import ChangeType
 
 class CongesManagementPage(ttk.Frame):
     def __init__(self, parent, main_app, manager):
@@ -23,6 +24,10 @@ class CongesManagementPage(ttk.Frame):
         self.manager = manager
         
         self._create_widgets()
+        # AgentsPanel charge la première page dès sa construction ; ensuite, la page n'est relue à
+        # l'ouverture que si une modification est survenue pendant qu'elle était cachée.
+        self.dirty = False
+        self.manager.events.subscribe(self._on_data_changed)
 
     def _create_widgets(self):
         main_pane = ttk.PanedWindow(self, orient=tk.HORIZONTAL)
@@ -46,6 +51,13 @@ class CongesManagementPage(ttk.Frame):
     def _on_agent_select(self, agent_id):
         self.conges_details_panel.display_conges_for_agent(agent_id)
 
+    def _on_data_changed(self, event):
+        if not self.winfo_manager():
+            self.dirty = True
+            return
+        self.agents_panel.apply_change(event)
+        self.conges_details_panel.apply_change(event)
+
     def refresh_all(self, agent_to_select_id=None):
         self.agents_panel.refresh_all(agent_to_select_id)
         if agent_to_select_id is None:
@@ -75,13 +87,15 @@ class CongesDetailsPanel(ttk.Frame):
         self.conge_filter_combo.pack(side=tk.LEFT, fill=tk.X, expand=True)
         self.conge_filter_combo.bind("<<ComboboxSelected>>", lambda e: self.display_conges_for_agent(self.current_agent_id))
 
-        cols_conges = ("CongeID", "Certificat", "Type", "Début", "Fin", "Reprise", "Jours")
-        self.list_conges = ttk.Treeview(parent_tab, columns=cols_conges, show="headings", selectmode="browse")
+        # Historique en liste virtuelle : une ligne de synthèse par année, suivie des congés de l'année.
+        # L'identifiant du congé sert de clé de ligne (plus de colonne "CongeID" masquée).
+        cols_conges = ("Certificat", "Type", "Début", "Fin", "Reprise", "Jours")
+        self.list_conges = VirtualList(parent_tab, columns=cols_conges, selectmode="browse")
         
         for col in cols_conges:
-            self.list_conges.heading(col, text=col, command=lambda c=col: treeview_sort_column(self.list_conges, c, False))
+            self.list_conges.heading(col, text=col)
+        self.list_conges.enable_sorting()
         
-        self.list_conges.column("CongeID", width=0, stretch=False)
         self.list_conges.column("Certificat", width=80, anchor="center")
         self.list_conges.column("Type", width=120)
         self.list_conges.column("Jours", width=50, anchor="center")
@@ -111,47 +125,59 @@ class CongesDetailsPanel(ttk.Frame):
     
     def display_conges_for_agent(self, agent_id):
         self.current_agent_id = agent_id
-        self.list_conges.delete(*self.list_conges.get_children())
         if not agent_id:
+            self.list_conges.set_source(ListDataSource())
             self._update_conge_action_buttons_state()
             return
 
         filtre = self.conge_filter_var.get()
-        conges_data = self.manager.get_conges_for_agent(agent_id)
+        # Une seule requête : congés, certificats et dates de reprise déjà calculées.
+        lignes = self.manager.get_conges_history(agent_id, type_conge=None if filtre == "Tous" else filtre)
         
-        conges_par_annee = defaultdict(list)
-        for c in conges_data:
-            if filtre != "Tous" and c.type_conge != filtre: continue
-            if c.date_debut:
-                conges_par_annee[c.date_debut.year].append(c)
-
-        for annee in sorted(conges_par_annee.keys(), reverse=True):
-            total_jours = sum(c.jours_pris for c in conges_par_annee[annee] if c.type_conge == 'Congé annuel' and c.statut == 'Actif')
-            summary_id = self.list_conges.insert("", "end", values=("", "", f"📅 ANNÉE {annee}", "", "", f"Total: {total_jours} j", ""), tags=("summary",), open=True)
-            
-            holidays_set = self.manager.get_holidays_set_for_period(annee, annee + 1)
-            for conge in sorted(conges_par_annee[annee], key=lambda c: c.date_debut):
-                cert_status = "✅" if self.manager.get_certificat_for_conge(conge.id) else "❌" if conge.type_conge == 'Congé de maladie' else ""
-                reprise = calculate_reprise_date(conge.date_fin, holidays_set)
-                tags = ('annule',) if conge.statut == 'Annulé' else ()
-                
-                self.list_conges.insert(summary_id, "end", values=(
-                    conge.id, cert_status, conge.type_conge, 
-                    format_date_for_display_short(conge.date_debut), 
-                    format_date_for_display_short(conge.date_fin), 
-                    format_date_for_display_short(reprise) if reprise else "",
-                    conge.jours_pris
-                ), tags=tags)
+        lignes_par_annee = defaultdict(list)
+        for ligne in lignes:
+            if ligne.conge.date_debut:
+                lignes_par_annee[ligne.conge.date_debut.year].append(ligne)
+
+        groups = [(annee, sorted(lignes_par_annee[annee], key=lambda l: l.conge.date_debut)) for annee in sorted(lignes_par_annee.keys(), reverse=True)]
+
+        def summary_values(annee):
+            total_jours = sum(l.conge.jours_pris for l in lignes_par_annee[annee] if l.conge.type_conge == 'Congé annuel' and l.conge.statut == 'Actif')
+            return ("", f"📅 ANNÉE {annee}", "", "", f"Total: {total_jours} j", "")
+
+        def conge_values(ligne):
+            conge = ligne.conge
+            cert_status = "✅" if ligne.certificat_fourni else "❌" if conge.type_conge == 'Congé de maladie' else ""
+            return (cert_status, conge.type_conge,
+                    format_date_for_display_short(conge.date_debut),
+                    format_date_for_display_short(conge.date_fin),
+                    format_date_for_display_short(ligne.date_reprise) if ligne.date_reprise else "",
+                    conge.jours_pris)
+
+        self.list_conges.set_source(GroupedDataSource(
+            groups, key_fn=lambda l: l.conge.id, values_fn=conge_values,
+            header_key_fn=lambda annee: ('annee', annee), header_values_fn=summary_values,
+            tags_fn=lambda l: ('annule',) if l.conge.statut == 'Annulé' else (),
+            # Tri sur les dates et durées elles-mêmes.
+            sort_keys={1: lambda l: l.conge.type_conge, 2: lambda l: l.conge.date_debut, 3: lambda l: l.conge.date_fin,
+                       4: lambda l: l.date_reprise, 5: lambda l: l.conge.jours_pris}))
         
         self._update_conge_action_buttons_state()
 
+    def apply_change(self, event):
+        """Relit l'historique affiché si la modification concerne l'agent sélectionné (ou les dates de reprise)."""
+        if self.current_agent_id is None: return
+        if event.type == ChangeType.AGENT_DELETED and event.concerns(self.current_agent_id):
+            self.display_conges_for_agent(None)
+        elif event.type == ChangeType.HOLIDAY_CHANGED or (event.type in (ChangeType.LEAVE_ADDED, ChangeType.LEAVE_REMOVED) and event.concerns(self.current_agent_id)):
+            self.display_conges_for_agent(self.current_agent_id)
+
     def get_selected_conge_id(self):
         selection = self.list_conges.selection()
-        if not selection: return None
-        item = self.list_conges.item(selection[0])
-        if "summary" in item["tags"] or not item["values"] or not item["values"][0]:
+        # Les lignes de synthèse ont pour clé ('annee', annee) : seules les clés entières sont des congés.
+        if not selection or not isinstance(selection[0], int):
             return None
-        return int(item["values"][0])
+        return selection[0]
 
     def _update_conge_action_buttons_state(self, event=None):
         agent_selected = self.current_agent_id is not None
@@ -183,7 +209,6 @@ class CongesDetailsPanel(ttk.Frame):
             try:
                 if self.manager.delete_conge(conge_id):
                     self.main_app.set_status("Congé supprimé.")
-                    self.main_app.pages["CongesManagementPage"].refresh_all(self.current_agent_id)
             except Exception as e:
                 messagebox.showerror("Erreur de suppression", str(e))
 
@@ -204,33 +229,15 @@ class CongesDetailsPanel(ttk.Frame):
         conge = self.manager.get_conge_by_id(conge_id)
         if not conge or not agent: return
         
-        holidays_set = self.manager.get_holidays_set_for_period(conge.date_fin.year, conge.date_fin.year + 1)
-        date_reprise = calculate_reprise_date(conge.date_fin, holidays_set)
-        
-        details_solde_str = ""
-        if conge.type_conge == "Congé annuel":
-            details = self.manager.get_deduction_details(agent.id, conge.jours_pris)
-            parts = [f"{int(round(days))} {'jour' if int(round(days)) == 1 else 'jours'} au titre de l'année {year}" for year, days in sorted(details.items())]
-            details_solde_str = " et ".join(parts)
-
-        context = {
-            "{{nom_complet}}": f"{agent.nom} {agent.prenom}", "{{grade}}": agent.cadre, "{{ppr}}": agent.ppr,
-            "{{date_debut}}": format_date_for_display(conge.date_debut), "{{date_fin}}": format_date_for_display(conge.date_fin),
-            "{{date_reprise}}": format_date_for_display(date_reprise) if date_reprise else "N/A",
-            "{{jours_pris}}": str(conge.jours_pris), "{{details_solde}}": details_solde_str,
-            "{{date_aujourdhui}}": date.today().strftime("%d/%m/%Y")
-        }
-        
-        templates_dir_name = CONFIG.get('paths', {}).get('templates_dir', 'templates')
-        grade_str = agent.cadre.lower().replace(" ", "_")
-        template_name = f"{grade_str}.docx"
-        template_path = os.path.join(self.main_app.base_dir, templates_dir_name, template_name)
+        context = build_decision_context(self.manager, agent, conge)
+        template_path = decision_template_path(self.main_app.base_dir, agent)
+        template_name = os.path.basename(template_path)
         
         if not os.path.exists(template_path):
             messagebox.showerror("Modèle manquant", f"Le modèle '{template_name}' est introuvable.", parent=self.main_app)
             return
 
-        initial_filename = f"Decision_Conge_{agent.nom}_{conge.date_debut.strftime('%Y-%m-%d')}.docx"
+        initial_filename = decision_filename(agent, conge)
         save_path = filedialog.asksaveasfilename(
             title="Enregistrer la décision", initialfile=initial_filename, defaultextension=".docx",
             filetypes=[("Documents Word", "*.docx")]
@@ -3,10 +3,11 @@
 
 import tkinter as tk
 from tkinter import ttk
-from datetime import datetime, timedelta
+from datetime import datetime
 import logging
 
-from utils.date_utils import format_date_for_display, calculate_reprise_date, validate_date
+from utils.date_utils import format_date_for_display
+from ui.widgets.async_query import SectionedRefresh
 
 class DashboardPage(ttk.Frame):
     def __init__(self, parent, main_app, manager):
@@ -21,6 +22,17 @@ class DashboardPage(ttk.Frame):
         self.filter_specialite = tk.StringVar(value="Tous")
         
         self._create_widgets()
+        # Données calculées hors du thread Tk, affichées section par section dès leur arrivée.
+        self.refresh = SectionedRefresh(self, manager, [
+            ('filtres', lambda reader, filtres, today: reader.get_dashboard_filter_values()),
+            ('comptages', lambda reader, filtres, today: reader.get_dashboard_counts(filtres)),
+            ('en_cours', lambda reader, filtres, today: reader.get_leaves_in_progress(today, filtres)),
+            ('a_venir', lambda reader, filtres, today: reader.get_leaves_starting_soon(today, 7, filtres)),
+        ], self._render_section, on_done=lambda: self.main_app.set_status("Prêt."), on_error=self._on_section_error)
+        # Toute modification peut changer les chiffres : actualisation immédiate si la page est affichée,
+        # sinon à sa prochaine ouverture.
+        self.dirty = True
+        self.manager.events.subscribe(self._on_data_changed)
         
     def _create_widgets(self):
         canvas = tk.Canvas(self)
@@ -83,59 +95,44 @@ class DashboardPage(ttk.Frame):
         for col in cols_upcoming: self.list_upcoming.heading(col, text=col)
         self.list_upcoming.pack(fill="both", expand=True, padx=5, pady=5)
 
-    def _populate_filters(self, all_agents):
-        cadres = sorted(list(set(agent.cadre for agent in all_agents if agent.cadre)))
-        services = sorted(list(set(agent.service_affectation for agent in all_agents if agent.service_affectation)))
-        specialites = sorted(list(set(agent.specialite for agent in all_agents if agent.specialite)))
-        
-        self.cadre_combo['values'] = ["Tous"] + cadres
-        self.service_combo['values'] = ["Tous"] + services
-        self.specialite_combo['values'] = ["Tous"] + specialites
+    def _populate_filters(self, valeurs):
+        self.cadre_combo['values'] = ["Tous"] + valeurs['cadre']
+        self.service_combo['values'] = ["Tous"] + valeurs['service']
+        self.specialite_combo['values'] = ["Tous"] + valeurs['specialite']
+
+    def _get_filtres(self):
+        """Filtres sélectionnés ("Tous" = pas de filtre), calculés en SQL par le gestionnaire."""
+        filtres = {'cadre': self.filter_cadre.get(), 'service': self.filter_service.get(), 'specialite': self.filter_specialite.get()}
+        return {key: (None if value == "Tous" else value) for key, value in filtres.items()}
 
     def refresh_stats(self):
+        """Lance l'actualisation en arrière-plan et rend la main immédiatement (demandes en cours regroupées)."""
         self.main_app.set_status("Chargement du tableau de bord...")
-        
-        all_agents = self.manager.get_all_agents(statut='Actif')
-        all_agents_map = {agent.id: agent for agent in all_agents}
-        all_active_leaves = [c for c in self.manager.get_all_conges() if c.statut == 'Actif']
-        
-        self._populate_filters(all_agents)
-        
-        filtered_agents_ids = set(all_agents_map.keys())
-        if self.filter_cadre.get() != "Tous":
-            filtered_agents_ids &= {id for id, agent in all_agents_map.items() if agent.cadre == self.filter_cadre.get()}
-        if self.filter_service.get() != "Tous":
-            filtered_agents_ids &= {id for id, agent in all_agents_map.items() if agent.service_affectation == self.filter_service.get()}
-        if self.filter_specialite.get() != "Tous":
-            filtered_agents_ids &= {id for id, agent in all_agents_map.items() if agent.specialite == self.filter_specialite.get()}
-
-        self.stats_agents_actifs.config(text=f"Agents actifs : {len(all_agents)}")
-        self.stats_total_conges.config(text=f"Congés enregistrés (actifs) : {len(all_active_leaves)}")
-
-        for row in self.list_on_leave.get_children(): self.list_on_leave.delete(row)
-        holidays_set = self.manager.get_holidays_set_for_period(self.annee_exercice, self.annee_exercice + 1)
-        today = datetime.now().date()
-
-        for conge in all_active_leaves:
-            if conge.agent_id in filtered_agents_ids:
-                start = conge.date_debut.date() if isinstance(conge.date_debut, datetime) else conge.date_debut
-                end = conge.date_fin.date() if isinstance(conge.date_fin, datetime) else conge.date_fin
-                if start and end and start <= today <= end:
-                    agent = all_agents_map[conge.agent_id]
-                    reprise = format_date_for_display(calculate_reprise_date(conge.date_fin, holidays_set))
-                    self.list_on_leave.insert("", "end", values=(f"{agent.nom} {agent.prenom}", agent.ppr, conge.type_conge, reprise))
-
-        for row in self.list_upcoming.get_children(): self.list_upcoming.delete(row)
-        one_week_from_now = today + timedelta(days=7)
-
-        for conge in sorted(all_active_leaves, key=lambda c: c.date_debut):
-            if conge.agent_id in filtered_agents_ids:
-                start = conge.date_debut.date() if isinstance(conge.date_debut, datetime) else conge.date_debut
-                if start and today < start <= one_week_from_now:
-                    agent = all_agents_map[conge.agent_id]
-                    self.list_upcoming.insert("", "end", values=(f"{agent.nom} {agent.prenom}", agent.ppr, conge.type_conge, format_date_for_display(conge.date_debut)))
-
-        self.main_app.set_status("Prêt.")
+        self.refresh.request(self._get_filtres(), datetime.now().date())
+
+    def _on_data_changed(self, event):
+        if self.winfo_manager(): self.refresh_stats()
+        else: self.dirty = True
+
+    def _render_section(self, name, result):
+        if name == 'filtres':
+            self._populate_filters(result)
+        elif name == 'comptages':
+            self.stats_agents_actifs.config(text=f"Agents actifs : {result['agents_actifs']}")
+            self.stats_total_conges.config(text=f"Congés enregistrés (actifs) : {result['conges_actifs']}")
+        elif name == 'en_cours':
+            self._fill(self.list_on_leave, result, 'date_reprise')
+        elif name == 'a_venir':
+            self._fill(self.list_upcoming, result, 'date_debut')
+
+    def _fill(self, tree, lignes, date_key):
+        tree.delete(*tree.get_children())
+        for ligne in lignes:
+            tree.insert("", "end", values=(f"{ligne['nom']} {ligne['prenom'] or ''}", ligne['ppr'], ligne['type_conge'], format_date_for_display(ligne[date_key])))
+
+    def _on_section_error(self, name, error):
+        logging.error(f"Tableau de bord : échec du chargement de '{name}' : {error}", exc_info=error)
+        self.main_app.set_status("Erreur lors du chargement du tableau de bord.")
 
     def refresh_all(self, agent_to_select_id=None):
         self.refresh_stats()
\ No newline at end of file
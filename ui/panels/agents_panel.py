@@ -6,10 +6,12 @@ from tkinter import ttk, messagebox, filedialog
 from datetime import datetime
 
 from utils.config_loader import CONFIG
-from ui.ui_utils import treeview_sort_column
 from ui.forms.agent_detail_form import AgentDetailForm
 from ui.agent_synthesis_window import AgentSynthesisWindow
+from ui.widgets.async_query import DebouncedQuery
+from ui.widgets.virtual_list import VirtualList, ListDataSource
 from utils.date_utils import format_date_for_display
+from core.conges.events import ChangeType
 
 class AgentsPanel(ttk.Frame):
     def __init__(self, parent_widget, main_app, manager, base_dir, on_agent_select_callback=None, view_mode="agents"):
@@ -26,7 +28,14 @@ class AgentsPanel(ttk.Frame):
         self.current_page = 1
         self.items_per_page = 50
         self.total_pages = 1
+        # Pagination keyset : clés de tri de la première et de la dernière ligne affichées, et
+        # (curseur, direction) qui permet de recharger la page courante.
+        self.page_cursors = (None, None)
+        self._page_request = (None, 'next')
+        self._prefetched = {}
         self.status_filter_var = tk.StringVar(value="Actif")
+        # Tri de la vue paginée, fait en SQL : (clé de get_agents, décroissant) ; conservé entre actualisations.
+        self.sort_order = (None, False)
 
         # Variables pour la vue 'agents'
         self.current_category = None
@@ -39,7 +48,14 @@ class AgentsPanel(ttk.Frame):
         }
         
         self.search_var = tk.StringVar()
-        self.search_var.trace_add("write", lambda *args: self.refresh_all())
+        # Saisie : requête différée en arrière-plan, commune aux deux modes ; seul le dernier résultat est affiché.
+        if self.view_mode == "agents":
+            self.search_query = DebouncedQuery(self, self.manager, self._fetch_agents_view, self._render_agents_view)
+        else:
+            self.search_query = DebouncedQuery(self, self.manager, self._fetch_conges_view, self._render_conges_view)
+            self.prefetch_query = DebouncedQuery(self, self.manager, lambda manager, *params: (params, self._fetch_conges_view(manager, *params)),
+                                                 self._store_prefetched_page, delay_ms=0)
+        self.search_var.trace_add("write", lambda *args: self._on_search_change())
 
         self._create_widgets()
 
@@ -69,7 +85,7 @@ class AgentsPanel(ttk.Frame):
         ttk.Label(search_frame, text="Rechercher:").pack(side=tk.LEFT)
         ttk.Entry(search_frame, textvariable=self.search_var).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
         
-        self.list_agents = ttk.Treeview(agents_container, show="headings", selectmode="extended")
+        self.list_agents = VirtualList(agents_container, columns=(), selectmode="extended")
         self.list_agents.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         self.list_agents.bind("<Double-1>", lambda e: self._open_agent_profile())
         
@@ -87,8 +103,8 @@ class AgentsPanel(ttk.Frame):
 
         filter_frame = ttk.Frame(top_bar_frame)
         filter_frame.pack(side=tk.LEFT, padx=(0, 20))
-        ttk.Radiobutton(filter_frame, text="Agents Actifs", variable=self.status_filter_var, value="Actif", command=self.refresh_all).pack(anchor='w')
-        ttk.Radiobutton(filter_frame, text="Agents Archivés", variable=self.status_filter_var, value="Archivé", command=self.refresh_all).pack(anchor='w')
+        ttk.Radiobutton(filter_frame, text="Agents Actifs", variable=self.status_filter_var, value="Actif", command=self.search_agents).pack(anchor='w')
+        ttk.Radiobutton(filter_frame, text="Agents Archivés", variable=self.status_filter_var, value="Archivé", command=self.search_agents).pack(anchor='w')
 
         search_frame = ttk.Frame(top_bar_frame)
         search_frame.pack(fill=tk.X, expand=True, side=tk.LEFT)
@@ -96,14 +112,14 @@ class AgentsPanel(ttk.Frame):
         ttk.Entry(search_frame, textvariable=self.search_var).pack(fill=tk.X, expand=True, side=tk.LEFT)
         
         an_n, an_n1, an_n2 = self.annee_exercice, self.annee_exercice - 1, self.annee_exercice - 2
-        cols = ["ID", "Nom", "Prénom", "Cadre/Grade", f"Solde {an_n2}", f"Solde {an_n1}", f"Solde {an_n}", "Solde Total"]
-        
-        self.list_agents = ttk.Treeview(agents_frame, columns=cols, show="headings", selectmode="extended")
+        cols = ["Nom", "Prénom", "Cadre/Grade", f"Solde {an_n2}", f"Solde {an_n1}", f"Solde {an_n}", "Solde Total"]
+        self.conges_sort_keys = ["nom", "prenom", "cadre", f"solde_{an_n2}", f"solde_{an_n1}", f"solde_{an_n}", "solde_total"]
         
+        # L'identifiant de l'agent sert de clé de ligne : plus besoin d'une colonne "ID" masquée.
+        self.list_agents = VirtualList(agents_frame, columns=cols, selectmode="extended")
         for col in cols:
-            self.list_agents.heading(col, text=col, command=lambda c=col: treeview_sort_column(self.list_agents, c, False))
-        
-        self.list_agents.column("ID", width=0, stretch=False)
+            self.list_agents.heading(col, text=col)
+        self.list_agents.enable_sorting(command=self._on_conges_sort)
         self.list_agents.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         self.list_agents.bind("<<TreeviewSelect>>", self._on_agent_select)
         self.list_agents.bind("<Double-1>", self._on_double_click_synthesis)
@@ -115,88 +131,164 @@ class AgentsPanel(ttk.Frame):
         self.next_button = ttk.Button(pagination_frame, text="Suivant >>", command=self.next_page); self.next_button.pack(side=tk.RIGHT)
 
     def refresh_all(self, agent_to_select_id=None):
+        # Actualisation directe (après un enregistrement, changement de page...) : synchrone et prioritaire.
+        self.search_query.cancel()
         if self.view_mode == "agents":
-            self._refresh_agents_view(agent_to_select_id)
+            self._render_agents_view(self._fetch_agents_view(self.manager, *self._query_params()), agent_to_select_id)
         else:
-            self._refresh_conges_view(agent_to_select_id)
+            # Relit la page courante à partir de sa première ligne ; la page préchargée peut être périmée.
+            self.prefetch_query.cancel()
+            self._prefetched.clear()
+            self._render_conges_view(self._fetch_conges_view(self.manager, *self._query_params()), agent_to_select_id)
+
+    def apply_change(self, event):
+        """Répercute une modification publiée par le gestionnaire sur la liste affichée."""
+        if event.type in (ChangeType.LEAVE_ADDED, ChangeType.LEAVE_REMOVED, ChangeType.HOLIDAY_CHANGED):
+            return  # Les congés ne modifient la liste que par leurs soldes (SOLDES_CHANGED).
+        if self.view_mode == "conges" and event.type == ChangeType.SOLDES_CHANGED and event.agent_ids is not None \
+                and not (self.sort_order[0] or '').startswith('solde'):
+            # Soldes modifiés sans effet sur l'ordre : seules les lignes affichées concernées sont relues.
+            self._prefetched.clear()
+            shown = [agent_id for agent_id in event.agent_ids if self.list_agents.source.index_of(agent_id) is not None]
+            if shown: self.list_agents.patch(self.manager.get_agents_by_ids(shown))
+            return
+        # Agent ajouté, renommé, archivé... : la page courante est relue à partir de sa première ligne.
+        self.refresh_all()
+
+    def _on_search_change(self):
+        if self.view_mode == "conges":
+            self._reset_pagination()
+        self.search_query.request(*self._query_params())
+
+    def _query_params(self):
+        if self.view_mode == "agents":
+            return self.current_category, self.search_var.get() or None
+        cursor, direction = self._page_request
+        return self.status_filter_var.get(), self.search_var.get().strip().lower() or None, self.current_page, cursor, direction, self.sort_order
+
+    def _on_conges_sort(self, column_index, descending):
+        # Vue paginée : le tri porte sur toutes les pages, il est donc fait par la base.
+        self.sort_order = (self.conges_sort_keys[column_index], descending)
+        self._reset_pagination()
+        self.refresh_all()
+
+    def _reset_pagination(self):
+        self.current_page = 1
+        self._page_request = (None, 'next')
+        self.prefetch_query.cancel()
+        self._prefetched.clear()
+
+    # Les méthodes _fetch_* n'utilisent aucun widget : elles peuvent s'exécuter hors du thread Tk.
+    def _fetch_agents_view(self, manager, category, term):
+        if not category: return []
+        keywords = self.categories_config[category]["keywords"]
+        all_agents = manager.get_all_agents(statut='Actif', term=term)
+        return [agent for agent in all_agents if any(k.lower() in agent.cadre.lower() for k in keywords)]
 
-    def _refresh_agents_view(self, agent_to_select_id=None):
+    def _fetch_conges_view(self, manager, statut, term, page, cursor, direction, sort_order):
+        # Le comptage est mis en cache par la base : il n'est recalculé que si les agents ont changé.
+        total_items = manager.get_agents_count(statut, term)
+        total_pages = max(1, (total_items + self.items_per_page - 1) // self.items_per_page)
+        order_by, descending = sort_order
+        fetch_page = lambda cursor, direction: manager.get_agents_page(statut=statut, term=term, limit=self.items_per_page, cursor=cursor,
+                                                                       direction=direction, order_by=order_by, descending=descending)
+        agents, first, last = fetch_page(cursor, direction)
+        if not agents and cursor is not None:
+            # La page a disparu (agents archivés ou supprimés entre-temps) : retour à la première.
+            page = 1
+            agents, first, last = fetch_page(None, 'next')
+        return min(page, total_pages), total_pages, agents, (first, last)
+
+    def _render_agents_view(self, agents_in_category, agent_to_select_id=None):
         self._setup_columns_for_category()
         if not self.current_category: return
 
-        keywords = self.categories_config[self.current_category]["keywords"]
-        all_agents = self.manager.get_all_agents(statut='Actif', term=self.search_var.get() or None)
-        agents_in_category = [agent for agent in all_agents if any(k.lower() in agent.cadre.lower() for k in keywords)]
-        
         columns_map = self.categories_config[self.current_category]["columns"]
-        for agent in agents_in_category:
-            values = self._get_agent_values_for_columns(agent, columns_map)
-            self.list_agents.insert("", "end", values=values, iid=agent.id)
-            
+        sort_keys = {i: (lambda a, c=col: self._get_agent_raw_value(a, c)) for i, col in enumerate(columns_map)}
+        self.list_agents.set_source(ListDataSource(agents_in_category, key_fn=lambda a: a.id,
+                                                   values_fn=lambda a: self._get_agent_values_for_columns(a, columns_map), sort_keys=sort_keys))
+
         if agent_to_select_id: self._select_agent_in_list(agent_to_select_id)
 
-    def _refresh_conges_view(self, agent_to_select_id=None):
-        for row in self.list_agents.get_children(): self.list_agents.delete(row)
-        
-        statut = self.status_filter_var.get()
-        term = self.search_var.get().strip().lower() or None
-        total_items = self.manager.get_agents_count(statut, term)
-        self.total_pages = max(1, (total_items + self.items_per_page - 1) // self.items_per_page)
-        self.current_page = min(self.current_page, self.total_pages)
-        offset = (self.current_page - 1) * self.items_per_page
-        
-        agents = self.manager.get_all_agents(statut=statut, term=term, limit=self.items_per_page, offset=offset)
-        
-        an_n, an_n1, an_n2 = self.annee_exercice, self.annee_exercice - 1, self.annee_exercice - 2
-        for agent in agents:
-            soldes = {s.annee: s.solde for s in agent.soldes_annuels}
-            values = (
-                agent.id, agent.nom, agent.prenom, agent.cadre,
-                f"{soldes.get(an_n2, 0.0):.1f} j", f"{soldes.get(an_n1, 0.0):.1f} j",
-                f"{soldes.get(an_n, 0.0):.1f} j", f"{agent.get_solde_total_actif():.1f} j"
-            )
-            self.list_agents.insert("", "end", values=values, iid=agent.id)
+    def _render_conges_view(self, page_data, agent_to_select_id=None):
+        self.current_page, self.total_pages, agents, self.page_cursors = page_data
+        first_cursor = self.page_cursors[0]
+        self._page_request = (first_cursor, 'start') if first_cursor is not None else (None, 'next')
+        self.list_agents.set_source(ListDataSource(agents, key_fn=lambda a: a.id, values_fn=self._get_soldes_values))
 
         if agent_to_select_id: self._select_agent_in_list(agent_to_select_id)
         
         self.page_label.config(text=f"Page {self.current_page} / {self.total_pages}")
         self.prev_button.config(state="normal" if self.current_page > 1 else "disabled")
         self.next_button.config(state="normal" if self.current_page < self.total_pages else "disabled")
+        self._prefetch_next_page()
+
+    def _prefetch_next_page(self):
+        """Charge la page suivante en arrière-plan : « Suivant » l'affiche ensuite sans attendre la base."""
+        if self.current_page >= self.total_pages or self.page_cursors[1] is None: return
+        statut, term, _, _, _, sort_order = self._query_params()
+        params = (statut, term, self.current_page + 1, self.page_cursors[1], 'next', sort_order)
+        if params not in self._prefetched:
+            self.prefetch_query.request(*params)
+
+    def _store_prefetched_page(self, result):
+        params, page_data = result
+        self._prefetched = {params: page_data}  # Seule la page suivante de la page affichée est utile.
+
+    def _show_page(self, page, cursor, direction):
+        self.search_query.cancel()
+        self.current_page, self._page_request = page, (cursor, direction)
+        params = self._query_params()
+        page_data = self._prefetched.pop(params, None) or self._fetch_conges_view(self.manager, *params)
+        self._render_conges_view(page_data)
+
+    def _get_soldes_values(self, agent):
+        an_n, an_n1, an_n2 = self.annee_exercice, self.annee_exercice - 1, self.annee_exercice - 2
+        soldes = {s.annee: s.solde for s in agent.soldes_annuels}
+        return (
+            agent.nom, agent.prenom, agent.cadre,
+            f"{soldes.get(an_n2, 0.0):.1f} j", f"{soldes.get(an_n1, 0.0):.1f} j",
+            f"{soldes.get(an_n, 0.0):.1f} j", f"{agent.get_solde_total_actif():.1f} j"
+        )
+
+    def _get_agent_raw_value(self, agent, col_name):
+        """Valeur brute d'une colonne (date, nombre, texte) : sert au tri et, une fois formatée, à l'affichage."""
+        col_attr = col_name.lower().replace(' ', '_').replace('/', '_')
+        if hasattr(agent, col_attr): return getattr(agent, col_attr)
+        if agent.profil and hasattr(agent.profil, col_attr): return getattr(agent.profil, col_attr)
+        if col_name == "Solde Total": return agent.get_solde_total_actif()
+        return None
 
     def _get_agent_values_for_columns(self, agent, columns):
         values = []
         for col_name in columns:
-            col_attr = col_name.lower().replace(' ', '_').replace('/', '_')
-            value = None
-            if hasattr(agent, col_attr): value = getattr(agent, col_attr)
-            elif agent.profil and hasattr(agent.profil, col_attr): value = getattr(agent.profil, col_attr)
-            elif col_name == "Solde Total": value = f"{agent.get_solde_total_actif():.1f} j"
-            if "date" in col_attr: value = format_date_for_display(value)
+            value = self._get_agent_raw_value(agent, col_name)
+            if "date" in col_name.lower(): value = format_date_for_display(value)
+            elif col_name == "Solde Total": value = f"{value:.1f} j"
             values.append(value or '')
         return values
 
     def _setup_columns_for_category(self):
         if not self.current_category: return
         new_cols = self.categories_config[self.current_category]["columns"]
-        self.list_agents.config(columns=new_cols)
-        for item in self.list_agents.get_children(): self.list_agents.delete(item)
+        if tuple(new_cols) == self.list_agents.columns: return
+        self.list_agents.set_columns(new_cols)
         for col in new_cols:
-            self.list_agents.heading(col, text=col, command=lambda c=col: treeview_sort_column(self.list_agents, c, False))
+            self.list_agents.heading(col, text=col)
             self.list_agents.column(col, width=120, anchor='w')
+        self.list_agents.enable_sorting()
             
     def _on_category_select(self, category_name):
         self.current_category = category_name
         self.refresh_all()
         
     def get_selected_agent_ids(self):
-        return [int(iid) for iid in self.list_agents.selection()]
+        return list(self.list_agents.selection())
 
     def _select_agent_in_list(self, agent_id):
-        try:
-            self.list_agents.selection_set(str(agent_id))
-            self.list_agents.focus(str(agent_id))
-            self.list_agents.see(str(agent_id))
-        except tk.TclError: pass # L'agent n'est pas dans la liste affichée
+        # Sans effet si l'agent n'est pas dans la liste affichée.
+        self.list_agents.selection_set(agent_id)
+        self.list_agents.see(agent_id)
 
     def _on_agent_select(self, event=None):
         if self.on_agent_select_callback:
@@ -207,10 +299,10 @@ class AgentsPanel(ttk.Frame):
     def _open_agent_profile(self):
         selected_ids = self.get_selected_agent_ids()
         if len(selected_ids) == 1:
-            AgentDetailForm(self.main_app, self.manager, agent_id_to_modify=selected_ids[0], on_close_callback=self.refresh_all)
+            AgentDetailForm(self.main_app, self.manager, agent_id_to_modify=selected_ids[0], on_close_callback=self._select_agent_in_list)
 
     def _add_agent(self):
-        AgentDetailForm(self.main_app, self.manager, on_close_callback=self.refresh_all)
+        AgentDetailForm(self.main_app, self.manager, on_close_callback=self._select_agent_in_list)
 
     def _on_double_click_synthesis(self, event=None):
         selected_ids = self.get_selected_agent_ids()
@@ -219,14 +311,14 @@ class AgentsPanel(ttk.Frame):
             
     def search_agents(self):
         if self.view_mode == "conges":
-            self.current_page = 1
+            self._reset_pagination()
         self.refresh_all()
 
     def prev_page(self):
-        if self.current_page > 1: self.current_page -= 1; self.refresh_all()
+        if self.current_page > 1: self._show_page(self.current_page - 1, self.page_cursors[0], 'prev')
 
     def next_page(self):
-        if self.current_page < self.total_pages: self.current_page += 1; self.refresh_all()
+        if self.current_page < self.total_pages: self._show_page(self.current_page + 1, self.page_cursors[1], 'next')
 
 class CategoryPanel(ttk.Frame):
     def __init__(self, parent, categories, on_select_callback):
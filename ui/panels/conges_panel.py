@@ -10,7 +10,7 @@ import os
 
 from ui.forms.conge_form import CongeForm
 from ui.ui_utils import treeview_sort_column
-from utils.date_utils import format_date_for_display_short, calculate_reprise_date
+from utils.date_utils import format_date_for_display_short
 from utils.config_loader import CONFIG
 
 class CongesPanel(ttk.LabelFrame):
@@ -80,31 +80,28 @@ class CongesPanel(ttk.LabelFrame):
             return
 
         filtre = self.conge_filter_var.get()
-        conges_data = self.manager.get_conges_for_agent(agent_id)
+        # Une seule requête : congés, certificats, intérimaires et dates de reprise déjà calculées.
+        lignes = self.manager.get_conges_history(agent_id, type_conge=None if filtre == "Tous" else filtre)
         
-        conges_par_annee = defaultdict(list)
-        for c in conges_data:
-            if filtre != "Tous" and c.type_conge != filtre:
-                continue
-            if c.date_debut:
-                conges_par_annee[c.date_debut.year].append(c)
+        lignes_par_annee = defaultdict(list)
+        for ligne in lignes:
+            if ligne.conge.date_debut:
+                lignes_par_annee[ligne.conge.date_debut.year].append(ligne)
             else:
-                logging.warning(f"Date de début invalide pour congé ID {c.id}")
+                logging.warning(f"Date de début invalide pour congé ID {ligne.conge.id}")
 
-        for annee in sorted(conges_par_annee.keys(), reverse=True):
-            total_jours = sum(c.jours_pris for c in conges_par_annee[annee] if c.type_conge == 'Congé annuel' and c.statut == 'Actif')
+        for annee in sorted(lignes_par_annee.keys(), reverse=True):
+            total_jours = sum(l.conge.jours_pris for l in lignes_par_annee[annee] if l.conge.type_conge == 'Congé annuel' and l.conge.statut == 'Actif')
             summary_id = self.list_conges.insert("", "end", values=("", "", f"📅 ANNÉE {annee}", "", "", "", total_jours, f"{total_jours} jours pris", ""), tags=("summary",), open=True)
             
-            holidays_set = self.manager.get_holidays_set_for_period(annee, annee + 1)
-            for conge in sorted(conges_par_annee[annee], key=lambda c: c.date_debut):
-                cert_status = "✅ Fourni" if self.manager.get_certificat_for_conge(conge.id) else "❌ Manquant" if conge.type_conge == 'Congé de maladie' else ""
+            for ligne in sorted(lignes_par_annee[annee], key=lambda l: l.conge.date_debut):
+                conge = ligne.conge
+                cert_status = "✅ Fourni" if ligne.certificat_fourni else "❌ Manquant" if conge.type_conge == 'Congé de maladie' else ""
                 interim_info = ""
                 if conge.interim_id:
-                    interim = self.manager.get_agent_by_id(conge.interim_id)
-                    interim_info = f"{interim.nom} {interim.prenom}" if interim else "Agent Supprimé"
+                    interim_info = ligne.interim_nom or "Agent Supprimé"
                 
-                reprise_date = calculate_reprise_date(conge.date_fin, holidays_set)
-                reprise_date_str = format_date_for_display_short(reprise_date) if reprise_date else ""
+                reprise_date_str = format_date_for_display_short(ligne.date_reprise) if ligne.date_reprise else ""
                 
                 tags = ('annule',) if conge.statut == 'Annulé' else ()
                 self.list_conges.insert(summary_id, "end", values=(
@@ -8,7 +8,7 @@ from datetime import datetime
 
 from ui.widgets.secondary_windows import AdminWindow, JustificatifsWindow
 from utils.date_utils import format_date_for_display, calculate_reprise_date
-from utils.file_utils import export_all_conges_to_excel
+from utils.file_utils import export_all_conges_to_excel, run_in_worker
 
 class DashboardPanel(ttk.LabelFrame):
     """
@@ -84,13 +84,11 @@ class DashboardPanel(ttk.LabelFrame):
         if not save_path:
             return
             
-        db_path = self.manager.db.db_file
-        cert_path = self.manager.certificats_dir
-        
-        self.main_app._run_long_task( # CORRIGÉ
-            lambda: export_all_conges_to_excel(db_path, cert_path, save_path), 
-            self.main_app._on_task_complete, 
-            "Exportation de tous les congés en cours..."
+        # Sérialisation openpyxl dans un processus de travail, sur sa propre connexion à la base.
+        self.main_app.submit_job(
+            "Exportation de tous les congés",
+            run_in_worker, self.manager.db.get_db_path(), self.manager.certificats_dir, export_all_conges_to_excel, save_path,
+            on_complete=self.main_app._on_task_complete, cpu_bound=True, with_progress=True
         )
 
     def toggle_buttons_state(self, state):
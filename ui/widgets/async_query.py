@@ -0,0 +1,190 @@
+# Fichier : ui/widgets/async_query.py
+# Recherche différée (debounce) exécutée hors du thread Tk : seul le résultat de la dernière demande est affiché.
+# Actualisation par sections d'une page (tableau de bord) hors du thread Tk, avec regroupement des demandes.
+
+import threading
+import queue
+import logging
+
+# Nombre d'instructions de la machine virtuelle SQLite entre deux vérifications d'obsolescence.
+PROGRESS_STEPS = 1000
+# Marque la fin d'une exécution de SectionedRefresh dans la file des résultats.
+_DONE = object()
+
+class DebouncedQuery:
+    """
+    Lance query_fn(manager_lecture, *args) dans un thread, `delay_ms` après la dernière demande,
+    puis transmet le résultat à on_result(result) dans le thread Tk (interrogation par after()).
+    Une demande plus récente rend les précédentes obsolètes : les requêtes SQL encore en cours sont
+    abandonnées par SQLite (gestionnaire de progression) et tout résultat obsolète est ignoré.
+    Les requêtes passent par CongeManager.read_only() et n'occupent donc pas la connexion de l'interface.
+    """
+    def __init__(self, widget, manager, query_fn, on_result, on_error=None, delay_ms=250, poll_ms=25):
+        self.widget = widget
+        self.manager = manager
+        self.query_fn = query_fn
+        self.on_result = on_result
+        self.on_error = on_error
+        self.delay_ms = delay_ms
+        self.poll_ms = poll_ms
+        self._generation = 0
+        self._after_id = None
+        self._poll_id = None
+        self._pending = 0
+        self._results = queue.Queue()
+
+    def request(self, *args):
+        """Programme une requête ; toute demande antérieure non encore appliquée devient obsolète."""
+        self._generation += 1
+        generation = self._generation
+        if self._after_id:
+            self.widget.after_cancel(self._after_id)
+        self._after_id = self.widget.after(self.delay_ms, lambda: self._start(generation, args))
+
+    def cancel(self):
+        """Abandonne la demande en attente et celles en cours (par exemple avant une actualisation directe)."""
+        self._generation += 1
+        if self._after_id:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+
+    @property
+    def busy(self):
+        return self._after_id is not None or self._pending > 0
+
+    def _start(self, generation, args):
+        self._after_id = None
+        if generation != self._generation: return
+        self._pending += 1
+        threading.Thread(target=self._run, args=(generation, args), daemon=True).start()
+        if self._poll_id is None:
+            self._poll_id = self.widget.after(self.poll_ms, self._poll)
+
+    def _run(self, generation, args):
+        # Ne touche jamais aux widgets : le résultat est déposé dans la file et lu par _poll.
+        result, error = None, None
+        is_stale = lambda: generation != self._generation
+        try:
+            with self.manager.read_only() as reader:
+                # SQLite appelle ce gestionnaire pendant l'exécution : une valeur vraie abandonne la requête.
+                reader.db.conn.set_progress_handler(is_stale, PROGRESS_STEPS)
+                try:
+                    if not is_stale():
+                        result = self.query_fn(reader, *args)
+                finally:
+                    reader.db.conn.set_progress_handler(None, 0)
+        except Exception as e:
+            error = e
+        self._results.put((generation, result, error))
+
+    def _poll(self):
+        self._poll_id = None
+        while True:
+            try:
+                generation, result, error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._pending -= 1
+            if generation != self._generation:
+                continue  # Résultat obsolète (ou requête interrompue) : ignoré.
+            if error is None:
+                self.on_result(result)
+            elif self.on_error:
+                self.on_error(error)
+            else:
+                logging.error(f"Échec de la recherche en arrière-plan : {error}", exc_info=error)
+        if self._pending:
+            self._poll_id = self.widget.after(self.poll_ms, self._poll)
+
+
+class SectionedRefresh:
+    """
+    Actualise en arrière-plan une page composée de sections indépendantes.
+    `sections` est une liste de (nom, fonction(manager_lecture, *args)) calculées l'une après l'autre
+    dans un seul thread, sur une connexion de lecture (CongeManager.read_only()) ; chaque résultat est
+    transmis à on_section(nom, résultat) dans le thread Tk dès qu'il est prêt, la page se remplit donc
+    section par section. Une seule actualisation tourne à la fois : les demandes reçues entre-temps
+    la rendent obsolète (sections restantes abandonnées) et sont regroupées en une seule nouvelle
+    exécution, avec les derniers arguments, lancée dès qu'elle s'arrête.
+    """
+    def __init__(self, widget, manager, sections, on_section, on_done=None, on_error=None, poll_ms=25):
+        self.widget = widget
+        self.manager = manager
+        self.sections = sections
+        self.on_section = on_section
+        self.on_done = on_done
+        self.on_error = on_error
+        self.poll_ms = poll_ms
+        self._generation = 0
+        self._running = False
+        self._next_args = None
+        self._poll_id = None
+        self._results = queue.Queue()
+
+    def request(self, *args):
+        """Demande une actualisation ; si une autre est en cours, elle sera relancée une seule fois à sa fin."""
+        self._generation += 1
+        self._next_args = args
+        if not self._running:
+            self._start()
+
+    def cancel(self):
+        """Abandonne l'actualisation en cours et celle en attente."""
+        self._generation += 1
+        self._next_args = None
+
+    @property
+    def busy(self):
+        return self._running or self._next_args is not None
+
+    def _start(self):
+        args, self._next_args = self._next_args, None
+        self._running = True
+        threading.Thread(target=self._run, args=(self._generation, args), daemon=True).start()
+        if self._poll_id is None:
+            self._poll_id = self.widget.after(self.poll_ms, self._poll)
+
+    def _run(self, generation, args):
+        # Ne touche jamais aux widgets : chaque section est déposée dans la file et lue par _poll.
+        is_stale = lambda: generation != self._generation
+        try:
+            with self.manager.read_only() as reader:
+                reader.db.conn.set_progress_handler(is_stale, PROGRESS_STEPS)
+                try:
+                    for name, section_fn in self.sections:
+                        if is_stale(): break
+                        try:
+                            self._results.put((generation, name, section_fn(reader, *args), None))
+                        except Exception as e:
+                            if is_stale(): break  # Requête interrompue par une demande plus récente.
+                            self._results.put((generation, name, None, e))
+                finally:
+                    reader.db.conn.set_progress_handler(None, 0)
+        except Exception as e:
+            self._results.put((generation, None, None, e))
+        self._results.put((generation, _DONE, None, None))
+
+    def _poll(self):
+        self._poll_id = None
+        while True:
+            try:
+                generation, name, result, error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if name is _DONE:
+                self._running = False
+                if self._next_args is not None:
+                    self._start()
+                elif generation == self._generation and self.on_done:
+                    self.on_done()
+                continue
+            if generation != self._generation:
+                continue  # Section d'une actualisation obsolète : ignorée.
+            if error is None:
+                self.on_section(name, result)
+            elif self.on_error:
+                self.on_error(name, error)
+            else:
+                logging.error(f"Échec du chargement de la section '{name}' : {error}", exc_info=error)
+        if self._running and self._poll_id is None:
+            self._poll_id = self.widget.after(self.poll_ms, self._poll)
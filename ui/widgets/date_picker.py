@@ -3,7 +3,6 @@
 
 import tkinter as tk
 from tkinter import ttk
-from tkcalendar import Calendar
 from datetime import datetime
 
 # Import des utilitaires nécessaires
@@ -53,6 +52,8 @@ class DatePickerWindow(tk.Toplevel):
 
     def _create_widgets(self):
         """Crée et configure le widget Calendrier et les boutons."""
+        # tkcalendar n'est importé qu'à la première ouverture du calendrier.
+        from tkcalendar import Calendar
         self.cal = Calendar(
             self,
             selectmode='day',
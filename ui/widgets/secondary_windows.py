@@ -9,11 +9,6 @@ import shutil
 import sqlite3
 import sys
 
-try:
-    import holidays
-except ImportError:
-    pass
-
 from ui.widgets.date_picker import DatePickerWindow
 from utils.date_utils import validate_date, format_date_for_display
 from utils.config_loader import CONFIG
@@ -0,0 +1,376 @@
+# Fichier : ui/widgets/virtual_list.py
+# Liste virtuelle : seules les lignes visibles existent dans le Treeview, les autres sont lues à la demande.
+
+import tkinter as tk
+from tkinter import ttk
+from bisect import bisect_right
+from operator import itemgetter
+
+EMPTY_SORT_KEY = (1, '')
+
+
+def typed_sort_key(value):
+    """Clé de tri d'une valeur brute (nombre, date, texte) : textes sans casse, valeurs vides en dernier."""
+    if value is None or value == '': return EMPTY_SORT_KEY
+    if isinstance(value, str): return (0, value.casefold())
+    return (0, value)
+
+def display_sort_key(value):
+    """Repli pour les colonnes sans clé typée : numérique si possible ("12.5 j", "3"), sinon alphabétique sans casse."""
+    text = str(value if value is not None else '').strip()
+    try:
+        return (0, float(text.replace('j', '').replace(',', '.').strip()), '')
+    except ValueError:
+        return (1, 0.0, text.lower())
+
+def sorted_empty_last(items, key, reverse=False):
+    """sorted() dont les valeurs vides (typed_sort_key) restent en dernier, y compris en ordre décroissant."""
+    keyed = [(key(item), item) for item in items]
+    filled = sorted((pair for pair in keyed if pair[0] != EMPTY_SORT_KEY), key=itemgetter(0), reverse=reverse)
+    return [item for _, item in filled] + [item for sort_key, item in keyed if sort_key == EMPTY_SORT_KEY]
+
+
+class ListDataSource:
+    """
+    Source de données en mémoire pour VirtualList. Les valeurs affichées (values_fn) ne sont
+    calculées que pour les lignes effectivement affichées, puis gardées en cache.
+    sort_keys : {indice de colonne: fonction(enregistrement) -> valeur brute} ; le tri se fait
+    sur ces valeurs typées (dates, nombres) plutôt que sur le texte affiché.
+    """
+    def __init__(self, records=(), key_fn=lambda r: r.id, values_fn=lambda r: (), tags_fn=None, sort_keys=None):
+        self.key_fn = key_fn
+        self.values_fn = values_fn
+        self.tags_fn = tags_fn
+        self.sort_keys = sort_keys or {}
+        self._set_records(list(records))
+
+    def _set_records(self, records):
+        self.records = records
+        self._index = None
+        self._values_cache = {}
+
+    def __len__(self):
+        return len(self.records)
+
+    def key(self, index):
+        return self.key_fn(self.records[index])
+
+    def values(self, index):
+        record = self.records[index]
+        key = self.key_fn(record)
+        if key not in self._values_cache:
+            self._values_cache[key] = tuple(self.values_fn(record))
+        return self._values_cache[key]
+
+    def tags(self, index):
+        return tuple(self.tags_fn(self.records[index])) if self.tags_fn else ()
+
+    def index_of(self, key):
+        if self._index is None:
+            self._index = {self.key_fn(r): i for i, r in enumerate(self.records)}
+        return self._index.get(key)
+
+    def _record_sort_key(self, column_index):
+        raw = self.sort_keys.get(column_index)
+        if raw: return lambda r: typed_sort_key(raw(r))
+        return lambda r: display_sort_key(self._values_for(r)[column_index])
+
+    def sort(self, column_index, reverse=False):
+        cache = self._values_cache
+        self._set_records(sorted_empty_last(self.records, self._record_sort_key(column_index), reverse))
+        self._values_cache = cache
+
+    def _values_for(self, record):
+        key = self.key_fn(record)
+        if key not in self._values_cache:
+            self._values_cache[key] = tuple(self.values_fn(record))
+        return self._values_cache[key]
+
+    def patch(self, records=(), removed_keys=(), position_key=None):
+        """
+        Met à jour quelques enregistrements sans reconstruire la source : un enregistrement déjà présent
+        (même clé) remplace l'ancien à sa place, un nouveau est inséré selon position_key (ordre supposé
+        de la liste ; à la fin sans position_key), et les clés de removed_keys sont retirées.
+        """
+        removed = set(removed_keys)
+        updated = {self.key_fn(r): r for r in records}
+        kept = [updated.get(self.key_fn(r), r) for r in self.records if self.key_fn(r) not in removed]
+        for key, record in updated.items():
+            if key in removed or self.index_of(key) is not None: continue
+            if position_key:
+                kept.insert(bisect_right([position_key(r) for r in kept], position_key(record)), record)
+            else:
+                kept.append(record)
+        cache = {k: v for k, v in self._values_cache.items() if k not in removed and k not in updated}
+        self._set_records(kept)
+        self._values_cache = cache
+
+
+class GroupedDataSource(ListDataSource):
+    """
+    Lignes regroupées sous des lignes d'en-tête (ex. : une ligne par année, puis ses congés).
+    groups : liste de (en_tête, [enregistrements]) ; le tri s'applique à l'intérieur de chaque groupe.
+    """
+    def __init__(self, groups, key_fn, values_fn, header_key_fn, header_values_fn, tags_fn=None, header_tags=("summary",), sort_keys=None):
+        self.groups = [(header, list(children)) for header, children in groups]
+        self.header_key_fn = header_key_fn
+        self.header_values_fn = header_values_fn
+        self.header_tags = tuple(header_tags)
+        self._child_key_fn, self._child_values_fn, self._child_tags_fn = key_fn, values_fn, tags_fn
+        super().__init__(self._flatten(), self._row_key, self._row_values, self._row_tags)
+        self.sort_keys = sort_keys or {}
+
+    def _flatten(self):
+        return [row for header, children in self.groups for row in [(True, header)] + [(False, c) for c in children]]
+
+    def _row_key(self, row):
+        is_header, record = row
+        return self.header_key_fn(record) if is_header else self._child_key_fn(record)
+
+    def _row_values(self, row):
+        is_header, record = row
+        return self.header_values_fn(record) if is_header else self._child_values_fn(record)
+
+    def _row_tags(self, row):
+        is_header, record = row
+        if is_header: return self.header_tags
+        return tuple(self._child_tags_fn(record)) if self._child_tags_fn else ()
+
+    def sort(self, column_index, reverse=False):
+        cache = self._values_cache
+        raw = self.sort_keys.get(column_index)
+        child_key = (lambda c: typed_sort_key(raw(c))) if raw else (lambda c: display_sort_key(self._values_for((False, c))[column_index]))
+        self.groups = [(header, sorted_empty_last(children, child_key, reverse)) for header, children in self.groups]
+        self._set_records(self._flatten())
+        self._values_cache = cache
+
+
+class VirtualList(ttk.Frame):
+    """
+    Remplace un ttk.Treeview « plat » pour les longues listes. Le Treeview ne contient qu'autant
+    de lignes que la zone visible ; le défilement réaffecte leurs valeurs depuis la source.
+    La sélection est conservée par clé d'enregistrement (et non par ligne Tk) : elle survit au
+    défilement, au tri et au remplacement de la source. Les changements de sélection émettent
+    <<TreeviewSelect>>, comme un Treeview. Le tri choisi est réappliqué à chaque nouvelle source.
+    """
+    SORT_ARROWS = {False: " ▲", True: " ▼"}
+    DEFAULT_ROW_HEIGHT = 20
+
+    def __init__(self, parent, columns, selectmode="extended", height=20, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.columns = tuple(columns)
+        self.selectmode = selectmode
+        self.source = ListDataSource()
+        self.tree = ttk.Treeview(self, columns=self.columns, show="headings", selectmode="none", height=height)
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        style = ttk.Style(self)
+        self.tree.tag_configure("selected", background=style.lookup("Treeview", "background", ("selected",)) or "#0078d7",
+                                foreground=style.lookup("Treeview", "foreground", ("selected",)) or "white")
+        self._top = 0
+        self._visible_rows = height
+        self._slot_keys = []
+        self._selected = set()
+        self._anchor = None
+        self._sort_state = None
+        self._sort_command = None
+        self._heading_texts = {}
+
+        self.tree.bind("<Configure>", self._on_configure)
+        self.tree.bind("<Button-1>", self._on_click)
+        self.tree.bind("<Shift-Button-1>", lambda e: self._on_click(e, extend=True))
+        self.tree.bind("<Control-Button-1>", lambda e: self._on_click(e, toggle=True))
+        self.tree.bind("<MouseWheel>", lambda e: self.scroll(-1 * (e.delta // 120 or (1 if e.delta > 0 else -1)) * 3))
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-3))
+        self.tree.bind("<Button-5>", lambda e: self.scroll(3))
+        for sequence, step in (("<Up>", -1), ("<Down>", 1), ("<Prior>", "-page"), ("<Next>", "page"), ("<Home>", "home"), ("<End>", "end")):
+            self.tree.bind(sequence, lambda e, s=step: self._on_key(s, extend=False))
+            self.tree.bind(f"<Shift-{sequence[1:]}", lambda e, s=step: self._on_key(s, extend=True))
+
+    # --- API proche de ttk.Treeview ---
+    def heading(self, column, **kwargs):
+        if 'text' in kwargs: self._heading_texts[column] = kwargs['text']
+        return self.tree.heading(column, **kwargs)
+    def column(self, column, **kwargs): return self.tree.column(column, **kwargs)
+    def tag_configure(self, tag, **kwargs): return self.tree.tag_configure(tag, **kwargs)
+    def bind(self, sequence=None, func=None, add=None): return self.tree.bind(sequence, func, add)
+
+    def set_columns(self, columns):
+        self.columns = tuple(columns)
+        self.tree.delete(*self.tree.get_children())
+        self.tree.config(columns=self.columns)
+        self._slot_keys = []
+        self._sort_state = None
+        self._heading_texts = {}
+
+    def enable_sorting(self, command=None):
+        """
+        Tri au clic sur les en-têtes (bascule croissant/décroissant). Sans `command`, la source est
+        triée en mémoire ; avec `command(indice_colonne, décroissant)`, le tri est délégué à
+        l'appelant (ex. : ORDER BY d'une vue paginée) qui fournira ensuite une nouvelle source.
+        """
+        self._sort_command = command
+        for index, col in enumerate(self.columns):
+            self.tree.heading(col, command=lambda i=index: self.sort_by(i))
+
+    @property
+    def sort_state(self):
+        """(indice de colonne, décroissant) du tri courant, ou None."""
+        return self._sort_state
+
+    def sort_by(self, column_index, reverse=None):
+        if reverse is None:
+            reverse = self._sort_state == (column_index, False)
+        self._sort_state = (column_index, reverse)
+        self._update_heading_arrows()
+        if self._sort_command:
+            self._sort_command(column_index, reverse)
+            return
+        self.source.sort(column_index, reverse)
+        self._render()
+
+    def _update_heading_arrows(self):
+        for index, col in enumerate(self.columns):
+            if col not in self._heading_texts: continue
+            arrow = self.SORT_ARROWS[self._sort_state[1]] if self._sort_state and self._sort_state[0] == index else ""
+            self.tree.heading(col, text=self._heading_texts[col] + arrow)
+
+    def set_source(self, source, keep_selection=True):
+        if self._sort_state and not self._sort_command:
+            source.sort(*self._sort_state)
+        self.source = source
+        if keep_selection:
+            self._selected = {k for k in self._selected if source.index_of(k) is not None}
+        else:
+            self._selected = set()
+        if self._anchor is not None and source.index_of(self._anchor) is None:
+            self._anchor = None
+        self._render()
+
+    def patch(self, records=(), removed_keys=(), position_key=None):
+        """Met à jour quelques lignes de la source affichée (voir ListDataSource.patch), tri et sélection conservés."""
+        self.source.patch(records, removed_keys, position_key)
+        self.set_source(self.source)
+
+    def selection(self):
+        """Clés sélectionnées, dans l'ordre d'affichage."""
+        return sorted(self._selected, key=lambda k: self.source.index_of(k) if self.source.index_of(k) is not None else -1)
+
+    def selection_set(self, keys):
+        if not isinstance(keys, (list, tuple, set)): keys = [keys]
+        self._set_selection({k for k in keys if self.source.index_of(k) is not None})
+        if self._selected: self._anchor = self.selection()[0]
+
+    def focus(self, key=None):
+        if key is None: return self._anchor
+        if self.source.index_of(key) is not None: self._anchor = key
+
+    def see(self, key):
+        index = self.source.index_of(key)
+        if index is None: return
+        if index < self._top:
+            self._top = index
+        elif index >= self._top + self._visible_rows:
+            self._top = index - self._visible_rows + 1
+        self._render()
+
+    def key_at(self, y):
+        slot = self.tree.identify_row(y)
+        if not slot: return None
+        position = self.tree.index(slot)
+        return self._slot_keys[position] if position < len(self._slot_keys) else None
+
+    def scroll(self, rows):
+        self._top += rows
+        self._render()
+        return "break"
+
+    # --- Rendu ---
+    def _render(self):
+        total = len(self.source)
+        self._top = max(0, min(self._top, total - self._visible_rows))
+        count = max(0, min(self._visible_rows, total - self._top))
+        slots = self.tree.get_children()
+        if len(slots) > count:
+            self.tree.delete(*slots[count:])
+        for i in range(len(slots), count):
+            self.tree.insert("", "end", iid=f"slot{i}")
+        self._slot_keys = []
+        for i in range(count):
+            index = self._top + i
+            key = self.source.key(index)
+            tags = self.source.tags(index) + (("selected",) if key in self._selected else ())
+            self.tree.item(f"slot{i}", values=self.source.values(index), tags=tags)
+            self._slot_keys.append(key)
+        if total:
+            self.scrollbar.set(self._top / total, (self._top + count) / total)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def _on_configure(self, event):
+        row_height = self.DEFAULT_ROW_HEIGHT
+        header_height = row_height + 5
+        first_slot = self.tree.get_children()[:1]
+        bbox = self.tree.bbox(first_slot[0]) if first_slot else None
+        if bbox:
+            header_height, row_height = bbox[1], bbox[3]
+        visible = max(1, (event.height - header_height) // max(1, row_height))
+        if visible != self._visible_rows:
+            self._visible_rows = visible
+            self._render()
+
+    def _on_scrollbar(self, action, *args):
+        total = len(self.source)
+        if action == "moveto":
+            self._top = int(float(args[0]) * total)
+        elif action == "scroll":
+            amount, unit = int(args[0]), args[1]
+            self._top += amount * (self._visible_rows if unit == "pages" else 1)
+        self._render()
+
+    # --- Sélection ---
+    def _set_selection(self, keys):
+        if keys == self._selected: return
+        self._selected = set(keys)
+        self._render()
+        self.tree.event_generate("<<TreeviewSelect>>")
+
+    def _on_click(self, event, extend=False, toggle=False):
+        if self.tree.identify_region(event.x, event.y) not in ("cell", "tree"):
+            return None  # En-têtes et séparateurs : comportement normal du Treeview.
+        self.tree.focus_set()
+        key = self.key_at(event.y)
+        if key is None: return "break"
+        if self.selectmode == "extended" and toggle:
+            self._set_selection(self._selected ^ {key})
+            self._anchor = key
+        elif self.selectmode == "extended" and extend and self._anchor is not None:
+            self._select_range(self._anchor, key)
+        else:
+            self._anchor = key
+            self._set_selection({key})
+        return "break"
+
+    def _select_range(self, anchor, key):
+        a, b = sorted((self.source.index_of(anchor), self.source.index_of(key)))
+        self._set_selection({self.source.key(i) for i in range(a, b + 1)})
+
+    def _on_key(self, step, extend):
+        total = len(self.source)
+        if not total: return "break"
+        current = self.source.index_of(self._anchor) if self._anchor is not None else None
+        if step == "home": target = 0
+        elif step == "end": target = total - 1
+        else:
+            delta = self._visible_rows if step == "page" else -self._visible_rows if step == "-page" else step
+            target = 0 if current is None else max(0, min(total - 1, current + delta))
+        key = self.source.key(target)
+        if extend and self.selectmode == "extended" and self._anchor is not None:
+            self._select_range(self._anchor, key)
+        else:
+            self._anchor = key
+            self._set_selection({key})
+        self.see(key)
+        return "break"
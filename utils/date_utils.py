@@ -2,17 +2,23 @@
 # Version finale corrigée avec validation de date stricte et gestion d'erreur.
 
 from datetime import datetime, timedelta, date
+from bisect import bisect_left
+from functools import lru_cache
 import sqlite3
 import logging
 from utils.config_loader import CONFIG
 
 # --- Gestion optionnelle de la bibliothèque holidays ---
-try:
-    import holidays
-    HOLIDAYS_AVAILABLE = True
-except ImportError:
-    HOLIDAYS_AVAILABLE = False
-    logging.warning("Bibliothèque 'holidays' non trouvée. Seuls les jours fériés personnalisés seront chargés.")
+# Importée au premier calcul de jours fériés plutôt qu'au chargement du module (démarrage plus rapide).
+@lru_cache(maxsize=None)
+def get_holidays_module():
+    """Renvoie le module holidays, ou None s'il n'est pas installé."""
+    try:
+        import holidays
+        return holidays
+    except ImportError:
+        logging.warning("Bibliothèque 'holidays' non trouvée. Seuls les jours fériés personnalisés seront chargés.")
+        return None
 
 # --- Fonctions de formatage (ajustées pour la nouvelle validation) ---
 
@@ -74,49 +80,142 @@ def validate_date(date_str):
 
 def get_holidays_set_for_period(db_manager, start_year, end_year):
     """Charge les jours fériés (officiels et personnalisés) pour une période donnée."""
+    all_h = set()
+    for year_holidays in load_holidays_for_years(db_manager, range(start_year, end_year + 2)).values():
+        all_h |= year_holidays
+    return all_h
+
+def load_holidays_for_years(db_manager, years, strict=False):
+    """
+    Charge les jours fériés (officiels et personnalisés) de plusieurs années.
+    Les jours personnalisés sont lus en une seule requête par intervalle.
+    Retourne un dictionnaire {année: ensemble de dates}. Une erreur de chargement est journalisée et le
+    résultat reste incomplet ; avec strict, elle est propagée (résultat destiné à un cache, voir HolidayCache).
+    """
+    years = sorted(set(years))
+    result = {year: set() for year in years}
+    if not years:
+        return result
     country_code = CONFIG['conges']['holidays_country']
-    all_h = {}
-    
-    for year in range(start_year, end_year + 2):
-        # Charge les jours fériés officiels si la bibliothèque est disponible
-        if HOLIDAYS_AVAILABLE:
+
+    # Charge les jours fériés officiels si la bibliothèque est disponible
+    holidays = get_holidays_module()
+    if holidays:
+        for year in years:
             try:
-                all_h.update(holidays.country_holidays(country_code, years=year))
+                result[year].update(holidays.country_holidays(country_code, years=year).keys())
             except Exception as e:
                 logging.error(f"Erreur lors de la récupération des jours fériés officiels pour {year}: {e}")
+                if strict: raise
 
-        # Charge les jours fériés personnalisés depuis la base de données
-        try:
-            if db_manager and db_manager.conn:
-                db_h = db_manager.get_holidays_for_year(str(year))
-                for date_str, name, type in db_h:
-                    validated_date = validate_date(date_str)
-                    if validated_date:
-                        all_h[validated_date.date()] = name
-        except sqlite3.Error as e:
-            logging.error(f"Erreur lors du chargement des jours fériés personnalisés pour {year}: {e}")
-            
-    return set(all_h.keys())
+    # Charge les jours fériés personnalisés depuis la base de données
+    try:
+        if db_manager and db_manager.conn:
+            db_h = db_manager.get_holidays_between(f"{years[0]}-01-01", f"{years[-1]}-12-31")
+            for date_str, name, type in db_h:
+                validated_date = validate_date(date_str)
+                if validated_date and validated_date.year in result:
+                    result[validated_date.year].add(validated_date.date())
+    except sqlite3.Error as e:
+        logging.error(f"Erreur lors du chargement des jours fériés personnalisés pour {years[0]}-{years[-1]}: {e}")
+        if strict: raise
+
+    return result
 
 def jours_ouvres(date_debut, date_fin, holidays_set):
     """Calcule le nombre de jours ouvrés entre deux dates, en excluant les jours fériés."""
     if not date_debut or not date_fin or date_fin < date_debut:
         return 0
-    jours = 0
-    current_day = date_debut.date() if isinstance(date_debut, datetime) else date_debut
-    end_day = date_fin.date() if isinstance(date_fin, datetime) else date_fin
-    while current_day <= end_day:
-        if current_day.weekday() < 5 and current_day not in holidays_set:
-            jours += 1
-        current_day += timedelta(days=1)
-    return jours
+    return get_business_calendar(holidays_set).count(date_debut, date_fin)
 
 def calculate_reprise_date(end_date, holidays_set):
     """Calcule la date de reprise de service."""
     if not end_date:
         return None
-    reprise_date = end_date.date() if isinstance(end_date, datetime) else end_date
-    reprise_date += timedelta(days=1)
-    while reprise_date.weekday() >= 5 or reprise_date in holidays_set: 
-        reprise_date += timedelta(days=1)
-    return reprise_date
\ No newline at end of file
+    lendemain = _as_date(end_date) + timedelta(days=1)
+    return get_business_calendar(holidays_set).add_business_days(lendemain, 1)
+
+# --- Calendrier des jours ouvrés précalculé ---
+
+def _as_date(value):
+    return value.date() if isinstance(value, datetime) else value
+
+class BusinessDayCalendar:
+    """
+    Calendrier des jours ouvrés (hors week-ends et jours fériés).
+    Pour chaque année, un tableau de sommes préfixes est construit une seule fois :
+    prefix[i] = nombre de jours ouvrés parmi les i premiers jours de l'année.
+    Le décompte entre deux dates devient une soustraction, et la recherche du
+    Nième jour ouvré une recherche dichotomique dans ce tableau.
+    """
+    def __init__(self, holidays_set=()):
+        self.holidays = frozenset(_as_date(d) for d in holidays_set)
+        self._holiday_ordinals = {d.toordinal() for d in self.holidays}
+        self._prefixes = {}
+
+    def _prefix(self, year):
+        prefix = self._prefixes.get(year)
+        if prefix is None:
+            first_ordinal = date(year, 1, 1).toordinal()
+            nb_days = date(year + 1, 1, 1).toordinal() - first_ordinal
+            first_weekday = date(year, 1, 1).weekday()
+            prefix = [0] * (nb_days + 1)
+            for i in range(nb_days):
+                ouvre = (first_weekday + i) % 7 < 5 and (first_ordinal + i) not in self._holiday_ordinals
+                prefix[i + 1] = prefix[i] + ouvre
+            self._prefixes[year] = prefix
+        return prefix
+
+    def is_business_day(self, day):
+        day = _as_date(day)
+        return day.weekday() < 5 and day not in self.holidays
+
+    def count(self, start, end):
+        """Nombre de jours ouvrés entre start et end (bornes incluses)."""
+        if not start or not end:
+            return 0
+        start, end = _as_date(start), _as_date(end)
+        if end < start:
+            return 0
+        start_yday, end_yday = start.timetuple().tm_yday, end.timetuple().tm_yday
+        if start.year == end.year:
+            prefix = self._prefix(start.year)
+            return prefix[end_yday] - prefix[start_yday - 1]
+        start_prefix = self._prefix(start.year)
+        total = start_prefix[-1] - start_prefix[start_yday - 1]
+        for year in range(start.year + 1, end.year):
+            total += self._prefix(year)[-1]
+        return total + self._prefix(end.year)[end_yday]
+
+    def add_business_days(self, start, nb_days):
+        """
+        Retourne le Nième jour ouvré à partir de start (inclus).
+        Conserve le type de start (date ou datetime).
+        """
+        if nb_days <= 0:
+            return start
+        day = _as_date(start)
+        year = day.year
+        prefix = self._prefix(year)
+        lo = day.timetuple().tm_yday
+        target = prefix[lo - 1] + nb_days
+        while target > prefix[-1]:
+            target -= prefix[-1]
+            year += 1
+            prefix = self._prefix(year)
+            lo = 1
+        index = bisect_left(prefix, target, lo)
+        result = date(year, 1, 1) + timedelta(days=index - 1)
+        return datetime.combine(result, start.time()) if isinstance(start, datetime) else result
+
+@lru_cache(maxsize=32)
+def _calendar_for(holidays):
+    return BusinessDayCalendar(holidays)
+
+def get_business_calendar(holidays_set):
+    """Retourne le calendrier des jours ouvrés (mis en cache) pour un ensemble de jours fériés."""
+    if isinstance(holidays_set, BusinessDayCalendar):
+        return holidays_set
+    if not isinstance(holidays_set, frozenset):
+        holidays_set = frozenset(holidays_set or ())
+    return _calendar_for(holidays_set)
@@ -0,0 +1,245 @@
+# Fichier : utils/decision_templates.py
+# Modèles de décision compilés : chaque modèle .docx est lu et analysé une seule fois (cache par chemin
+# et date de modification) ; une décision se limite ensuite à écrire les valeurs aux emplacements repérés.
+# python-docx n'est importé qu'à la première compilation.
+
+import io
+import logging
+import math
+import multiprocessing
+import os
+import re
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
+
+from utils.config_loader import CONFIG
+from utils.date_utils import calculate_reprise_date, format_date_for_display
+
+PLACEHOLDER_RE = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+W_P, W_T = _W + "p", _W + "t"
+XML_SPACE = "{http://www.w3.org/XML/1998/namespace}space"
+
+class DecisionTemplate:
+    """
+    Modèle .docx compilé. Les balises {{nom}} sont repérées une fois pour toutes dans le corps, les tableaux,
+    les en-têtes et les pieds de page, y compris quand Word les a découpées sur plusieurs runs. Chaque nœud
+    de texte concerné devient une suite de textes fixes et de balises (segments).
+    render() écrit un contexte dans ces nœuds, enregistre le document puis rétablit le modèle : le
+    document n'est ni relu ni reparcouru d'une décision à l'autre.
+    """
+    def __init__(self, path):
+        import docx
+        from docx.opc.constants import RELATIONSHIP_TYPE as RT
+        self.path = path
+        self.document = docx.Document(path)
+        self._lock = threading.Lock()
+        self._slots = []  # (nœud w:t, segments [(texte, balise ou None)], texte d'origine)
+        roots = [self.document.element.body] + [rel.target_part.element for rel in self.document.part.rels.values()
+                                                if not rel.is_external and rel.reltype in (RT.HEADER, RT.FOOTER)]
+        for root in roots:
+            for paragraph in root.iter(W_P):
+                self._compile_paragraph(paragraph)
+        self.placeholders = frozenset(key for _, segments, _ in self._slots for _, key in segments if key)
+
+    def _compile_paragraph(self, paragraph):
+        # Nœuds de texte du paragraphe lui-même (pas ceux d'une zone de texte qu'il contiendrait).
+        nodes = [t for t in paragraph.iter(W_T) if next(t.iterancestors(W_P), None) is paragraph]
+        texts = [t.text or "" for t in nodes]
+        full = "".join(texts)
+        matches = list(PLACEHOLDER_RE.finditer(full)) if "{{" in full else []
+        if not matches: return
+
+        bounds, start = [], 0
+        for text in texts:
+            bounds.append((start, start + len(text)))
+            start += len(text)
+        segments = [[] for _ in nodes]
+        def add_literal(begin, end):
+            for i, (node_start, node_end) in enumerate(bounds):
+                if node_start < end and node_end > begin:
+                    segments[i].append((full[max(begin, node_start):min(end, node_end)], None))
+        cursor = 0
+        for match in matches:
+            add_literal(cursor, match.start())
+            # La balise est écrite dans le nœud où elle commence ; ses autres morceaux sont effacés.
+            owner = next(i for i, (node_start, node_end) in enumerate(bounds) if node_start <= match.start() < node_end)
+            segments[owner].append((match.group(0), match.group(1)))
+            cursor = match.end()
+        add_literal(cursor, len(full))
+
+        for node, text, node_segments in zip(nodes, texts, segments):
+            if any(key for _, key in node_segments) or "".join(t for t, _ in node_segments) != text:
+                self._slots.append((node, node_segments, text))
+
+    def render(self, context, output):
+        """
+        Écrit la décision dans output (chemin ou flux binaire). Les clés du contexte s'écrivent 'nom' ou
+        '{{nom}}' ; une balise absente du contexte reste telle quelle dans le document.
+        """
+        values = {str(key).strip("{} "): str(value) for key, value in context.items()}
+        with self._lock:
+            try:
+                for node, segments, _ in self._slots:
+                    node.text = "".join(values.get(key, text) if key else text for text, key in segments)
+                    node.set(XML_SPACE, "preserve")  # Espaces en début ou fin de valeur conservés par Word.
+                self.document.save(output)
+            finally:
+                for node, _, original in self._slots:
+                    node.text = original
+
+_templates = {}
+_templates_lock = threading.Lock()
+
+def get_template(path):
+    """Modèle compilé de path, partagé par les appels suivants tant que le fichier n'a pas été modifié."""
+    path = os.path.abspath(path)
+    mtime = os.stat(path).st_mtime_ns
+    with _templates_lock:
+        cached = _templates.get(path)
+        if cached and cached[0] == mtime: return cached[1]
+    template = DecisionTemplate(path)
+    with _templates_lock:
+        _templates[path] = (mtime, template)
+    return template
+
+# --- Contexte d'une décision ---
+def decision_template_path(base_dir, agent):
+    """Modèle de décision du cadre de l'agent (ex. : templates/infirmier_1er_grade.docx)."""
+    templates_dir_name = CONFIG.get('paths', {}).get('templates_dir', 'templates')
+    return os.path.join(base_dir, templates_dir_name, f"{agent.cadre.lower().replace(' ', '_')}.docx")
+
+def decision_filename(agent, conge):
+    return f"Decision_Conge_{agent.nom}_{conge.date_debut.strftime('%Y-%m-%d')}.docx"
+
+def build_decision_context(manager, agent, conge):
+    """Valeurs des balises d'une décision de congé."""
+    holidays_set = manager.get_holidays_set_for_period(conge.date_fin.year, conge.date_fin.year + 1)
+    date_reprise = calculate_reprise_date(conge.date_fin, holidays_set)
+
+    details_solde_str = ""
+    if conge.type_conge == "Congé annuel":
+        details = manager.get_deduction_details(agent.id, conge.jours_pris)
+        parts = [f"{int(round(days))} {'jour' if int(round(days)) == 1 else 'jours'} au titre de l'année {year}" for year, days in sorted(details.items())]
+        details_solde_str = " et ".join(parts)
+
+    return {
+        "{{nom_complet}}": f"{agent.nom} {agent.prenom}", "{{grade}}": agent.cadre, "{{ppr}}": agent.ppr,
+        "{{date_debut}}": format_date_for_display(conge.date_debut), "{{date_fin}}": format_date_for_display(conge.date_fin),
+        "{{date_reprise}}": format_date_for_display(date_reprise) if date_reprise else "N/A",
+        "{{jours_pris}}": str(conge.jours_pris), "{{details_solde}}": details_solde_str,
+        "{{date_aujourdhui}}": date.today().strftime("%d/%m/%Y")
+    }
+
+# --- Génération par lots ---
+def _decision_jobs(manager, base_dir, conge_ids):
+    """
+    Prépare (modèle, nom de fichier, contexte) pour chaque congé. Les congés sans modèle pour le cadre de
+    leur agent sont signalés dans les erreurs. Retourne (travaux, erreurs).
+    """
+    jobs, errors, agents, used_names = [], [], {}, set()
+    for conge_id in conge_ids:
+        conge = manager.get_conge_by_id(conge_id)
+        if not conge:
+            errors.append(f"Congé {conge_id} introuvable.")
+            continue
+        if conge.agent_id not in agents:
+            agents[conge.agent_id] = manager.get_agent_by_id(conge.agent_id)
+        agent = agents[conge.agent_id]
+        template_path = decision_template_path(base_dir, agent)
+        if not os.path.exists(template_path):
+            errors.append(f"{agent.nom} {agent.prenom} : modèle '{os.path.basename(template_path)}' introuvable.")
+            continue
+        filename = decision_filename(agent, conge)
+        if filename in used_names:
+            filename = f"{filename[:-len('.docx')]}_{conge.id}.docx"
+        used_names.add(filename)
+        jobs.append((template_path, filename, build_decision_context(manager, agent, conge)))
+    return jobs, errors
+
+def _render_chunk(template_path, items, folder):
+    """
+    Rendu d'un lot de décisions d'un même modèle, dans un processus de travail (le modèle y est compilé
+    une fois). Écrit les fichiers dans folder, ou renvoie leur contenu si folder est None (archive zip).
+    """
+    template = get_template(template_path)
+    results = []
+    for filename, context in items:
+        if folder:
+            template.render(context, os.path.join(folder, filename))
+            results.append((filename, None))
+        else:
+            buffer = io.BytesIO()
+            template.render(context, buffer)
+            results.append((filename, buffer.getvalue()))
+    return results
+
+def _chunks(jobs, workers):
+    """Lots d'un même modèle, assez petits pour répartir la charge (environ quatre par processus)."""
+    size = max(1, math.ceil(len(jobs) / (workers * 4)))
+    by_template = {}
+    for template_path, filename, context in jobs:
+        by_template.setdefault(template_path, []).append((filename, context))
+    return [(template_path, items[i:i + size]) for template_path, items in by_template.items() for i in range(0, len(items), size)]
+
+def _render_chunks(chunks, folder, workers, pool=None):
+    """
+    Résultats de chaque lot, dans l'ordre d'achèvement. Sans pool fourni : rendu sur place s'il n'y a qu'un
+    lot ou un processus, sinon dans un pool créé pour l'occasion. Les lots non commencés sont abandonnés si
+    l'appelant s'interrompt (annulation).
+    """
+    if pool is None and (workers <= 1 or len(chunks) <= 1):
+        for template_path, items in chunks:
+            yield _render_chunk(template_path, items, folder)
+        return
+    # 'spawn' : un processus neuf, sans copie de l'état de l'interface Tk (ni de ses threads).
+    own_pool = pool is None
+    if own_pool:
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+    futures = [pool.submit(_render_chunk, template_path, items, folder) for template_path, items in chunks]
+    try:
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        for future in futures:
+            future.cancel()
+        if own_pool: pool.shutdown(cancel_futures=True)
+
+def generate_decisions_batch(manager, base_dir, conge_ids, output, progress=None, max_workers=None, pool=None):
+    """
+    Génère les décisions des congés donnés dans le dossier output, ou dans une archive si output se termine
+    par .zip. Les contextes sont lus sur une connexion de lecture du thread appelant ; le rendu est réparti
+    entre max_workers processus (par défaut, un par cœur), ou confié à pool (ex. : JobExecutor.process_pool).
+    progress(fait, total) est appelé après chaque lot. Retourne (nombre de décisions générées, erreurs).
+    """
+    with manager.read_only() as reader:
+        jobs, errors = _decision_jobs(reader, base_dir, conge_ids)
+    if not jobs:
+        return 0, errors
+
+    workers = max(1, min(max_workers or os.cpu_count() or 1, len(jobs)))
+    chunks = _chunks(jobs, workers)
+    to_zip = output.lower().endswith('.zip')
+    folder = None if to_zip else output
+    os.makedirs(folder or os.path.dirname(os.path.abspath(output)), exist_ok=True)
+
+    done = 0
+    archive = zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) if to_zip else None
+    try:
+        for results in _render_chunks(chunks, folder, min(workers, len(chunks)), pool):
+            if archive:
+                for filename, data in results:
+                    archive.writestr(filename, data)
+            done += len(results)
+            if progress: progress(done, len(jobs))
+    except BaseException:
+        if archive:  # Archive incomplète : supprimée plutôt que livrée.
+            archive.close()
+            os.remove(output)
+        raise
+    else:
+        if archive: archive.close()
+    logging.info(f"{done} décisions générées vers {output} ({len(chunks)} lots, {workers} processus)")
+    return done, errors
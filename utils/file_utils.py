@@ -1,20 +1,22 @@
 # Fichier : utils/file_utils.py
 # VERSION FINALE - Corrige le bug "TypeError: tuple indices..." et les bugs précédents.
 
-import openpyxl
-from openpyxl.utils import get_column_letter
-from openpyxl.styles import Font
+# openpyxl, pyarrow et python-docx sont importés dans les fonctions qui s'en servent :
+# ils ne sont chargés qu'à la première exportation, importation ou génération de décision.
+from contextlib import contextmanager
 from datetime import datetime
+from itertools import chain, islice
+import csv
 import re
 import logging
-import docx
 import os
 import uuid
 
-from db.database import DatabaseManager
+from db.database import DatabaseManager, EXPORT_BATCH_SIZE
 from core.conges.manager import CongeManager
+from core.constants import SoldeStatus
 from utils.config_loader import CONFIG
-from utils.date_utils import format_date_for_display
+from utils.date_utils import validate_date
 
 def _perform_db_operation_with_manager(db_path, certificats_path, operation_callback):
     """Fonction utilitaire pour gérer la connexion/déconnexion DB dans un thread."""
@@ -29,200 +31,399 @@ def _perform_db_operation_with_manager(db_path, certificats_path, operation_call
     finally:
         db.close()
 
-def export_agents_to_excel(db_path, certificats_path, save_path):
-    """Exporte la liste des agents. Conçu pour être exécuté dans un thread."""
+def run_in_worker(db_path, certificats_path, operation, *args, progress=None):
+    """
+    Exécute operation(manager, *args, progress=progress) sur une connexion ouverte par l'appelant : point
+    d'entrée des exports confiés au pool de processus (utils.jobs), la connexion de l'interface ne pouvant
+    être transmise à un autre processus.
+    """
+    return _perform_db_operation_with_manager(db_path, certificats_path, lambda manager: operation(manager, *args, progress=progress))
+
+@contextmanager
+def _removed_on_failure(save_path):
+    """Supprime le fichier en cours d'écriture si l'export échoue ou est annulé (utils.jobs.JobCancelled)."""
+    try:
+        yield
+    except BaseException:
+        if os.path.exists(save_path): os.remove(save_path)
+        raise
+
+def _perform_read_operation(manager, operation_callback):
+    """Exécute une lecture dans un thread sur une connexion du pool de lecture, sans bloquer l'interface."""
+    with manager.read_only() as reader:
+        return operation_callback(reader)
+
+# Exports : les lignes sont lues par lots et écrites en mode « write-only » d'openpyxl, sans garder le
+# classeur en mémoire. La largeur des colonnes est estimée sur les premières lignes seulement.
+EXPORT_WIDTH_SAMPLE = 500
+# Nombre de lignes écrites entre deux rapports de progression.
+EXPORT_PROGRESS_STEP = 1000
+
+def estimate_column_widths(headers, sample_rows, max_width=60):
+    """Largeur de chaque colonne : texte le plus long de l'en-tête et de l'échantillon, plus une marge, plafonnée."""
+    widths = [len(str(header)) for header in headers]
+    for row in sample_rows:
+        for i, value in enumerate(row):
+            widths[i] = max(widths[i], len(str(value if value is not None else "")))
+    return [min(width + 2, max_width) for width in widths]
+
+def _with_progress(rows, total, progress=None):
+    """Transmet les lignes en appelant progress(lignes transmises, total) toutes les EXPORT_PROGRESS_STEP lignes et à la fin."""
+    written = 0
+    for row in rows:
+        yield row
+        written += 1
+        if progress and written % EXPORT_PROGRESS_STEP == 0:
+            progress(written, total)
+    if progress: progress(written, total)
+
+def _write_streaming_workbook(save_path, title, headers, rows):
+    """Écrit les lignes (itérable consommé une seule fois) dans une feuille en mode write-only."""
+    import openpyxl
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+    from openpyxl.utils import get_column_letter
+    rows = iter(rows)
+    sample = list(islice(rows, EXPORT_WIDTH_SAMPLE))
+
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet(title)
+    # En mode write-only, les largeurs doivent être fixées avant la première ligne.
+    for col_idx, width in enumerate(estimate_column_widths(headers, sample), 1):
+        ws.column_dimensions[get_column_letter(col_idx)].width = width
+    header_font = Font(bold=True)
+    header_cells = []
+    for header in headers:
+        cell = WriteOnlyCell(ws, value=header)
+        cell.font = header_font
+        header_cells.append(cell)
+    ws.append(header_cells)
+
+    for row in chain(sample, rows):
+        ws.append(row)
+
+    os.makedirs(os.path.dirname(os.path.abspath(save_path)), exist_ok=True)
+    wb.save(save_path)
+
+def export_agents_to_excel(manager, save_path, progress=None):
+    """Exporte la liste des agents actifs. Conçu pour être exécuté dans un thread ; progress(fait, total) optionnel."""
     def operation(manager):
-        agents = manager.get_all_agents()
-        if not agents:
+        total = manager.get_agents_count()
+        if not total:
             return "Aucun agent à exporter."
-        
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Agents"
-        
+
         annee_exercice = manager.get_annee_exercice()
         an_n, an_n1, an_n2 = annee_exercice, annee_exercice - 1, annee_exercice - 2
         headers = ["ID", "Nom", "Prénom", "PPR", "Cadre", 
                    f"Solde {an_n2}", f"Solde {an_n1}", f"Solde {an_n}", "Solde Total Actif"]
-        ws.append(headers)
-        
-        header_font = Font(bold=True)
-        for cell in ws[1]:
-            cell.font = header_font
-
-        for agent in agents:
-            soldes_par_annee = {s.annee: s.solde for s in agent.soldes_annuels if s.statut == 'Actif'}
-            solde_total = agent.get_solde_total_actif()
-            
-            ws.append([agent.id, agent.nom, agent.prenom, agent.ppr, agent.cadre, 
-                       soldes_par_annee.get(an_n2, 0.0), soldes_par_annee.get(an_n1, 0.0), 
-                       soldes_par_annee.get(an_n, 0.0), solde_total])
-
-        for col_idx, col_cells in enumerate(ws.columns, 1):
-            max_length = max(len(str(cell.value or "")) for cell in col_cells)
-            ws.column_dimensions[get_column_letter(col_idx)].width = max_length + 2
-        
-        os.makedirs(os.path.dirname(save_path), exist_ok=True)
-        wb.save(save_path)
+        rows = ([r['id'], r['nom'], r['prenom'], r['ppr'], r['cadre'], r['solde_n2'], r['solde_n1'], r['solde_n'], r['solde_total']]
+                for r in manager.iter_agents_export())
+        _write_streaming_workbook(save_path, "Agents", headers, _with_progress(rows, total, progress))
         return f"Liste des agents exportée avec succès vers\n{save_path}"
 
-    return _perform_db_operation_with_manager(db_path, certificats_path, operation)
+    return _perform_read_operation(manager, operation)
 
-def export_all_conges_to_excel(db_path, certificats_path, save_path):
-    """Exporte la liste de tous les congés. Conçu pour être exécuté dans un thread."""
+def export_all_conges_to_excel(manager, save_path, progress=None):
+    """Exporte la liste de tous les congés. Conçu pour être exécuté dans un thread ; progress(fait, total) optionnel."""
     def operation(manager):
-        all_conges = manager.get_all_conges()
-        if not all_conges:
+        total = manager.get_conges_count()
+        if not total:
             return "Aucun congé à exporter."
-            
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Tous les Congés"
+
         headers = ["Nom Agent", "Prénom Agent", "PPR Agent", "Type Congé", "Début", "Fin", "Jours Pris", "Statut", "Justification", "Intérimaire"]
-        ws.append(headers)
-        header_font = Font(bold=True)
-        for cell in ws[1]:
-            cell.font = header_font
-            
-        all_agents = {agent.id: agent for agent in manager.get_all_agents()}
-        for conge in all_conges:
-            agent = all_agents.get(conge.agent_id)
-            agent_nom, agent_prenom, agent_ppr = (agent.nom, agent.prenom, agent.ppr) if agent else ("Agent", "Supprimé", "")
-            interim_info = ""
-            if conge.interim_id:
-                interim = all_agents.get(conge.interim_id)
-                interim_info = f"{interim.nom} {interim.prenom}" if interim else "Agent Supprimé"
-            row_data = [agent_nom, agent_prenom, agent_ppr, conge.type_conge, format_date_for_display(conge.date_debut), format_date_for_display(conge.date_fin), conge.jours_pris, conge.statut, conge.justif or "", interim_info]
-            ws.append(row_data)
-            
-        for col_idx, col_cells in enumerate(ws.columns, 1):
-            max_length = max(len(str(cell.value or "")) for cell in col_cells)
-            ws.column_dimensions[get_column_letter(col_idx)].width = max_length + 2
-
-        os.makedirs(os.path.dirname(save_path), exist_ok=True)
-        wb.save(save_path)
+        def rows():
+            for r in manager.iter_conges_export():
+                agent_nom, agent_prenom, agent_ppr = (r['agent_nom'], r['agent_prenom'], r['agent_ppr']) if r['agent_nom'] is not None else ("Agent", "Supprimé", "")
+                interim_info = ""
+                if r['interim_id']:
+                    interim_info = f"{r['interim_nom']} {r['interim_prenom']}" if r['interim_nom'] is not None else "Agent Supprimé"
+                yield [agent_nom, agent_prenom, agent_ppr, r['type_conge'], r['debut'] or "", r['fin'] or "", r['jours_pris'], r['statut'], r['justif'] or "", interim_info]
+        _write_streaming_workbook(save_path, "Tous les Congés", headers, _with_progress(rows(), total, progress))
         return f"Tous les congés ont été exportés avec succès vers\n{save_path}"
 
-    return _perform_db_operation_with_manager(db_path, certificats_path, operation)
+    return _perform_read_operation(manager, operation)
 
-def import_agents_from_excel(db_path, certificats_path, source_path):
-    """Importe des agents avec une logique de colonnes optionnelles."""
+# --- Échanges CSV et Parquet (synchronisation avec le SIRH) ---
+# Colonnes en minuscules, relues telles quelles à l'import ; dates au format ISO (AAAA-MM-JJ).
+# CSV : module standard, écrit et lu ligne à ligne. Parquet : pyarrow (optionnel), par lots de EXPORT_BATCH_SIZE lignes.
+EXCHANGE_DATASETS = ('agents', 'conges', 'soldes')
+
+def _exchange_dataset(manager, dataset):
+    """Colonnes [(nom, type)], lignes (lues en flux) et nombre de lignes d'un jeu de données à exporter."""
+    if dataset == 'agents':
+        annee = manager.get_annee_exercice()
+        columns = ([('id', int), ('nom', str), ('prenom', str), ('ppr', str), ('cadre', str)]
+                   + [(f'solde_{a}', float) for a in (annee - 2, annee - 1, annee)] + [('solde_total', float)])
+        rows = ((r['id'], r['nom'], r['prenom'], r['ppr'], r['cadre'], r['solde_n2'], r['solde_n1'], r['solde_n'], r['solde_total'])
+                for r in manager.iter_agents_export())
+        return columns, rows, manager.get_agents_count()
+    if dataset == 'conges':
+        columns = [('ppr', str), ('nom', str), ('prenom', str), ('type_conge', str), ('date_debut', str), ('date_fin', str),
+                   ('jours_pris', int), ('statut', str), ('justif', str), ('interim_ppr', str)]
+        rows = ((r['agent_ppr'], r['agent_nom'], r['agent_prenom'], r['type_conge'], r['date_debut'], r['date_fin'],
+                 r['jours_pris'], r['statut'], r['justif'], r['interim_ppr']) for r in manager.iter_conges_export())
+        return columns, rows, manager.get_conges_count()
+    if dataset == 'soldes':
+        columns = [('ppr', str), ('nom', str), ('prenom', str), ('annee', int), ('solde', float), ('statut', str)]
+        return columns, (tuple(r) for r in manager.iter_soldes_export()), manager.get_soldes_count()
+    raise ValueError(f"Jeu de données inconnu : {dataset}. Valeurs possibles : {', '.join(EXCHANGE_DATASETS)}")
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("Le format Parquet nécessite le paquet 'pyarrow' (pip install pyarrow).") from e
+    return pyarrow, pyarrow.parquet
+
+def _write_csv(save_path, columns, rows):
+    with open(save_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow([name for name, _ in columns])
+        writer.writerows(rows)
+
+def _write_parquet(save_path, columns, rows):
+    pa, pq = _require_pyarrow()
+    types = {int: pa.int64(), float: pa.float64(), str: pa.string()}
+    schema = pa.schema([(name, types[kind]) for name, kind in columns])
+    rows = iter(rows)
+    with pq.ParquetWriter(save_path, schema) as writer:
+        # Un groupe de lignes par lot : seul le lot courant est en mémoire, converti colonne par colonne.
+        for batch in iter(lambda: list(islice(rows, EXPORT_BATCH_SIZE)), []):
+            arrays = [pa.array(values, type=field.type) for values, field in zip(zip(*batch), schema)]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+
+EXCHANGE_WRITERS = {'.csv': _write_csv, '.parquet': _write_parquet}
+
+def export_dataset(manager, dataset, save_path, progress=None):
+    """
+    Exporte 'agents', 'conges' ou 'soldes' en CSV ou en Parquet, selon l'extension de save_path.
+    Conçu pour être exécuté dans un thread ; progress(fait, total) optionnel.
+    """
+    writer = EXCHANGE_WRITERS.get(os.path.splitext(save_path)[1].lower())
+    if writer is None:
+        raise ValueError(f"Format d'export non pris en charge : {save_path} (.csv ou .parquet attendu)")
     def operation(manager):
-        errors = []
-        added_count, updated_count = 0, 0
-        
-        required_headers = CONFIG.get('ui', {}).get('agent_import_headers_required', ['nom', 'prenom'])
-        cadres_valides = CONFIG['ui'].get('grades', [])
-        default_cadre = cadres_valides[0] if cadres_valides else "Administrateur"
-        
-        wb = openpyxl.load_workbook(source_path)
-        ws = wb.active
-        
-        header = [str(cell.value or '').lower().strip() for cell in ws[1]]
-        if not all(h in header for h in required_headers):
-            raise ValueError(f"Colonnes requises manquantes : {', '.join(required_headers)}")
-
-        col_map = {name: i for i, name in enumerate(header)}
-        
-        manager.db.conn.execute('BEGIN TRANSACTION')
+        columns, rows, total = _exchange_dataset(manager, dataset)
+        os.makedirs(os.path.dirname(os.path.abspath(save_path)), exist_ok=True)
+        with _removed_on_failure(save_path):
+            writer(save_path, columns, _with_progress(rows, total, progress))
+        return f"Export « {dataset} » ({total} lignes) effectué avec succès vers\n{save_path}"
+
+    return _perform_read_operation(manager, operation)
+
+@contextmanager
+def _open_rows(source_path):
+    """
+    Ouvre un fichier .xlsx, .csv ou .parquet et fournit (en-tête, lignes), les lignes étant lues en flux.
+    Les cellules vides d'un CSV valent None, comme dans les deux autres formats.
+    """
+    ext = os.path.splitext(source_path)[1].lower()
+    if ext == '.csv':
+        with open(source_path, newline='', encoding='utf-8-sig') as f:
+            try:
+                # Séparateur détecté : ',' (export standard) ou ';' (CSV enregistré par Excel en français).
+                dialect = csv.Sniffer().sniff(f.read(4096), delimiters=',;\t')
+            except csv.Error:
+                dialect = csv.excel
+            f.seek(0)
+            rows = ([value if value != '' else None for value in row] for row in csv.reader(f, dialect))
+            yield next(rows, []), rows
+    elif ext == '.parquet':
+        pa, pq = _require_pyarrow()
+        parquet_file = pq.ParquetFile(source_path)
+        def rows():
+            for batch in parquet_file.iter_batches(batch_size=EXPORT_BATCH_SIZE):
+                yield from zip(*(column.to_pylist() for column in batch.columns))
+        yield parquet_file.schema_arrow.names, rows()
+    elif ext in ('.xlsx', '.xlsm'):
+        import openpyxl
+        wb = openpyxl.load_workbook(source_path, read_only=True)
         try:
-            for i, row in enumerate(ws.iter_rows(min_row=2, values_only=True), start=2):
-                if all(c is None for c in row):
-                    continue
-                try:
-                    # --- LECTURE SÉCURISÉE DES DONNÉES ---
-                    nom = str(row[col_map['nom']] or '').strip()
-                    prenom = str(row[col_map['prenom']] or '').strip()
-                    if not nom or not prenom:
-                        raise ValueError("Nom et prénom sont obligatoires.")
-
-                    # Lecture sécurisée des colonnes optionnelles
-                    ppr_idx = col_map.get('ppr')
-                    ppr = str(row[ppr_idx] or '').strip() if ppr_idx is not None else ""
-
-                    cadre_idx = col_map.get('cadre') # Utilisation de 'cadre' au lieu de 'grade'
-                    cadre = str(row[cadre_idx] or '').strip() if cadre_idx is not None else ""
-                    # --- FIN DE LA LECTURE SÉCURISÉE ---
-
-                    if not ppr:
-                        ppr_suffix = str(uuid.uuid4())[:8]
-                        ppr = f"{nom.upper()[:4]}_{ppr_suffix}"
-
-                    if not cadre:
-                        cadre = default_cadre
-                    
-                    if cadre not in cadres_valides:
-                        raise ValueError(f"Cadre '{cadre}' invalide. Cadres valides : {', '.join(cadres_valides)}")
-
-                    soldes = {}
-                    for col_name, col_idx in col_map.items():
-                        match = re.match(r'solde_(\d{4})', col_name)
-                        if match and row[col_idx] is not None:
-                            annee = int(match.group(1))
-                            solde_val = float(str(row[col_idx]).replace(",", "."))
-                            if solde_val < 0:
-                                raise ValueError(f"Solde négatif pour l'année {annee}.")
-                            soldes[annee] = solde_val
-                    
-                    agent_data = {
-                        'nom': nom, 'prenom': prenom, 'ppr': ppr, 'cadre': cadre,
-                        'soldes': soldes
-                    }
-                    
-                    existing_agent_id = manager.db.execute_query("SELECT id FROM agents WHERE ppr=?", (ppr,), fetch="one")
-                    if existing_agent_id:
-                        agent_data['id'] = existing_agent_id[0]
-                        manager.save_full_agent(agent_data, is_modification=True)
-                        updated_count += 1
-                    else:
-                        manager.save_full_agent(agent_data, is_modification=False)
-                        added_count += 1
-                
-                except Exception as ve:
-                    logging.warning(f"Erreur d'import à la ligne {i}: {ve}", exc_info=True)
-                    errors.append(f"Ligne {i}: {ve}")
-            
-            if errors:
-                manager.db.conn.rollback()
-                raise Exception("Importation annulée en raison d'erreurs:\n" + "\n".join(errors[:10]))
-            else:
-                manager.db.conn.commit()
-                return f"Importation réussie !\n\n- Agents ajoutés : {added_count}\n- Agents mis à jour : {updated_count}"
-
-        except Exception as e:
-            manager.db.conn.rollback()
-            raise e
+            rows = wb.active.iter_rows(values_only=True)
+            yield next(rows, ()), rows
+        finally:
+            wb.close()
+    else:
+        raise ValueError(f"Format de fichier non pris en charge : {ext} (.xlsx, .csv ou .parquet attendu)")
+
+# --- Validation des imports : tout le fichier est vérifié avant la moindre écriture ---
+def _column_map(header, required_headers):
+    header = [str(name or '').lower().strip() for name in header]
+    if not all(h in header for h in required_headers):
+        raise ValueError(f"Colonnes requises manquantes : {', '.join(required_headers)}")
+    return {name: i for i, name in enumerate(header)}
+
+def _cell(row, col_map, name):
+    """Valeur d'une colonne ; None si la colonne est absente ou la ligne plus courte que l'en-tête."""
+    i = col_map.get(name)
+    return row[i] if i is not None and i < len(row) else None
+
+def _parse_solde(value, label):
+    solde_val = float(str(value).replace(",", "."))
+    if solde_val < 0:
+        raise ValueError(f"Solde négatif pour {label}.")
+    return solde_val
+
+def _parse_int(value, label):
+    try:
+        return int(value) if isinstance(value, (int, float)) else int(str(value).strip())
+    except (TypeError, ValueError):
+        raise ValueError(f"{label} invalide : {value!r}.")
+
+def _validate_rows(rows, first_row, parse_row):
+    """Applique parse_row à chaque ligne non vide ; retourne (résultats, erreurs « Ligne n: ... »)."""
+    results, errors = [], []
+    for i, row in enumerate(rows, start=first_row):
+        if all(c is None for c in row):
+            continue
+        try:
+            results.append(parse_row(row))
+        except Exception as ve:
+            logging.warning(f"Erreur d'import à la ligne {i}: {ve}")
+            errors.append(f"Ligne {i}: {ve}")
+    return results, errors
+
+def prepare_agent_import(header, rows, existing_pprs, first_row=2):
+    """
+    Valide toutes les lignes d'un fichier d'agents avant la moindre écriture et les répartit entre
+    nouveaux agents et mises à jour, d'après l'index PPR -> id des agents existants.
+    header : noms des colonnes ; rows : lignes de valeurs (la première porte le numéro first_row).
+    Un PPR présent plusieurs fois donne un seul agent, avec les valeurs de sa dernière ligne (les soldes
+    initiaux restent ceux de sa première ligne). Retourne (nouveaux, modifies, erreurs).
+    """
+    required_headers = CONFIG.get('ui', {}).get('agent_import_headers_required', ['nom', 'prenom'])
+    cadres_valides = CONFIG['ui'].get('grades', [])
+    default_cadre = cadres_valides[0] if cadres_valides else "Administrateur"
+    cadres_set = set(cadres_valides)
+
+    col_map = _column_map(header, required_headers)
+    soldes_cols = [(int(m.group(1)), name) for name in col_map for m in [re.match(r'solde_(\d{4})', name)] if m]
+
+    def parse_row(row):
+        nom = str(_cell(row, col_map, 'nom') or '').strip()
+        prenom = str(_cell(row, col_map, 'prenom') or '').strip()
+        if not nom or not prenom:
+            raise ValueError("Nom et prénom sont obligatoires.")
+        ppr = str(_cell(row, col_map, 'ppr') or '').strip()
+        cadre = str(_cell(row, col_map, 'cadre') or '').strip()  # Utilisation de 'cadre' au lieu de 'grade'
+
+        if not ppr:
+            ppr_suffix = str(uuid.uuid4())[:8]
+            ppr = f"{nom.upper()[:4]}_{ppr_suffix}"
+        if not cadre:
+            cadre = default_cadre
+        if cadre not in cadres_set:
+            raise ValueError(f"Cadre '{cadre}' invalide. Cadres valides : {', '.join(cadres_valides)}")
+
+        soldes = {annee: _parse_solde(_cell(row, col_map, name), f"l'année {annee}")
+                  for annee, name in soldes_cols if _cell(row, col_map, name) is not None}
+        return {'nom': nom, 'prenom': prenom, 'ppr': ppr, 'cadre': cadre, 'soldes': soldes}
+
+    agents, errors = _validate_rows(rows, first_row, parse_row)
+    nouveaux, modifies = {}, {}
+    for agent in agents:
+        soldes, ppr = agent.pop('soldes'), agent['ppr']
+        if ppr in existing_pprs:
+            modifies[ppr] = dict(agent, id=existing_pprs[ppr])
+        elif ppr in nouveaux:
+            nouveaux[ppr].update(agent)
+        else:
+            nouveaux[ppr] = dict(agent, soldes=soldes)
+    return list(nouveaux.values()), list(modifies.values()), errors
+
+def _agent_id(existing_pprs, ppr, label="Agent"):
+    ppr = str(ppr or '').strip()
+    if ppr not in existing_pprs:
+        raise ValueError(f"{label} de PPR '{ppr}' introuvable.")
+    return existing_pprs[ppr]
+
+def prepare_soldes_import(header, rows, existing_pprs, first_row=2):
+    """
+    Valide un fichier de soldes (ppr, annee, solde, statut facultatif) avant toute écriture.
+    Retourne (soldes [(agent_id, annee, solde, statut)], erreurs) ; une même année d'un agent garde sa dernière ligne.
+    """
+    col_map = _column_map(header, ['ppr', 'annee', 'solde'])
+    statuts = {str(statut) for statut in SoldeStatus}
+
+    def parse_row(row):
+        agent_id = _agent_id(existing_pprs, _cell(row, col_map, 'ppr'))
+        annee = _parse_int(_cell(row, col_map, 'annee'), "Année")
+        solde = _parse_solde(_cell(row, col_map, 'solde'), f"l'année {annee}")
+        statut = str(_cell(row, col_map, 'statut') or SoldeStatus.ACTIF).strip()
+        if statut not in statuts:
+            raise ValueError(f"Statut de solde '{statut}' invalide.")
+        return agent_id, annee, solde, statut
+
+    soldes, errors = _validate_rows(rows, first_row, parse_row)
+    return list({(s[0], s[1]): s for s in soldes}.values()), errors
+
+def prepare_conges_import(header, rows, existing_pprs, first_row=2):
+    """
+    Valide un fichier de congés (ppr, type_conge, date_debut, date_fin, jours_pris ; statut, justif et
+    interim_ppr facultatifs) avant toute écriture. Retourne (congés prêts pour insert_conges_bulk, erreurs).
+    """
+    col_map = _column_map(header, ['ppr', 'type_conge', 'date_debut', 'date_fin', 'jours_pris'])
+    types_valides = set(CONFIG['ui'].get('types_conge', []))
+
+    def parse_row(row):
+        agent_id = _agent_id(existing_pprs, _cell(row, col_map, 'ppr'))
+        type_conge = str(_cell(row, col_map, 'type_conge') or '').strip()
+        if type_conge not in types_valides:
+            raise ValueError(f"Type de congé '{type_conge}' invalide.")
+        date_debut, date_fin = validate_date(_cell(row, col_map, 'date_debut')), validate_date(_cell(row, col_map, 'date_fin'))
+        if not date_debut or not date_fin or date_fin < date_debut:
+            raise ValueError("Dates de début et de fin invalides.")
+        jours_pris = _parse_int(_cell(row, col_map, 'jours_pris'), "Nombre de jours")
+        if jours_pris < 0:
+            raise ValueError("Le nombre de jours ne peut pas être négatif.")
+        statut = str(_cell(row, col_map, 'statut') or 'Actif').strip()
+        if statut not in ('Actif', 'Annulé'):
+            raise ValueError(f"Statut de congé '{statut}' invalide.")
+        interim_ppr = _cell(row, col_map, 'interim_ppr')
+        interim_id = _agent_id(existing_pprs, interim_ppr, "Intérimaire") if interim_ppr is not None else None
+        return {'agent_id': agent_id, 'type_conge': type_conge, 'justif': _cell(row, col_map, 'justif'), 'interim_id': interim_id,
+                'date_debut': date_debut, 'date_fin': date_fin, 'jours_pris': jours_pris, 'statut': statut}
+
+    return _validate_rows(rows, first_row, parse_row)
+
+def import_dataset(db_path, certificats_path, dataset, source_path):
+    """
+    Importe un fichier d'agents, de congés ou de soldes (.xlsx, .csv ou .parquet). Le fichier est lu en flux,
+    entièrement validé, puis enregistré en masse dans une seule transaction : tout ou rien.
+    Les congés importés forment un historique et ne débitent pas les soldes (importés par leur propre fichier).
+    """
+    preparers = {'agents': prepare_agent_import, 'conges': prepare_conges_import, 'soldes': prepare_soldes_import}
+    if dataset not in preparers:
+        raise ValueError(f"Jeu de données inconnu : {dataset}. Valeurs possibles : {', '.join(EXCHANGE_DATASETS)}")
+    def operation(manager):
+        with _open_rows(source_path) as (header, rows):
+            *prepared, errors = preparers[dataset](header, rows, manager.get_agent_ids_by_ppr())
+        if errors:
+            raise Exception("Importation annulée en raison d'erreurs:\n" + "\n".join(errors[:10]))
+
+        if dataset == 'agents':
+            added_count, updated_count = manager.import_agents_bulk(*prepared)
+            return f"Importation réussie !\n\n- Agents ajoutés : {added_count}\n- Agents mis à jour : {updated_count}"
+        if dataset == 'soldes':
+            return f"Importation réussie !\n\n- Soldes enregistrés : {manager.import_soldes_bulk(*prepared)}"
+        conges = prepared[0]
+        added_count = manager.import_conges_bulk(conges)
+        return f"Importation réussie !\n\n- Congés ajoutés : {added_count}\n- Congés déjà présents : {len(conges) - added_count}"
 
     return _perform_db_operation_with_manager(db_path, certificats_path, operation)
 
+def import_agents_from_excel(db_path, certificats_path, source_path):
+    """Importe des agents avec une logique de colonnes optionnelles (voir import_dataset ; accepte aussi CSV et Parquet)."""
+    return import_dataset(db_path, certificats_path, 'agents', source_path)
+
 def generate_decision_from_template(template_path, output_path, context):
-    """Génère un document Word à partir d'un modèle en remplaçant les tags."""
+    """Génère un document Word à partir d'un modèle (compilé une fois, voir utils.decision_templates) en remplaçant les tags."""
+    from utils.decision_templates import get_template
     try:
-        doc = docx.Document(template_path)
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
-
-        for p in doc.paragraphs:
-            for key, value in context.items():
-                if key in p.text:
-                    inline = p.runs
-                    for i in range(len(inline)):
-                        if key in inline[i].text:
-                            text = inline[i].text.replace(key, str(value))
-                            inline[i].text = text
-
-        for table in doc.tables:
-            for row in table.rows:
-                for cell in row.cells:
-                    for p in cell.paragraphs:
-                        for key, value in context.items():
-                            if key in p.text:
-                                inline = p.runs
-                                for i in range(len(inline)):
-                                    if key in inline[i].text:
-                                        text = inline[i].text.replace(key, str(value))
-                                        inline[i].text = text
-        doc.save(output_path)
+        get_template(template_path).render(context, output_path)
         return True
     except Exception as e:
         logging.error(f"Erreur lors de la génération du document : {e}", exc_info=True)
-        raise e
\ No newline at end of file
+        raise e
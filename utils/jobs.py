@@ -0,0 +1,137 @@
+# Fichier : utils/jobs.py
+# Exécution des tâches longues hors du thread de l'interface. Les tâches de calcul (exports openpyxl,
+# rendu des décisions .docx, contrôles de cohérence) vont dans un pool de processus, à l'abri du GIL et de
+# la boucle Tk ; les tâches d'entrée-sortie dans un pool de threads. Chaque tâche rapporte son avancement
+# et peut être annulée. Aucune fonction Tk n'est appelée ici : l'interface interroge poll() (MainWindow).
+
+import itertools
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import CancelledError, ProcessPoolExecutor, ThreadPoolExecutor
+
+from utils.config_loader import CONFIG
+
+class JobCancelled(Exception):
+    """Levée par progress() dans une tâche dont l'annulation a été demandée."""
+
+def _init_worker(config):
+    # Processus 'spawn' : la configuration chargée par main.py n'y existe pas encore.
+    CONFIG.update(config)
+
+def _run_job(fn, args, kwargs, job_id, with_progress, progress_queue, cancel_event):
+    """Exécute une tâche (dans un thread ou un processus de travail) en lui fournissant progress(fait, total)."""
+    if cancel_event.is_set(): raise JobCancelled()
+    if with_progress:
+        def progress(done, total):
+            if cancel_event.is_set(): raise JobCancelled()
+            progress_queue.put((job_id, done, total))
+        kwargs = dict(kwargs, progress=progress)
+    return fn(*args, **kwargs)
+
+class Job:
+    """Tâche soumise à JobExecutor : libellé, dernier avancement (fait, total), état et résultat."""
+    def __init__(self, job_id, label, cpu_bound, on_complete, cancel_event):
+        self.id, self.label, self.cpu_bound, self.on_complete = job_id, label, cpu_bound, on_complete
+        self.progress = None
+        self.future = None
+        self._cancel_event = cancel_event
+
+    def cancel(self):
+        """Annule la tâche : immédiatement si elle attend, au prochain appel de progress() si elle tourne."""
+        self._cancel_event.set()
+        self.future.cancel()
+
+    @property
+    def cancel_requested(self):
+        return self._cancel_event.is_set()
+
+    @property
+    def cancelled(self):
+        return self.future.cancelled() or (self.future.done() and isinstance(self.future.exception(), JobCancelled))
+
+    def result(self):
+        """Résultat de la tâche terminée, ou l'exception qu'elle a levée."""
+        try: return self.future.result(timeout=0)
+        except (Exception, CancelledError) as e: return e
+
+    def describe(self):
+        if self.cancel_requested: return f"{self.label} (annulation...)"
+        if not self.future.running() and not self.future.done(): return f"{self.label} (en attente)"
+        if not self.progress: return self.label
+        done, total = self.progress
+        return f"{self.label} {done}/{total}" + (f" ({100 * done // total} %)" if total else "")
+
+class JobExecutor:
+    """
+    File des tâches longues. Les pools, et pour les processus le gestionnaire partageant avancement et
+    annulations, ne sont créés qu'à la première tâche qui en a besoin.
+    """
+    def __init__(self, max_processes=None, max_threads=4):
+        # Un cœur reste à l'interface.
+        self.max_processes = max_processes or max(1, (os.cpu_count() or 2) - 1)
+        self._threads = ThreadPoolExecutor(max_workers=max_threads, thread_name_prefix="job")
+        self._processes = None
+        self._sync = None
+        self._local_progress = queue.SimpleQueue()
+        self._process_progress = None
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.jobs = []  # Tâches non encore remises par poll(), dans l'ordre de soumission.
+
+    @property
+    def process_pool(self):
+        """Pool de processus partagé ('spawn' : processus neufs, sans copie de l'état de l'interface Tk)."""
+        if self._processes is None:
+            self._processes = ProcessPoolExecutor(self.max_processes, mp_context=multiprocessing.get_context('spawn'),
+                                                  initializer=_init_worker, initargs=(dict(CONFIG),))
+        return self._processes
+
+    def _process_sync(self):
+        if self._sync is None:
+            self._sync = multiprocessing.get_context('spawn').Manager()
+            self._process_progress = self._sync.Queue()
+        return self._sync
+
+    def submit(self, label, fn, *args, cpu_bound=False, with_progress=False, on_complete=None, **kwargs):
+        """
+        Soumet fn(*args, **kwargs) et retourne le Job. Avec with_progress, fn reçoit aussi progress=f(fait, total),
+        qui lève JobCancelled une fois l'annulation demandée. Avec cpu_bound, la tâche part dans le pool de
+        processus : fn doit être une fonction de module et ses arguments transmissibles (chemins, pas connexions).
+        """
+        if cpu_bound:
+            sync = self._process_sync()
+            cancel_event, progress_queue, pool = sync.Event(), self._process_progress, self.process_pool
+        else:
+            cancel_event, progress_queue, pool = threading.Event(), self._local_progress, self._threads
+        job = Job(next(self._ids), label, cpu_bound, on_complete, cancel_event)
+        with self._lock:
+            job.future = pool.submit(_run_job, fn, args, kwargs, job.id, with_progress, progress_queue, cancel_event)
+            self.jobs.append(job)
+        return job
+
+    def poll(self):
+        """Relève l'avancement des tâches, retire de la file celles qui sont terminées et les retourne."""
+        with self._lock:
+            by_id = {job.id: job for job in self.jobs}
+        for progress_queue in filter(None, (self._local_progress, self._process_progress)):
+            while True:
+                try: job_id, done, total = progress_queue.get_nowait()
+                except queue.Empty: break
+                if job_id in by_id: by_id[job_id].progress = (done, total)
+        with self._lock:
+            finished = {job.id for job in self.jobs if job.future.done()}
+            done_jobs = [job for job in self.jobs if job.id in finished]
+            self.jobs = [job for job in self.jobs if job.id not in finished]
+        return done_jobs
+
+    def shutdown(self):
+        """Annule les tâches et arrête les pools sans attendre la fin de celles qui tournent encore."""
+        with self._lock:
+            jobs = list(self.jobs)
+        for job in jobs:
+            job.cancel()
+        self._threads.shutdown(wait=False, cancel_futures=True)
+        if self._processes: self._processes.shutdown(wait=False, cancel_futures=True)
+        if self._sync: self._sync.shutdown()
@@ -0,0 +1,25 @@
+# Fichier : utils/startup_timing.py
+# Chronométrage des étapes du démarrage de l'application, écrit dans le journal à l'ouverture.
+
+import time
+
+class StartupTimer:
+    """Mesure la durée de chaque étape du démarrage, depuis `start` (time.perf_counter())."""
+    def __init__(self, start=None):
+        self.start = time.perf_counter() if start is None else start
+        self._last = self.start
+        self.steps = []
+
+    def mark(self, step):
+        """Termine l'étape en cours : sa durée est celle écoulée depuis l'étape précédente."""
+        now = time.perf_counter()
+        self.steps.append((step, (now - self._last) * 1000))
+        self._last = now
+
+    @property
+    def total_ms(self):
+        return (self._last - self.start) * 1000
+
+    def report(self):
+        lines = [f"  {step:<30} {ms:8.1f} ms" for step, ms in self.steps]
+        return "\n".join(["Temps de démarrage :", *lines, f"  {'Total':<30} {self.total_ms:8.1f} ms"])